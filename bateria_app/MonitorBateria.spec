@@ -9,6 +9,9 @@ hiddenimports = [
     "PIL.ImageTk",
     "PIL._imagingtk",
     "PIL._tkinter_finder",
+    # carregados pelo pyserial por nome (serial_for_url com sim:// e replay://)
+    "core.urlhandler.protocol_sim",
+    "core.urlhandler.protocol_replay",
 ]
 
 # Corrigido: incluir conteúdo das pastas
@@ -0,0 +1,244 @@
+# cli.py
+"""
+Executor de testes sem interface gráfica.
+
+Roda o mesmo teste da TelaMonitoramento (ESPReader + BateriaController +
+ControleEnsaio), gravando o mesmo CSV em assets/dados/ e o mesmo diário da
+sessão, mas sem importar Tk, ttkbootstrap, PIL ou matplotlib. Serve para
+bancadas sem monitor (ssh, serviço do sistema).
+
+Exemplos (a partir da pasta bateria_app):
+    python cli.py --bateria psa37 --porta /dev/ttyUSB0 --tipo ciclos --ciclos 3 --descanso 120 --csv ensaio_psa
+    python cli.py --bateria baterias/psa37.json --tipo carga --iniciar carga --csv carga_psa
+    python cli.py --retomar
+    python cli.py --bateria psa37 --porta "replay://sessao.cap?speed=50" --tipo ciclos --ciclos 3 --csv reprise
+    python cli.py --bateria psa37 --porta "sim://?rate=10&seed=1" --tipo ciclos --ciclos 2 --csv simulado
+
+Ctrl+C desliga os relés e encerra mantendo o diário, para retomar depois
+com --retomar (pelo cli ou pela interface). Uma queda da conexão não
+encerra o teste: o leitor tenta reconectar por até --orcamento-queda
+segundos antes de desistir.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "assets", "lib"))
+
+from core.diario import ARQUIVO_SESSAO, DiarioSessao
+from core.ensaio import ControleEnsaio, estado_sessao
+from core.monitor import ESPReader
+
+PASTA_BATERIAS = os.path.join(os.getcwd(), "baterias")
+PASTA_DADOS = os.path.join(os.getcwd(), "assets", "dados")
+
+
+def carregar_bateria(nome):
+    """Aceita o caminho de um JSON ou o nome de um arquivo em baterias/."""
+    caminho = nome
+    if not os.path.exists(caminho):
+        caminho = os.path.join(PASTA_BATERIAS, nome if nome.endswith(".json") else f"{nome}.json")
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def criar_parser():
+    p = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Executa um teste de bateria sem interface gráfica.",
+    )
+    p.add_argument("--bateria", help="JSON da bateria (caminho ou nome em baterias/)")
+    p.add_argument("--porta", help="porta serial da ESP32 (omitida: detecção automática)")
+    p.add_argument("--tipo", choices=("carga", "ciclos"), default="carga",
+                   help="carga = carga/descarga com parada por tensão; ciclos = ciclos com descanso")
+    p.add_argument("--ciclos", type=int, default=1, help="quantidade de ciclos (tipo ciclos)")
+    p.add_argument("--descanso", type=int, default=60, help="descanso entre ciclos, em segundos")
+    p.add_argument("--csv", help="nome do arquivo de dados em assets/dados (sem extensão)")
+    p.add_argument("--formato", choices=("csv", "bin"), default="csv", help="formato da gravação")
+    p.add_argument("--decimacao", default=None, help='decimação da gravação, ex.: "media:1" ou "n:10"')
+    p.add_argument("--iniciar", choices=("carga", "descarga"),
+                   help="no tipo carga, já liga a carga ou a descarga ao começar")
+    p.add_argument("--sobrescrever", action="store_true", help="sobrescreve o arquivo de dados se existir")
+    p.add_argument("--retomar", action="store_true", help="retoma o teste salvo no diário da sessão")
+    p.add_argument("--orcamento-queda", type=float, default=ESPReader.ORCAMENTO_QUEDA,
+                   help="segundos sem conexão com a ESP antes de interromper o teste")
+    p.add_argument("--captura", help="grava o fluxo cru da serial neste arquivo (para replay://)")
+    p.add_argument("--intervalo-status", type=float, default=10.0,
+                   help="segundos entre as linhas de status (0 = sem status)")
+    return p
+
+
+def montar_simulacao(args):
+    """Dicionário no mesmo formato de controller.simulacao_dados da interface."""
+    if args.retomar:
+        log = DiarioSessao.recuperar(ARQUIVO_SESSAO)
+        if not log:
+            raise SystemExit("Nenhum teste para retomar (diário da sessão vazio ou ausente).")
+        dados_bateria = {"nome": log.get("bateria"), "capacidade": log.get("capacidade")}
+        if args.bateria:
+            dados_bateria = carregar_bateria(args.bateria)
+        return {
+            "porta": args.porta or log.get("serial"),
+            "csv": log.get("arquivo_csv"),
+            "tipo": log.get("modo"),
+            "ciclos": log.get("ciclos_totais", 0),
+            "ciclo_atual": log.get("ciclo_atual", 0),
+            "descanso": log.get("descanso", 0),
+            "descanso_restante": log.get("descanso_restante", 0),
+            "tempo_decorrido": log.get("tempo_decorrido", 0),
+            "dados_bateria": dados_bateria,
+            "decimacao": args.decimacao,
+        }
+
+    if not args.bateria or not args.csv:
+        raise SystemExit("Informe --bateria e --csv (ou use --retomar).")
+
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    extensao = ".bin" if args.formato == "bin" else ".csv"
+    arquivo = os.path.join(PASTA_DADOS, f"{args.csv}{extensao}")
+    if os.path.exists(arquivo):
+        if not args.sobrescrever:
+            raise SystemExit(f"O arquivo '{arquivo}' já existe (use --sobrescrever).")
+        os.remove(arquivo)
+        print(f"🧹 Arquivo sobrescrito: {arquivo}")
+
+    return {
+        "porta": args.porta,
+        "csv": arquivo,
+        "tipo": args.tipo,
+        "ciclos": args.ciclos if args.tipo == "ciclos" else 1,
+        "descanso": args.descanso,
+        "dados_bateria": carregar_bateria(args.bateria),
+        "decimacao": args.decimacao,
+    }
+
+
+def executar(args):
+    dados = montar_simulacao(args)
+    retomar = args.retomar
+
+    esp = ESPReader(porta=dados["porta"], orcamento_queda=args.orcamento_queda)
+    try:
+        esp.conectar()
+    except Exception as e:
+        print(f"[CLI] Não foi possível conectar à ESP32: {e}")
+        return 2
+    dados["porta"] = esp.porta
+    if args.captura:
+        esp.definir_captura(args.captura)
+
+    esp.definir_csv(
+        dados["csv"],
+        retomar=retomar,
+        tempo_decorrido=dados.get("tempo_decorrido", 0),
+        decimacao=dados.get("decimacao"),
+        metadados={"bateria": dados["dados_bateria"].get("nome"), "tipo": dados["tipo"]},
+    )
+
+    diario = DiarioSessao(ARQUIVO_SESSAO)
+    ensaio = ControleEnsaio(
+        esp,
+        dados["tipo"],
+        dados["dados_bateria"],
+        ciclos_totais=dados.get("ciclos", 0),
+        descanso=dados.get("descanso", 60),
+        registrar=diario.registrar,
+    )
+    tempo_inicial = time.monotonic()
+    if retomar:
+        ensaio.retomar(dados.get("ciclo_atual", 0), dados.get("descanso_restante", 0))
+        tempo_inicial -= int(dados.get("tempo_decorrido", 0))
+        diario.continuar()
+    else:
+        diario.iniciar(estado_sessao(dados, ensaio, 0))
+    esp.set_ciclo(ensaio.ciclo_atual)
+
+    esp.start()
+    esp.iniciar_envio_periodico("USB ON", intervalo=3)
+    if ensaio.tipo == "ciclos":
+        esp.bateria_controller.alternar_modo()
+        if ensaio.descanso_em_andamento:
+            esp.bateria_controller.desligar_tudo()
+    elif args.iniciar == "carga":
+        esp.bateria_controller.iniciar_carga()
+    elif args.iniciar == "descarga":
+        esp.bateria_controller.iniciar_descarga()
+
+    print(f"[CLI] Teste {'retomado' if retomar else 'iniciado'}: {dados['tipo']} | "
+          f"bateria {dados['dados_bateria'].get('nome', '---')} | porta {esp.porta} | "
+          f"arquivo {os.path.relpath(dados['csv'], os.getcwd())}")
+
+    codigo = 0
+    proximo = time.monotonic()
+    proximo_status = proximo
+    ultimo_tempo = None
+    try:
+        while True:
+            # Tique de 1 s com prazo fixo (mesmo ritmo da tela de monitoramento)
+            proximo += 1.0
+            time.sleep(max(0.0, proximo - time.monotonic()))
+
+            if not esp.is_alive():
+                print("[CLI] ❌ ESP não reconectou. O diário foi mantido para retomar (--retomar).")
+                codigo = 2
+                break
+
+            tempo_decorrido = int(time.monotonic() - tempo_inicial)
+            if tempo_decorrido != ultimo_tempo:
+                ultimo_tempo = tempo_decorrido
+                if ensaio.descanso_em_andamento:
+                    diario.registrar("tempo", tempo_decorrido=tempo_decorrido,
+                                     descanso_restante=int(ensaio.tempo_restante_descanso))
+                else:
+                    diario.registrar("tempo", tempo_decorrido=tempo_decorrido)
+
+            if not esp.conectado:
+                # queda da conexão: o último quadro está velho, espera a reconexão
+                continue
+            if esp.porta != dados["porta"]:
+                dados["porta"] = esp.porta
+                diario.registrar("porta", serial=esp.porta)
+
+            amostra = esp.amostra
+            if amostra is None:
+                continue
+
+            mensagem = ensaio.tique(amostra)
+
+            if args.intervalo_status and time.monotonic() >= proximo_status:
+                proximo_status = time.monotonic() + args.intervalo_status
+                corrente = f"{amostra.corrente:.3f} A" if amostra.corrente is not None else "-- A"
+                linha = (f"[CLI] {tempo_decorrido:>6d}s | {amostra.tensao:.3f} V | {corrente} | "
+                         f"Modo {amostra.modo} | Carga {amostra.carga} | Descarga {amostra.descarga}")
+                if ensaio.tipo == "ciclos":
+                    linha += f" | Ciclo {ensaio.ciclo_atual}/{ensaio.ciclos_totais}"
+                    if ensaio.descanso_em_andamento:
+                        linha += f" | Descanso {int(ensaio.tempo_restante_descanso)}s"
+                print(linha, flush=True)
+
+            if mensagem:
+                print(f"[CLI] ✅ {mensagem}")
+                diario.apagar()
+                break
+    except KeyboardInterrupt:
+        print("\n[CLI] Interrompido. O diário foi mantido para retomar (--retomar).")
+        codigo = 130
+    finally:
+        try:
+            esp.bateria_controller.desligar_tudo().result(timeout=3)
+        except Exception:
+            pass
+        esp.parar()
+        diario.fechar()
+    return codigo
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return executar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
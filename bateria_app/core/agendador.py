@@ -0,0 +1,139 @@
+# core/agendador.py
+import heapq
+import itertools
+import threading
+import time
+
+
+class Tarefa:
+    """Uma tarefa agendada. cancelar() impede as próximas execuções."""
+    __slots__ = ("funcao", "args", "intervalo", "prazo", "nome", "cancelada", "execucoes", "atrasos")
+
+    def __init__(self, funcao, args, intervalo, prazo, nome):
+        self.funcao = funcao
+        self.args = args
+        self.intervalo = intervalo
+        self.prazo = prazo
+        self.nome = nome or getattr(funcao, "__name__", "tarefa")
+        self.cancelada = False
+        self.execucoes = 0
+        self.atrasos = 0.0   # maior atraso observado em relação ao prazo (s)
+
+    def cancelar(self):
+        self.cancelada = True
+
+    def __repr__(self):
+        tipo = f"a cada {self.intervalo:g}s" if self.intervalo else "única"
+        return f"Tarefa({self.nome}, {tipo}, execuções={self.execucoes})"
+
+
+class Agendador(threading.Thread):
+    """
+    Executa as tarefas periódicas de todas as placas (heartbeat USB ON,
+    watchdog, reenvio de comandos...) numa única thread, com um heap
+    ordenado pelo próximo prazo (time.monotonic()).
+
+    A thread dorme até o prazo mais próximo; com N placas continua sendo
+    uma thread só, e sem tarefas vencidas ela não acorda. Os prazos das
+    tarefas periódicas são fixos (prazo anterior + intervalo), então não
+    acumulam deriva; se a thread atrasar mais de um intervalo, as execuções
+    perdidas são puladas em vez de disparadas em rajada.
+
+    As tarefas devem ser rápidas e não bloquear: elas compartilham a thread.
+    """
+
+    def __init__(self, nome="Agendador"):
+        super().__init__(daemon=True, name=nome)
+        self._heap = []
+        self._contador = itertools.count()
+        self._cond = threading.Condition()
+        self._parar = False
+        self._iniciado = False
+        self._lock_inicio = threading.Lock()
+
+    # ---------- API ----------
+    def agendar(self, atraso, funcao, *args, nome=None):
+        """Executa `funcao(*args)` uma vez daqui a `atraso` segundos."""
+        return self._inserir(Tarefa(funcao, args, None, time.monotonic() + atraso, nome))
+
+    def agendar_periodico(self, intervalo, funcao, *args, nome=None, atraso=None):
+        """Executa `funcao(*args)` a cada `intervalo` s (a primeira após `atraso`, padrão = intervalo)."""
+        if intervalo <= 0:
+            raise ValueError("O intervalo deve ser positivo.")
+        prazo = time.monotonic() + (intervalo if atraso is None else atraso)
+        return self._inserir(Tarefa(funcao, args, float(intervalo), prazo, nome))
+
+    def parar(self, timeout=1.0):
+        with self._cond:
+            self._parar = True
+            self._cond.notify()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    @property
+    def tarefas(self):
+        with self._cond:
+            return [t for _, _, t in self._heap if not t.cancelada]
+
+    def _inserir(self, tarefa):
+        with self._cond:
+            heapq.heappush(self._heap, (tarefa.prazo, next(self._contador), tarefa))
+            # acorda a thread se a nova tarefa vence antes da que ela espera
+            if self._heap[0][2] is tarefa:
+                self._cond.notify()
+        with self._lock_inicio:
+            if not self._iniciado and not self._parar:
+                self._iniciado = True
+                self.start()
+        return tarefa
+
+    # ---------- laço ----------
+    def run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._parar:
+                        return
+                    # descarta as canceladas do topo
+                    while self._heap and self._heap[0][2].cancelada:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    espera = self._heap[0][0] - time.monotonic()
+                    if espera <= 0:
+                        break
+                    self._cond.wait(espera)
+                prazo, _, tarefa = heapq.heappop(self._heap)
+
+            agora = time.monotonic()
+            tarefa.atrasos = max(tarefa.atrasos, agora - prazo)
+            try:
+                tarefa.funcao(*tarefa.args)
+            except Exception as e:
+                print(f"[Agendador] Erro na tarefa {tarefa.nome}: {e}")
+            tarefa.execucoes += 1
+
+            if tarefa.intervalo and not tarefa.cancelada:
+                proximo = prazo + tarefa.intervalo
+                agora = time.monotonic()
+                if proximo <= agora:
+                    # atrasou mais de um intervalo: pula as execuções perdidas
+                    perdidas = int((agora - prazo) // tarefa.intervalo)
+                    proximo = prazo + (perdidas + 1) * tarefa.intervalo
+                tarefa.prazo = proximo
+                with self._cond:
+                    heapq.heappush(self._heap, (proximo, next(self._contador), tarefa))
+
+
+_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def agendador_padrao():
+    """Agendador compartilhado pelo aplicativo (criado na primeira chamada)."""
+    global _padrao
+    with _lock_padrao:
+        if _padrao is None or _padrao._parar:
+            _padrao = Agendador()
+        return _padrao
@@ -0,0 +1,98 @@
+# core/amostra.py
+import math
+from typing import NamedTuple, Optional
+
+
+class Amostra(NamedTuple):
+    """
+    Quadro de telemetria recebido, imutável.
+    seq cresce de 1 em 1 a cada quadro válido; t é time.monotonic() na recepção.
+    """
+    seq: int
+    t: float
+    tensao: float
+    corrente: Optional[float]
+    modo: str
+    carga: str
+    descarga: str
+
+
+MODO_LACUNA = "LACUNA"
+
+
+def marca_lacuna(t, seq=0):
+    """
+    Registro sem medida que marca, no arquivo gravado, o ponto em que a
+    leitura foi interrompida (queda da conexão). A próxima linha gravada é
+    a primeira depois da reconexão; o tempo entre as duas é a lacuna.
+    """
+    return Amostra(seq, t, math.nan, None, MODO_LACUNA, "", "")
+
+
+class BufferAmostras:
+    """
+    Anel pré-alocado com as últimas `capacidade` amostras publicadas pelo
+    ESPReader (arredondada para potência de 2). A amostra de seq N fica na
+    posição N & mascara, então as seqs publicadas precisam ser contíguas
+    (NucleoLeitura numera de 1 em 1).
+
+    Só a thread leitora escreve, e sem lock: quem lê copia as posições e
+    descarta as que o escritor sobrescreveu durante a cópia (seq fora da
+    sequência esperada). O que um consumidor pede e já saiu do anel conta
+    em `perdidas`, para o atraso aparecer no diagnóstico em vez de sumir.
+    """
+
+    def __init__(self, capacidade=8192):
+        tamanho = 1
+        while tamanho < capacidade:
+            tamanho *= 2
+        self.capacidade = tamanho
+        self._mascara = tamanho - 1
+        self._slots = [None] * tamanho
+        self._ultima = None
+        self.perdidas = 0   # amostras pedidas por consumidores já sobrescritas
+
+    def __len__(self):
+        ultima = self._ultima
+        return 0 if ultima is None else min(ultima.seq, self.capacidade)
+
+    def adicionar(self, amostra):
+        self._slots[amostra.seq & self._mascara] = amostra
+        # publicada só depois de estar no anel
+        self._ultima = amostra
+
+    def ultima(self):
+        return self._ultima
+
+    def desde(self, seq):
+        """
+        Retorna, em ordem, todas as amostras com seq > `seq` ainda no buffer.
+        Se o consumidor atrasou mais que a capacidade, a primeira amostra
+        devolvida terá seq > seq + 1 (as intermediárias foram descartadas e
+        somadas em `perdidas`).
+        """
+        ultima = self._ultima
+        if ultima is None or ultima.seq <= seq:
+            return []
+        fim = ultima.seq
+        inicio = max(seq + 1, fim - self.capacidade + 1, 1)
+        a, b = inicio & self._mascara, (fim & self._mascara) + 1
+        if a < b:
+            novas = self._slots[a:b]
+        else:
+            novas = self._slots[a:] + self._slots[:b]
+        # O escritor pode ter dado a volta durante a cópia: as primeiras
+        # posições passam a ter seqs posteriores a `fim`
+        k = 0
+        while k < len(novas) and (novas[k] is None or novas[k].seq != inicio + k):
+            k += 1
+        if k:
+            del novas[:k]
+        perdidas = inicio + k - (seq + 1)
+        if perdidas > 0:
+            self.perdidas += perdidas
+        return novas
+
+    def limpar(self):
+        self._slots = [None] * self.capacidade
+        self._ultima = None
@@ -0,0 +1,220 @@
+# core/autodetect.py
+"""
+Detecção automática da porta da ESP32.
+
+Todas as portas candidatas são sondadas ao mesmo tempo (uma thread por
+porta). Uma porta só é aceita quando a placa responde a um comando de
+handshake: o firmware responde "Comando invalido." a qualquer comando
+desconhecido, então enviamos "PING" e esperamos essa resposta. Uma linha
+qualquer (log de boot de outro dispositivo, ruído) não basta.
+
+A última placa encontrada fica guardada em assets/dados/esp_cache.json
+(VID/PID/número de série USB). Na próxima busca ela é testada primeiro,
+sozinha, e só se não responder a varredura completa é feita. A mesma
+identidade USB é usada por reabrir_esp() para reencontrar a placa depois de
+uma queda da conexão, mesmo que o SO dê outro nome à porta.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import serial
+import serial.tools.list_ports
+
+from . import urlhandler
+
+# replay:// e outros transportes do aplicativo (core/urlhandler)
+urlhandler.registrar()
+
+ARQUIVO_CACHE = os.path.join(os.getcwd(), "assets", "dados", "esp_cache.json")
+
+COMANDO_HANDSHAKE = b"PING\n"
+RESPOSTA_HANDSHAKE = b"Comando invalido"
+
+
+def abrir_serial(device, baudrate, timeout=0.2):
+    """
+    Abre a porta sem acionar DTR/RTS, para não reiniciar a ESP32
+    (o auto-reset das placas de desenvolvimento usa essas linhas).
+    `device` também pode ser uma URL do pyserial (replay://...).
+    """
+    ser = serial.serial_for_url(device, do_not_open=True)
+    ser.baudrate = baudrate
+    ser.timeout = timeout
+    ser.dtr = False
+    ser.rts = False
+    ser.open()
+    return ser
+
+
+def sondar_porta(device, baudrate=115200, prazo=2.5, reenvio=0.3, cancelar=None):
+    """
+    Abre `device`, envia o handshake e espera a resposta por até `prazo`
+    segundos (reenviando a cada `reenvio` s, caso a placa esteja no boot).
+    Retorna a Serial aberta se a placa respondeu, senão None.
+    """
+    try:
+        ser = abrir_serial(device, baudrate, timeout=0.05)
+    except Exception:
+        return None
+
+    try:
+        try:
+            ser.reset_input_buffer()
+        except Exception:
+            pass
+        buffer = b""
+        limite = time.monotonic() + prazo
+        proximo_envio = 0.0
+        while time.monotonic() < limite:
+            if cancelar is not None and cancelar.is_set():
+                break
+            agora = time.monotonic()
+            if agora >= proximo_envio:
+                ser.write(COMANDO_HANDSHAKE)
+                proximo_envio = agora + reenvio
+            buffer += ser.read(ser.in_waiting or 1)
+            if RESPOSTA_HANDSHAKE in buffer:
+                return ser
+            # Só interessa a linha em andamento
+            buffer = buffer[buffer.rfind(b"\n") + 1:][-256:]
+    except Exception:
+        pass
+
+    try:
+        ser.close()
+    except Exception:
+        pass
+    return None
+
+
+# ===============================
+# Cache da última placa
+# ===============================
+def _identidade(info):
+    return {
+        "vid": info.vid,
+        "pid": info.pid,
+        "serial_number": info.serial_number,
+        "device": info.device,
+    }
+
+
+def ler_cache(caminho=ARQUIVO_CACHE):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def salvar_cache(info, caminho=ARQUIVO_CACHE):
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(_identidade(info), f, indent=4)
+    except Exception as e:
+        print(f"[AUTODETECT] Não foi possível salvar o cache: {e}")
+
+
+def _porta_em_cache(portas, cache):
+    """Procura a placa do cache pela identidade USB (o nome da porta pode mudar)."""
+    if not cache:
+        return None
+    if cache.get("vid") is not None:
+        for p in portas:
+            if (p.vid, p.pid, p.serial_number) == (cache.get("vid"), cache.get("pid"), cache.get("serial_number")):
+                return p
+    for p in portas:
+        if p.device == cache.get("device"):
+            return p
+    return None
+
+
+# ===============================
+# Busca
+# ===============================
+def detectar_esp(baudrate=115200, prazo=2.5, usar_cache=True, caminho_cache=ARQUIVO_CACHE):
+    """
+    Procura a ESP32 e retorna (porta, Serial aberta).
+    Levanta Exception se nenhuma placa responder ao handshake.
+    """
+    portas = list(serial.tools.list_ports.comports())
+    if not portas:
+        raise Exception("Nenhuma porta serial encontrada.")
+
+    # 1) Placa conhecida: testa sozinha primeiro
+    conhecida = _porta_em_cache(portas, ler_cache(caminho_cache)) if usar_cache else None
+    if conhecida is not None:
+        ser = sondar_porta(conhecida.device, baudrate, prazo=prazo)
+        if ser is not None:
+            print(f"[AUTODETECT] ESP32 do cache encontrada em {conhecida.device}")
+            return conhecida.device, ser
+        portas = [p for p in portas if p.device != conhecida.device]
+
+    # 2) Varredura paralela das demais
+    cancelar = threading.Event()
+    vencedora = None
+    with ThreadPoolExecutor(max_workers=max(1, len(portas)), thread_name_prefix="sonda") as executor:
+        futuros = {
+            executor.submit(sondar_porta, p.device, baudrate, prazo, 0.3, cancelar): p
+            for p in portas
+        }
+        for futuro in as_completed(futuros):
+            ser = futuro.result()
+            if ser is None:
+                continue
+            if vencedora is None:
+                vencedora = (futuros[futuro], ser)
+                cancelar.set()
+            else:
+                # Mais de uma placa respondeu: fica com a primeira
+                ser.close()
+
+    if vencedora is None:
+        raise Exception("Nenhuma ESP32 respondendo.")
+
+    info, ser = vencedora
+    salvar_cache(info, caminho_cache)
+    print(f"[AUTODETECT] ESP32 detectada em {info.device}")
+    return info.device, ser
+
+
+# ===============================
+# Reconexão
+# ===============================
+def identidade_porta(device):
+    """Identidade USB da porta aberta (para reencontrar a placa se o nome da porta mudar)."""
+    try:
+        for p in serial.tools.list_ports.comports():
+            if p.device == device:
+                return _identidade(p)
+    except Exception:
+        pass
+    return {"device": device}
+
+
+def reabrir_esp(device, identidade=None, baudrate=115200, prazo=1.0):
+    """
+    Reabre a placa depois de uma queda. Procura primeiro pela identidade
+    USB (ao reconectar o cabo a porta pode voltar com outro nome) e depois
+    pelo nome antigo; a porta só é aceita se responder ao handshake.
+    Retorna (porta, Serial aberta) ou None.
+    """
+    candidatas = []
+    try:
+        conhecida = _porta_em_cache(list(serial.tools.list_ports.comports()), identidade)
+        if conhecida is not None:
+            candidatas.append(conhecida.device)
+    except Exception:
+        pass
+    if device and device not in candidatas:
+        candidatas.append(device)
+
+    for candidata in candidatas:
+        ser = sondar_porta(candidata, baudrate, prazo=prazo)
+        if ser is not None:
+            return candidata, ser
+    return None
@@ -1,31 +1,354 @@
 # core/bateria.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from .metricas import Histograma
+
+
+class ComandoSemResposta(Exception):
+    """A ESP32 não confirmou o comando depois de todas as tentativas."""
+
+
+class _Pendente:
+    __slots__ = ("comando", "resposta", "futuro", "enviado_em", "prazo", "tentativas")
+
+    def __init__(self, comando, resposta, futuro, tentativas):
+        self.comando = comando
+        self.resposta = resposta
+        self.futuro = futuro
+        self.enviado_em = 0.0
+        self.prazo = 0.0
+        self.tentativas = tentativas
+
+
 class BateriaController:
     """
     Envia comandos via serial para a ESP32
+
+    Os comandos são escritos na hora, sem esperar a resposta do anterior
+    (vários podem estar em andamento). O firmware trata os comandos em ordem
+    e responde cada um com uma linha fixa (RESPOSTAS); o ESPReader repassa as
+    linhas que não são telemetria para receber_resposta(), que confirma o
+    comando pendente correspondente. Sem resposta dentro de `timeout`, o
+    comando é reenviado (os comandos do firmware são idempotentes) até
+    `tentativas` vezes.
+
+    Idempotentes, mas não comutativos: reenviar um comando depois de outros
+    escritos mais tarde pode deixar os relés num estado que ninguém pediu
+    (AUTO reenviado depois de CHARGE OFF/DISCH OFF volta a carregar). Por
+    isso só o comando sozinho na fila é reenviado como está. Um comando que
+    ficou sem resposta com outros depois dele é descartado se os seguintes
+    redefinem tudo o que ele define (EFEITOS); senão, o estado pedido
+    (`estado_desejado`) é reaplicado por restaurar_estado().
+
+    Cada envio retorna um concurrent.futures.Future que termina com a
+    latência de ida e volta (s) ou com ComandoSemResposta. As latências vão
+    para o histograma `latencia`.
+
+    As ações (iniciar_carga, alternar_modo...) guardam o estado de relés
+    pedido em `estado_desejado`; depois de uma reconexão restaurar_estado()
+    reaplica esse estado (a ESP pode ter reiniciado, ou desligado tudo pelo
+    timeout de USB).
     """
+    RESPOSTAS = {
+        "AUTO": b"Modo AUTOMATICO ativado.",
+        "CHARGE ON": b"Modo MANUAL: carga FORCADA ON.",
+        "CHARGE OFF": b"Modo MANUAL: carga FORCADA OFF.",
+        "DISCH ON": b"Modo MANUAL: descarga FORCADA ON.",
+        "DISCH OFF": b"Modo MANUAL: descarga FORCADA OFF.",
+        "USB ON": None,   # heartbeat: o firmware não responde
+    }
+    RESPOSTA_INVALIDO = b"Comando invalido."
+    # O que cada comando define no firmware (pela primeira palavra); todos mudam o modo
+    EFEITOS = {
+        "AUTO": frozenset(("modo", "carga", "descarga")),
+        "CHARGE": frozenset(("modo", "carga")),
+        "DISCH": frozenset(("modo", "descarga")),
+    }
+
+    TIMEOUT = 1.0
+    TENTATIVAS = 3
+
     def __init__(self, esp_reader):
         self.esp = esp_reader
+        self.latencia = Histograma()
+        self.reenvios = 0
+        self.falhas = 0
+        self.respostas_orfas = 0
+        self.substituidos = 0   # sem resposta, mas redefinidos por comandos seguintes
+        self._pendentes = deque()
+        self._referencia = 0.0   # instante da última resposta (ou do último reenvio)
+        self.estado_desejado = None   # (modo, carga, descarga) da última ação
+        self._lock = threading.Lock()
 
-    def enviar_comando(self, comando: str):
-        """Envia um comando via Serial para a ESP32"""
-        if self.esp.ser and self.esp.ser.is_open:
+    # ===============================
+    # Envio
+    # ===============================
+    def enviar(self, comando: str, timeout=None, tentativas=None, silencioso=False):
+        """Envia um comando e retorna um Future com a confirmação."""
+        return self._enviar([comando], timeout, tentativas, silencioso)[0]
+
+    def _enviar(self, comandos, timeout=None, tentativas=None, silencioso=False):
+        """Escreve os comandos numa única escrita na serial; um Future por comando."""
+        novos = []
+        for comando in comandos:
+            comando = comando.strip().upper()
+            p = _Pendente(
+                comando,
+                self.RESPOSTAS.get(comando, self.RESPOSTA_INVALIDO),
+                Future(),
+                tentativas or self.TENTATIVAS,
+            )
+            p.prazo = timeout or self.TIMEOUT
+            novos.append(p)
+
+        with self._lock:
             try:
-                self.esp.ser.write((comando + "\n").encode())
-                print(f"📤 Enviado para ESP32: {comando}")
+                self._escrever(novos)
             except Exception as e:
-                print(f"⚠️ Erro ao enviar comando '{comando}': {e}")
+                print(f"⚠️ Erro ao enviar comando(s) {', '.join(p.comando for p in novos)}: {e}")
+                for p in novos:
+                    p.futuro.set_exception(e)
+                return [p.futuro for p in novos]
+            for p in novos:
+                if p.resposta is None:
+                    p.futuro.set_result(0.0)
+                else:
+                    self._pendentes.append(p)
+
+        if not silencioso:
+            for p in novos:
+                print(f"📤 Enviado para ESP32: {p.comando}")
+        return [p.futuro for p in novos]
+
+    def _escrever(self, pendentes):
+        ser = self.esp.ser
+        if not (ser and ser.is_open):
+            raise Exception("Serial fechada")
+        agora = time.monotonic()
+        for p in pendentes:
+            p.enviado_em = agora
+        dados = b"".join((p.comando + "\n").encode() for p in pendentes)
+        ser.write(dados)
+        captura = getattr(self.esp, "captura", None)
+        if captura is not None:
+            captura.enviada(dados, agora)
 
+    def enviar_comando(self, comando: str):
+        """Envia um comando via Serial para a ESP32"""
+        return self.enviar(comando)
+
+    def enviar_sequencia(self, *comandos):
+        """Envia vários comandos de uma vez; o Future termina quando todos forem confirmados."""
+        return self._juntar(self._enviar(comandos))
+
+    @staticmethod
+    def _juntar(futuros):
+        total = Future()
+        restantes = [len(futuros)]
+        lock = threading.Lock()
+
+        def terminou(f):
+            with lock:
+                restantes[0] -= 1
+                fim = restantes[0] == 0
+            if total.done():
+                return
+            erro = f.exception()
+            if erro is not None:
+                try:
+                    total.set_exception(erro)
+                except Exception:
+                    pass
+            elif fim:
+                try:
+                    total.set_result(max(x.result() for x in futuros))
+                except Exception:
+                    pass
+
+        for f in futuros:
+            f.add_done_callback(terminou)
+        return total
+
+    # ===============================
+    # Respostas (chamado pela thread do ESPReader)
+    # ===============================
+    def receber_resposta(self, linha, t=None):
+        """
+        Confirma o comando pendente mais antigo que espera esta resposta.
+        Os comandos escritos antes dele e ainda sem resposta perderam a sua
+        (o firmware responde em ordem, então leu as linhas deles): os que
+        os comandos seguintes redefinem são dados como feitos; para os
+        outros, o estado pedido é reaplicado (ver _recuperar).
+        """
+        linha = linha.strip()
+        agora = t if t is not None else time.monotonic()
+        substituidos, recuperar = [], []
+        with self._lock:
+            for i, p in enumerate(self._pendentes):
+                if p.resposta == linha:
+                    break
+            else:
+                if linha == self.RESPOSTA_INVALIDO or linha.startswith(b"Modo "):
+                    self.respostas_orfas += 1
+                return False
+            fila = list(self._pendentes)
+            for k, perdido in enumerate(fila[:i]):
+                depois = set().union(*(self._efeito(c.comando) for c in fila[k + 1:]))
+                efeito = self._efeito(perdido.comando)
+                (substituidos if efeito and efeito <= depois else recuperar).append(perdido)
+            for _ in range(i + 1):
+                self._pendentes.popleft()
+            self._referencia = agora
+            self.substituidos += len(substituidos)
+
+        rtt = max(0.0, agora - p.enviado_em)
+        self.latencia.registrar(rtt)
+        p.futuro.set_result(rtt)
+        for perdido in substituidos:
+            perdido.futuro.set_result(max(0.0, agora - perdido.enviado_em))
+        self._recuperar(recuperar)
+        return True
+
+    @classmethod
+    def _efeito(cls, comando):
+        return cls.EFEITOS.get(comando.split(" ", 1)[0], frozenset())
+
+    def verificar_prazos(self, agora=None):
+        """
+        Reenvia o comando mais antigo se ele ficou sem resposta no prazo
+        (chamado pelo laço de leitura). Como o firmware responde em ordem,
+        só o primeiro da fila pode estar atrasado; o prazo dele conta a
+        partir do próprio envio ou da última resposta, o que for mais
+        recente, para que uma fila longa não dispare reenvios à toa.
+
+        Só é reenviado como está se não houver outro comando depois dele;
+        com a fila inteira parada, o estado pedido é reaplicado
+        (_recuperar), em vez de repetir o mais antigo depois dos outros.
+        """
+        if not self._pendentes:
+            return
+        agora = agora if agora is not None else time.monotonic()
+        falhas, recuperar = [], []
+        with self._lock:
+            if not self._pendentes:
+                return
+            p = self._pendentes[0]
+            if agora - max(p.enviado_em, self._referencia) < p.prazo:
+                return
+            self._referencia = agora
+            if len(self._pendentes) == 1:
+                self._pendentes.popleft()
+                if not self._reenviar(p):
+                    falhas.append(p)
+            else:
+                recuperar = list(self._pendentes)
+                self._pendentes.clear()
+        self._falhar(falhas)
+        self._recuperar(recuperar)
+
+    def _reenviar(self, p):
+        """Reescreve `p` no fim da fila. Retorna False se esgotou as tentativas. (com _lock)"""
+        p.tentativas -= 1
+        if p.tentativas <= 0:
+            return False
+        try:
+            self._escrever([p])
+        except Exception as e:
+            print(f"⚠️ Erro ao reenviar comando '{p.comando}': {e}")
+            return False
+        # a resposta do reenvio vem depois das que já estão em andamento
+        self._pendentes.append(p)
+        self.reenvios += 1
+        print(f"🔁 Reenviado para ESP32 (sem resposta): {p.comando}")
+        return True
+
+    def _recuperar(self, pendentes):
+        """
+        Comandos sem resposta que não podem ser repetidos como estão (havia
+        outros depois): reaplica `estado_desejado` por restaurar_estado() e
+        os Futures deles terminam com o dessa restauração. Cada recuperação
+        gasta uma tentativa; sem tentativas (ou sem estado pedido) falham.
+        (sem _lock)
+        """
+        vivos, falhas = [], []
+        for p in pendentes:
+            p.tentativas -= 1
+            (vivos if p.tentativas > 0 else falhas).append(p)
+        restauracao = None
+        if vivos and self.estado_desejado is not None:
+            print(f"🔁 Reaplicando estado na ESP32 (sem resposta): {', '.join(p.comando for p in vivos)}")
+            # a restauração herda as tentativas que sobraram, para não reaplicar para sempre
+            restauracao = self.restaurar_estado(tentativas=min(p.tentativas for p in vivos))
+        if restauracao is None:
+            falhas += vivos
+            vivos = []
+        self._falhar(falhas)
+        if not vivos:
+            return
+        self.reenvios += len(vivos)
+
+        def repassar(f, vivos=vivos):
+            for p in vivos:
+                if f.exception() is not None:
+                    p.futuro.set_exception(f.exception())
+                else:
+                    p.futuro.set_result(f.result())
+
+        restauracao.add_done_callback(repassar)
+
+    def _falhar(self, pendentes):
+        for p in pendentes:
+            self.falhas += 1
+            p.futuro.set_exception(ComandoSemResposta(f"ESP32 não confirmou '{p.comando}'"))
+
+    def cancelar_pendentes(self, motivo="Conexão encerrada"):
+        with self._lock:
+            pendentes = list(self._pendentes)
+            self._pendentes.clear()
+        for p in pendentes:
+            p.futuro.set_exception(ComandoSemResposta(f"{motivo}: '{p.comando}'"))
+
+    @property
+    def pendentes(self):
+        return len(self._pendentes)
+
+    # ===============================
+    # Ações
+    # ===============================
     def iniciar_carga(self):
-        self.enviar_comando("CHARGE ON")
-        self.enviar_comando("DISCH OFF")
+        self.estado_desejado = ("MANUAL", "ON", "OFF")
+        return self.enviar_sequencia("CHARGE ON", "DISCH OFF")
 
     def iniciar_descarga(self):
-        self.enviar_comando("DISCH ON")
-        self.enviar_comando("CHARGE OFF")
+        self.estado_desejado = ("MANUAL", "OFF", "ON")
+        return self.enviar_sequencia("DISCH ON", "CHARGE OFF")
 
     def alternar_modo(self):
-        self.enviar_comando("AUTO")
+        self.estado_desejado = ("AUTO", None, None)
+        return self.enviar("AUTO")
 
     def desligar_tudo(self):
-        self.enviar_comando("CHARGE OFF")
-        self.enviar_comando("DISCH OFF")
\ No newline at end of file
+        self.estado_desejado = ("MANUAL", "OFF", "OFF")
+        return self.enviar_sequencia("CHARGE OFF", "DISCH OFF")
+
+    def restaurar_estado(self, modo=None, carga=None, descarga=None, tentativas=None):
+        """
+        Reaplica o estado dos relés: o da última ação, ou, se nenhuma ação
+        foi enviada nesta sessão, o estado informado (último quadro lido).
+        Desliga antes de ligar, para nunca ter carga e descarga juntas.
+        `tentativas` limita os reenvios dos comandos da restauração.
+        """
+        if self.estado_desejado is not None:
+            modo, carga, descarga = self.estado_desejado
+        if modo is None:
+            return None
+        if modo == "AUTO":
+            self.estado_desejado = ("AUTO", None, None)
+            return self._juntar(self._enviar(["AUTO"], tentativas=tentativas))
+        comandos = [f"CHARGE {carga}", f"DISCH {descarga}"]
+        comandos.sort(key=lambda c: not c.endswith("OFF"))
+        self.estado_desejado = ("MANUAL", carga, descarga)
+        return self._juntar(self._enviar(comandos, tentativas=tentativas))
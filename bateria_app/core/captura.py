@@ -0,0 +1,94 @@
+# core/captura.py
+"""
+Captura do fluxo cru da serial, com tempo, para reproduzir depois com
+replay:// (core/urlhandler/protocol_replay.py).
+
+Arquivo texto, uma linha por linha da serial:
+
+    # captura bateria_app 1 2026-10-18 14:02:11 porta=/dev/ttyUSB0
+    0.000000 < Vbat: 3.874 V | Mode: AUTO | Charge: ON | Disch: OFF | Corrente: 0.123 A
+    0.104812 > CHARGE ON
+    0.112530 < Modo MANUAL: carga FORCADA ON.
+
+O tempo é em segundos desde o início da captura; "<" é o que a ESP32
+enviou, ">" o que o aplicativo enviou. Os bytes da linha vão com escape
+unicode_escape (\\r, \\x00...), então a linha original volta byte a byte.
+"""
+import threading
+import time
+
+VERSAO = 1
+RECEBIDA = "<"
+ENVIADA = ">"
+
+
+def _escapar(linha):
+    return linha.decode("latin-1").encode("unicode_escape").decode("ascii")
+
+
+def _desescapar(texto):
+    return texto.encode("ascii").decode("unicode_escape").encode("latin-1")
+
+
+class GravadorCaptura:
+    """
+    Grava as linhas recebidas e os comandos enviados de uma sessão.
+    Chamado pela thread de leitura (recebida) e por quem envia comandos
+    (enviada), por isso as escritas passam por um lock. O arquivo é
+    descarregado a cada `intervalo_flush` segundos e ao fechar.
+    """
+
+    def __init__(self, caminho, porta=None, intervalo_flush=1.0):
+        self.caminho = caminho
+        self.t0 = time.monotonic()
+        self.linhas = 0
+        self.intervalo_flush = intervalo_flush
+        self._ultimo_flush = self.t0
+        self._lock = threading.Lock()
+        self._arquivo = open(caminho, "w", encoding="ascii", newline="\n")
+        self._arquivo.write(
+            f"# captura bateria_app {VERSAO} {time.strftime('%Y-%m-%d %H:%M:%S')} porta={porta or '---'}\n"
+        )
+
+    def recebida(self, linha, t):
+        """Linha crua (bytes, sem \\n) recebida em `t` (monotonic)."""
+        self._escrever(RECEBIDA, linha, t)
+
+    def enviada(self, dados, t):
+        """Bytes escritos na serial em `t` (um comando por linha)."""
+        for linha in dados.split(b"\n"):
+            if linha:
+                self._escrever(ENVIADA, linha, t)
+
+    def _escrever(self, direcao, linha, t):
+        with self._lock:
+            if self._arquivo is None:
+                return
+            self._arquivo.write(f"{t - self.t0:.6f} {direcao} {_escapar(linha)}\n")
+            self.linhas += 1
+            if t - self._ultimo_flush >= self.intervalo_flush:
+                self._ultimo_flush = t
+                self._arquivo.flush()
+
+    def fechar(self):
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+
+
+def ler_captura(caminho):
+    """Gera (tempo, direção, linha em bytes) de uma captura, ignorando linhas inválidas."""
+    with open(caminho, "r", encoding="ascii", errors="replace") as f:
+        for texto in f:
+            if texto.startswith("#"):
+                continue
+            partes = texto.rstrip("\n").split(" ", 2)
+            if len(partes) < 2:
+                continue
+            try:
+                t = float(partes[0])
+                linha = _desescapar(partes[2]) if len(partes) == 3 else b""
+            except (ValueError, UnicodeError):
+                continue
+            yield t, partes[1], linha
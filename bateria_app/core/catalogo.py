@@ -0,0 +1,294 @@
+# core/catalogo.py
+"""
+Catálogo das gravações de uma pasta de dados: uma linha por gravação
+com bateria, tipo de teste, início, duração, amostras, ciclos, tensão
+mínima/máxima e tamanho do arquivo, num SQLite ao lado das gravações
+(assets/dados/catalogo.sqlite).
+
+Preenchido de duas formas:
+  - durante a gravação: o ESPReader registra bateria/tipo/início em
+    definir_csv() e o gravador vai acumulando o resumo das linhas que
+    escreve (ResumoGravacao), publicado a cada INTERVALO s e ao fechar;
+  - para arquivos antigos ou gravados por fora: sincronizar() lê em
+    paralelo só os arquivos novos ou alterados (tamanho/mtime diferentes
+    do registrado) e remove os que sumiram. Os processos partem de um
+    forkserver (spawn no Windows), nunca de fork: sincronizar() roda numa
+    thread da interface, e um fork com Tk e leitores rodando pode herdar
+    um lock travado. Os filhos reimportam o main.py, que por isso só
+    carrega a interface dentro do `if __name__ == "__main__"`.
+
+A tela de histórico lista, ordena e filtra pelo catálogo sem abrir
+nenhum CSV.
+
+sqlite3 é da biblioteca padrão; o numpy só é importado por resumir_arquivo
+(o cli.py grava pelo catálogo sem carregá-lo).
+"""
+import math
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ARQUIVO_CATALOGO = "catalogo.sqlite"
+
+CAMPOS = ("arquivo", "bateria", "tipo", "inicio", "duracao", "amostras", "ciclos",
+          "v_min", "v_max", "tamanho", "mtime_ns")
+# Calculados a partir do conteúdo (o resto vem de quem gravou)
+CAMPOS_RESUMO = ("duracao", "amostras", "ciclos", "v_min", "v_max", "tamanho", "mtime_ns")
+
+_TABELA = """
+CREATE TABLE IF NOT EXISTS gravacoes (
+    arquivo  TEXT PRIMARY KEY,
+    bateria  TEXT,
+    tipo     TEXT,
+    inicio   REAL,
+    duracao  REAL,
+    amostras INTEGER,
+    ciclos   INTEGER,
+    v_min    REAL,
+    v_max    REAL,
+    tamanho  INTEGER,
+    mtime_ns INTEGER
+)
+"""
+
+
+class Catalogo:
+    """
+    Acesso ao catálogo de uma pasta. Cada operação abre a própria conexão
+    (barata no SQLite), então pode ser usado da UI, do ESPReader e do
+    gravador ao mesmo tempo; o modo WAL deixa a tela ler enquanto o
+    gravador escreve.
+    """
+    MINIMO_PARALELO = 4   # arquivos pendentes a partir dos quais sincronizar() usa processos
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.caminho = os.path.join(pasta, ARQUIVO_CATALOGO)
+        os.makedirs(pasta, exist_ok=True)
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(_TABELA)
+
+    def _conectar(self):
+        con = sqlite3.connect(self.caminho, timeout=10)
+        con.row_factory = sqlite3.Row
+        return con
+
+    def registrar(self, arquivo, **campos):
+        """Cria ou atualiza a linha de `arquivo` (nome dentro da pasta) só com os campos dados."""
+        with self._conectar() as con:
+            _gravar(con, os.path.basename(arquivo), campos)
+
+    def obter(self, arquivo):
+        """Linha de `arquivo` como dicionário (None se não catalogado)."""
+        with self._conectar() as con:
+            linha = con.execute("SELECT * FROM gravacoes WHERE arquivo = ?",
+                                (os.path.basename(arquivo),)).fetchone()
+        return dict(linha) if linha else None
+
+    def listar(self, filtro="", ordem="inicio", decrescente=True):
+        """
+        Linhas do catálogo (dicionários). `filtro` procura o texto no nome
+        do arquivo, na bateria e no tipo; `ordem` é um dos CAMPOS.
+        """
+        if ordem not in CAMPOS:
+            raise ValueError(f"Campo de ordenação desconhecido: {ordem}")
+        sql = "SELECT * FROM gravacoes"
+        parametros = ()
+        if filtro:
+            sql += " WHERE arquivo LIKE ? OR bateria LIKE ? OR tipo LIKE ?"
+            parametros = (f"%{filtro}%",) * 3
+        # NULLs sempre no fim, em qualquer direção
+        sql += f" ORDER BY {ordem} IS NULL, {ordem} {'DESC' if decrescente else 'ASC'}"
+        with self._conectar() as con:
+            return [dict(l) for l in con.execute(sql, parametros)]
+
+    def remover(self, arquivos):
+        with self._conectar() as con:
+            con.executemany("DELETE FROM gravacoes WHERE arquivo = ?",
+                            [(os.path.basename(a),) for a in arquivos])
+
+    def sincronizar(self, nomes, trabalhadores=None):
+        """
+        Deixa o catálogo de acordo com as gravações `nomes` da pasta: resume
+        em paralelo (processos) as novas ou alteradas desde o último
+        registro e apaga as linhas de arquivos que não existem mais.
+        Retorna quantas gravações foram (re)lidas.
+        """
+        conhecidas = {l["arquivo"]: l for l in self.listar()}
+        pendentes = []
+        for nome in nomes:
+            try:
+                info = os.stat(os.path.join(self.pasta, nome))
+            except OSError:
+                continue
+            linha = conhecidas.get(nome)
+            if linha is None or (linha["tamanho"], linha["mtime_ns"]) != (info.st_size, info.st_mtime_ns):
+                pendentes.append(nome)
+        sumidas = set(conhecidas) - set(nomes)
+        if sumidas:
+            self.remover(sumidas)
+        if not pendentes:
+            return 0
+
+        caminhos = [os.path.join(self.pasta, nome) for nome in pendentes]
+        trabalhadores = trabalhadores or os.cpu_count() or 1
+        if len(caminhos) < self.MINIMO_PARALELO or trabalhadores == 1:
+            # poucos arquivos (ou uma CPU só): abrir os processos custaria mais que ler
+            resumos = map(resumir_arquivo, caminhos)
+            self._registrar_resumos(pendentes, resumos, conhecidas)
+        else:
+            with ProcessPoolExecutor(max_workers=trabalhadores, mp_context=_contexto_processos()) as executor:
+                resumos = executor.map(resumir_arquivo, caminhos, chunksize=4)
+                self._registrar_resumos(pendentes, resumos, conhecidas)
+        return len(pendentes)
+
+    def _registrar_resumos(self, nomes, resumos, conhecidas):
+        linhas = []
+        for nome, resumo in zip(nomes, resumos):
+            if resumo is None:
+                # ilegível: registra só tamanho/mtime, para não ser relido a
+                # cada sincronização até o arquivo mudar
+                try:
+                    info = os.stat(os.path.join(self.pasta, nome))
+                except OSError:
+                    continue
+                resumo = dict.fromkeys(CAMPOS_RESUMO)
+                resumo.update(tamanho=info.st_size, mtime_ns=info.st_mtime_ns)
+                linhas.append((nome, resumo))
+                continue
+            if nome not in conhecidas:
+                # sem registro de quem gravou: início estimado pelo fim do arquivo
+                resumo["inicio"] = resumo["mtime_ns"] / 1e9 - (resumo["duracao"] or 0)
+            linhas.append((nome, resumo))
+        with self._conectar() as con:
+            for nome, resumo in linhas:
+                _gravar(con, nome, resumo)
+
+
+def _gravar(con, arquivo, campos):
+    """INSERT ... ON CONFLICT DO UPDATE só com os campos dados (os outros ficam como estão)."""
+    campos = {k: v for k, v in campos.items() if k in CAMPOS and k != "arquivo"}
+    nomes = ", ".join(("arquivo",) + tuple(campos))
+    marcas = ", ".join("?" * (len(campos) + 1))
+    atualizar = ", ".join(f"{k} = excluded.{k}" for k in campos) or "arquivo = arquivo"
+    con.execute(
+        f"INSERT INTO gravacoes ({nomes}) VALUES ({marcas}) "
+        f"ON CONFLICT(arquivo) DO UPDATE SET {atualizar}",
+        (arquivo, *campos.values()),
+    )
+
+
+def _contexto_processos():
+    """forkserver onde existe (Linux/macOS); no Windows só há spawn."""
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(metodo)
+
+
+def resumir_arquivo(caminho):
+    """
+    Campos de CAMPOS_RESUMO de uma gravação já existente, lendo o arquivo
+    (core/historico.py). Roda nos processos de Catalogo.sincronizar, então
+    fica no nível do módulo. Retorna None se o arquivo não puder ser lido.
+    """
+    from .formato_binario import FormatoBinario
+    from .historico import ler_binario, ler_csv
+
+    try:
+        info = os.stat(caminho)
+        if caminho.lower().endswith(FormatoBinario.extensao):
+            colunas = ler_binario(caminho)
+        else:
+            colunas = ler_csv(caminho)
+    except Exception as e:
+        print(f"[CATALOGO] Não foi possível resumir {os.path.basename(caminho)}: {e}")
+        return None
+    tempo, tensao = colunas["tempo"], colunas["tensao"]
+    vazio = not len(tempo)
+    ciclo = colunas.get("ciclo")
+    return {
+        "duracao": None if vazio else float(tempo[-1]),
+        "amostras": int(len(tempo)),
+        # a coluna Ciclo guarda o ciclo em andamento, começando em 0
+        "ciclos": int(ciclo.max()) + 1 if ciclo is not None and len(ciclo) and ciclo.max() == ciclo.max() else None,
+        "v_min": None if vazio else float(tensao.min()),
+        "v_max": None if vazio else float(tensao.max()),
+        "tamanho": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+    }
+
+
+class ResumoGravacao:
+    """
+    Resumo de uma gravação em andamento, acumulado pelo gravador a cada
+    lote escrito (sem reler o arquivo) e publicado no catálogo a cada
+    INTERVALO s e ao fechar. Ao retomar um teste, começa do resumo já
+    registrado.
+    """
+    INTERVALO = 60.0
+
+    def __init__(self, catalogo, caminho):
+        self.catalogo = catalogo
+        self.caminho = caminho
+        self.amostras = 0
+        self.duracao = None
+        self.ciclos = None
+        self.v_min = math.inf
+        self.v_max = -math.inf
+        self._publicado = time.monotonic()
+        self._trava = threading.Lock()
+
+    def continuar(self, linha):
+        """Parte do resumo já catalogado (teste retomado)."""
+        if not linha:
+            return
+        self.amostras = linha.get("amostras") or 0
+        self.duracao = linha.get("duracao")
+        self.ciclos = linha.get("ciclos")
+        if linha.get("v_min") is not None:
+            self.v_min = linha["v_min"]
+            self.v_max = linha["v_max"]
+
+    def acrescentar(self, registros):
+        """registros: lista de (tempo relativo, Amostra, ciclo), como no gravador."""
+        if not registros:
+            return
+        medidas = [a.tensao for _, a, _ in registros if a.tensao == a.tensao]
+        with self._trava:
+            if medidas:
+                self.amostras += len(medidas)
+                self.v_min = min(self.v_min, min(medidas))
+                self.v_max = max(self.v_max, max(medidas))
+            self.duracao = registros[-1][0]
+            self.ciclos = max(self.ciclos or 0, max(c for _, _, c in registros) + 1)
+
+    def campos(self):
+        with self._trava:
+            medido = self.v_min <= self.v_max
+            return {
+                "duracao": self.duracao,
+                "amostras": self.amostras,
+                "ciclos": self.ciclos,
+                "v_min": self.v_min if medido else None,
+                "v_max": self.v_max if medido else None,
+            }
+
+    def publicar(self, forcar=False):
+        """Grava o resumo no catálogo (só se INTERVALO já passou, a não ser com forcar)."""
+        agora = time.monotonic()
+        if not forcar and agora - self._publicado < self.INTERVALO:
+            return
+        self._publicado = agora
+        campos = self.campos()
+        try:
+            info = os.stat(self.caminho)
+            campos.update(tamanho=info.st_size, mtime_ns=info.st_mtime_ns)
+        except OSError:
+            pass
+        try:
+            self.catalogo.registrar(self.caminho, **campos)
+        except sqlite3.Error as e:
+            print(f"[CATALOGO] Não foi possível atualizar {os.path.basename(self.caminho)}: {e}")
@@ -0,0 +1,109 @@
+# core/decimacao.py
+import math
+
+
+class DecimadorN:
+    """Mantém uma amostra a cada `n` recebidas (a primeira de cada grupo)."""
+
+    def __init__(self, n):
+        self.n = max(1, int(n))
+        self._contador = 0
+
+    def alimentar(self, amostra):
+        manter = self._contador == 0
+        self._contador = (self._contador + 1) % self.n
+        return [amostra] if manter else []
+
+    def finalizar(self):
+        return []
+
+    def __repr__(self):
+        return f"n:{self.n}"
+
+
+class DecimadorJanela:
+    """
+    Agrega as amostras em janelas fixas de `periodo` segundos (alinhadas à
+    origem `t0`) e emite uma amostra por janela com a estatística escolhida
+    ("media", "min" ou "max") aplicada à tensão e à corrente. O estado dos
+    relés e o tempo emitidos são os da última amostra da janela.
+    """
+    ESTATISTICAS = ("media", "min", "max")
+
+    def __init__(self, periodo, estatistica="media", t0=0.0):
+        if estatistica not in self.ESTATISTICAS:
+            raise ValueError(f"Estatística inválida: {estatistica}")
+        self.periodo = float(periodo)
+        if self.periodo <= 0:
+            raise ValueError("O período da janela deve ser positivo.")
+        self.estatistica = estatistica
+        self.t0 = t0
+        self._janela = None
+        self._zerar()
+
+    def _zerar(self):
+        self._n = 0
+        self._n_corrente = 0
+        self._soma_v = self._soma_i = 0.0
+        self._min_v = self._min_i = math.inf
+        self._max_v = self._max_i = -math.inf
+        self._ultima = None
+
+    def alimentar(self, amostra):
+        janela = math.floor((amostra.t - self.t0) / self.periodo)
+        saida = []
+        if self._janela is not None and janela != self._janela:
+            saida = self.finalizar()
+        self._janela = janela
+
+        v = amostra.tensao
+        self._n += 1
+        self._soma_v += v
+        self._min_v = min(self._min_v, v)
+        self._max_v = max(self._max_v, v)
+        i = amostra.corrente
+        if i is not None:
+            self._n_corrente += 1
+            self._soma_i += i
+            self._min_i = min(self._min_i, i)
+            self._max_i = max(self._max_i, i)
+        self._ultima = amostra
+        return saida
+
+    def finalizar(self):
+        """Emite a janela em aberto (chamado ao trocar de janela ou ao parar)."""
+        if self._ultima is None:
+            return []
+        if self.estatistica == "media":
+            tensao = self._soma_v / self._n
+            corrente = self._soma_i / self._n_corrente if self._n_corrente else None
+        elif self.estatistica == "min":
+            tensao = self._min_v
+            corrente = self._min_i if self._n_corrente else None
+        else:
+            tensao = self._max_v
+            corrente = self._max_i if self._n_corrente else None
+        agregada = self._ultima._replace(tensao=tensao, corrente=corrente)
+        self._zerar()
+        return [agregada]
+
+    def __repr__(self):
+        return f"{self.estatistica}:{self.periodo:g}"
+
+
+def criar_decimador(spec, t0=0.0):
+    """
+    Cria um decimador a partir de um texto de configuração:
+      None / "" / "todas"  -> grava todas as amostras (retorna None)
+      "n:10"               -> 1 a cada 10 amostras
+      "media:1"            -> média por janela de 1 s (também "min:5", "max:0.5")
+    """
+    if not spec or spec == "todas":
+        return None
+    tipo, _, valor = str(spec).partition(":")
+    tipo = tipo.strip().lower()
+    if tipo == "n":
+        return DecimadorN(int(valor))
+    if tipo in DecimadorJanela.ESTATISTICAS:
+        return DecimadorJanela(float(valor), tipo, t0=t0)
+    raise ValueError(f"Decimação desconhecida: {spec}")
@@ -0,0 +1,202 @@
+# core/diario.py
+import json
+import os
+import zlib
+
+# Diário da sessão em andamento (usado pela UI e pelo cli.py para retomar o teste)
+ARQUIVO_SESSAO = os.path.join(os.getcwd(), "assets", "dados", "simulacao_log.diario")
+
+
+class DiarioSessao:
+    """
+    Diário (journal) da sessão de teste, só de acréscimo.
+
+    Cada evento é uma linha "<crc32 em hex> <json>\\n". Um tique de tempo custa
+    uma linha pequena em vez de reescrever o arquivo inteiro. Para recuperar
+    a sessão após uma queda, recuperar() reaplica os eventos em ordem; um
+    registro final cortado (ou com CRC inválido) é detectado e ignorado.
+    De tempos em tempos o diário é compactado num único evento "estado".
+
+    Eventos:
+      inicio / estado    -> estado completo (substitui tudo)
+      ciclo              -> ciclo_atual
+      descanso_inicio    -> descanso_restante
+      descanso_fim       -> zera descanso_restante
+      tempo              -> tempo_decorrido (e descanso_restante, se houver)
+    """
+    # Eventos importantes vão para o disco na hora (fsync); tiques só com flush
+    EVENTOS_DURAVEIS = ("inicio", "estado", "ciclo", "descanso_inicio", "descanso_fim", "porta")
+
+    def __init__(self, caminho, compactar_a_cada=600):
+        self.caminho = caminho
+        self.compactar_a_cada = compactar_a_cada
+        self.estado = {}
+        self._arquivo = None
+        self._registros = 0
+
+    # ---------- escrita ----------
+    def iniciar(self, estado):
+        """Começa um diário novo (descarta o anterior) com o estado completo."""
+        self.fechar()
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        self._arquivo = open(self.caminho, "wb")
+        self.estado = {}
+        self._registros = 0
+        self.registrar("inicio", **estado)
+
+    def continuar(self):
+        """Reabre um diário existente para acrescentar eventos após uma retomada."""
+        self.fechar()
+        self.estado, validos, fim_valido = self._reproduzir(self.caminho)
+        # Corta o registro final incompleto antes de acrescentar
+        with open(self.caminho, "rb+") as f:
+            f.truncate(fim_valido)
+        self._arquivo = open(self.caminho, "ab")
+        self._registros = validos
+        return self.estado
+
+    def registrar(self, evento, **dados):
+        """Acrescenta um evento e o aplica ao estado em memória."""
+        if self._arquivo is None:
+            return
+        dados["evento"] = evento
+        corpo = json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._arquivo.write(b"%08x %s\n" % (zlib.crc32(corpo), corpo))
+        self._arquivo.flush()
+        if evento in self.EVENTOS_DURAVEIS:
+            os.fsync(self._arquivo.fileno())
+        self._aplicar(self.estado, dados)
+        self._registros += 1
+
+        if self._registros >= self.compactar_a_cada:
+            self.compactar()
+
+    def compactar(self):
+        """Reescreve o diário como um único evento "estado" (troca atômica)."""
+        if self._arquivo is None:
+            return
+        estado = dict(self.estado)
+        estado["evento"] = "estado"
+        corpo = json.dumps(estado, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "wb") as f:
+            f.write(b"%08x %s\n" % (zlib.crc32(corpo), corpo))
+            f.flush()
+            os.fsync(f.fileno())
+        self._arquivo.close()
+        os.replace(temporario, self.caminho)
+        self._arquivo = open(self.caminho, "ab")
+        self._registros = 1
+
+    def fechar(self):
+        if self._arquivo is not None:
+            try:
+                self._arquivo.close()
+            except Exception:
+                pass
+            self._arquivo = None
+
+    def apagar(self):
+        self.fechar()
+        if os.path.exists(self.caminho):
+            try:
+                os.remove(self.caminho)
+            except Exception as e:
+                print(f"[DIARIO] Erro ao apagar diário: {e}")
+
+    @property
+    def ativo(self):
+        return self._arquivo is not None
+
+    # ---------- leitura ----------
+    @classmethod
+    def recuperar(cls, caminho):
+        """Retorna o último estado da sessão gravada em `caminho`, ou None."""
+        cls.migrar_legado(caminho)
+        if not os.path.exists(caminho):
+            return None
+        estado, validos, _ = cls._reproduzir(caminho)
+        return estado if validos else None
+
+    @classmethod
+    def migrar_legado(cls, caminho):
+        """
+        Converte o log JSON das versões anteriores (simulacao_log.json, ao
+        lado do diário) num diário com um evento "estado", para uma sessão
+        interrompida antes da atualização ainda poder ser retomada. Só age
+        se o diário ainda não existe; o JSON é apagado depois de convertido.
+        """
+        legado = os.path.splitext(caminho)[0] + ".json"
+        if os.path.exists(caminho) or not os.path.exists(legado):
+            return
+        try:
+            with open(legado, "r", encoding="utf-8") as f:
+                estado = json.load(f)
+            if not isinstance(estado, dict):
+                raise ValueError("conteúdo não é um objeto JSON")
+        except (OSError, ValueError) as e:
+            print(f"[DIARIO] Log antigo {os.path.basename(legado)} ignorado: {e}")
+            return
+        estado["evento"] = "estado"
+        corpo = json.dumps(estado, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        temporario = caminho + ".tmp"
+        try:
+            with open(temporario, "wb") as f:
+                f.write(b"%08x %s\n" % (zlib.crc32(corpo), corpo))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, caminho)
+            os.remove(legado)
+        except OSError as e:
+            print(f"[DIARIO] Não foi possível converter {os.path.basename(legado)}: {e}")
+            return
+        print(f"[DIARIO] Log antigo {os.path.basename(legado)} convertido para {os.path.basename(caminho)}")
+
+    @classmethod
+    def _reproduzir(cls, caminho):
+        """
+        Reaplica os eventos válidos. Retorna (estado, nº de eventos válidos,
+        posição do fim do último evento válido).
+        """
+        estado = {}
+        validos = 0
+        fim_valido = 0
+        posicao = 0
+        with open(caminho, "rb") as f:
+            for linha in f:
+                posicao += len(linha)
+                dados = cls._decodificar(linha)
+                if dados is None:
+                    if linha.endswith(b"\n"):
+                        print(f"[DIARIO] Registro corrompido ignorado em {caminho}")
+                    else:
+                        print(f"[DIARIO] Registro final incompleto ignorado em {caminho}")
+                    continue
+                cls._aplicar(estado, dados)
+                validos += 1
+                fim_valido = posicao
+        return estado, validos, fim_valido
+
+    @staticmethod
+    def _decodificar(linha):
+        if not linha.endswith(b"\n") or len(linha) < 10 or linha[8:9] != b" ":
+            return None
+        corpo = linha[9:-1]
+        try:
+            if int(linha[:8], 16) != zlib.crc32(corpo):
+                return None
+            return json.loads(corpo.decode("utf-8"))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _aplicar(estado, dados):
+        evento = dados.get("evento")
+        campos = {k: v for k, v in dados.items() if k != "evento"}
+        if evento in ("inicio", "estado"):
+            estado.clear()
+            estado.update(campos)
+        elif evento == "descanso_fim":
+            estado["descanso_restante"] = 0
+        else:
+            estado.update(campos)
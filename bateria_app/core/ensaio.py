@@ -0,0 +1,153 @@
+# core/ensaio.py
+import time
+
+
+def _tensao(valor):
+    """Converte "4,205" / "4.205" / 4.205 em float (0.0 se vazio ou inválido)."""
+    try:
+        return float(str(valor).replace(",", ".") or 0)
+    except Exception:
+        return 0.0
+
+
+class ControleEnsaio:
+    """
+    Regras do teste, sem interface: término por tensão no teste de
+    carga/descarga e contagem de ciclos com descanso no teste de ciclos.
+    Usado pela TelaMonitoramento e pelo executor de linha de comando
+    (cli.py), então não importa Tk nem matplotlib.
+
+    tique(amostra) deve ser chamado uma vez por segundo (o descanso é
+    contado em tiques). Retorna a mensagem de término quando o teste
+    acaba, senão None. Os comandos à ESP saem pelo BateriaController do
+    `esp`; os eventos da sessão (ciclo, descanso) vão para `registrar`,
+    normalmente DiarioSessao.registrar.
+    """
+    TOLERANCIA = 0.01  # 10 mV
+
+    def __init__(self, esp, tipo, dados_bateria=None, ciclos_totais=0, descanso=60, registrar=None):
+        self.esp = esp
+        self.tipo = (tipo or "").lower().strip()
+        dados_bateria = dados_bateria or {}
+        self.tensao_carga = _tensao(dados_bateria.get("tensao_carga", ""))
+        self.tensao_descarga = _tensao(dados_bateria.get("tensao_descarga", ""))
+        self.ciclos_totais = int(ciclos_totais or 0)
+        self.descanso = int(descanso or 0)
+        self.registrar = registrar or (lambda evento, **dados: None)
+
+        self.ciclo_atual = 0
+        self.descanso_em_andamento = False
+        self.tempo_restante_descanso = 0
+        # para detectar transições de carga/descarga
+        self._prev_carga_state = None
+        self._prev_disch_state = None
+
+    def retomar(self, ciclo_atual=0, descanso_restante=0):
+        """Restaura o andamento salvo no diário da sessão."""
+        self.ciclo_atual = int(ciclo_atual or 0)
+        descanso_restante = int(descanso_restante or 0)
+        self.descanso_em_andamento = descanso_restante > 0
+        self.tempo_restante_descanso = descanso_restante if descanso_restante > 0 else 0
+
+    def _comando(self, acao):
+        try:
+            return getattr(self.esp.bateria_controller, acao)()
+        except Exception:
+            return None
+
+    # =========================
+    # Tique (1 s)
+    # =========================
+    def tique(self, amostra):
+        tolerancia = self.TOLERANCIA
+
+        # --- Teste de carga ---
+        if self.tipo == "carga" and self.tensao_carga > 0:
+            if amostra.tensao >= (self.tensao_carga - tolerancia):
+                return "Tensão de carga atingida. Teste finalizado."
+
+        # --- Teste de descarga ---
+        if self.tipo == "carga" and self.tensao_descarga > 0:
+            if amostra.tensao <= (self.tensao_descarga + tolerancia):
+                return "Tensão de descarga atingida. Teste finalizado."
+
+        if self.tipo == "ciclos":
+            return self._tique_ciclos(amostra)
+        return None
+
+    def _tique_ciclos(self, amostra):
+        # DESCANSO
+        if self.descanso_em_andamento:
+            self.tempo_restante_descanso -= 1
+            if self.tempo_restante_descanso <= 0:
+                self.descanso_em_andamento = False
+                self.registrar("descanso_fim")
+
+                self._prev_carga_state = amostra.carga
+                self._prev_disch_state = amostra.descarga
+
+                self._comando("alternar_modo")
+            return None
+
+        charge = amostra.carga
+        disch = amostra.descarga
+
+        if self._prev_carga_state is None:
+            self._prev_carga_state = charge
+            self._prev_disch_state = disch
+            return None
+
+        troca_valida = (
+            self._prev_disch_state == "ON" and disch == "OFF" and charge == "ON"
+        ) or (
+            self._prev_carga_state == "ON" and charge == "OFF" and disch == "ON"
+        )
+
+        # Atualiza estados
+        self._prev_carga_state = charge
+        self._prev_disch_state = disch
+
+        if not troca_valida:
+            return None
+
+        self.ciclo_atual += 1
+        # atualiza cache do ESP para a gravação
+        try:
+            self.esp.set_ciclo(self.ciclo_atual)
+        except Exception:
+            pass
+        self.registrar("ciclo", ciclo_atual=self.ciclo_atual)
+
+        if self.ciclos_totais and self.ciclo_atual >= self.ciclos_totais:
+            return "Todos os ciclos concluídos. Teste finalizado."
+
+        self.descanso_em_andamento = True
+        self.tempo_restante_descanso = self.descanso
+        self.registrar("descanso_inicio", descanso_restante=self.descanso)
+
+        self._comando("desligar_tudo")
+        return None
+
+
+def estado_sessao(simulacao_dados, ensaio, tempo_decorrido):
+    """Estado completo gravado no diário da sessão (mesmas chaves do log antigo)."""
+    dados_bateria = simulacao_dados.get("dados_bateria", {}) or {}
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "bateria": dados_bateria.get("nome", "---"),
+        "capacidade": dados_bateria.get("capacidade", "---"),
+        "serial": simulacao_dados.get("porta", "---"),
+        "arquivo_csv": simulacao_dados.get("csv", "---"),
+        "modo": simulacao_dados.get("tipo", "---"),
+
+        # 🔹 ciclos
+        "ciclos_totais": ensaio.ciclos_totais,
+        "ciclo_atual": ensaio.ciclo_atual,
+
+        # 🔹 descanso
+        "descanso": int(simulacao_dados.get("descanso", 0)),
+        "descanso_restante": int(ensaio.tempo_restante_descanso) if ensaio.descanso_em_andamento else 0,
+
+        # 🔹 tempo
+        "tempo_decorrido": int(tempo_decorrido)
+    }
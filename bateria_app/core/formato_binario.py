@@ -0,0 +1,200 @@
+# core/formato_binario.py
+"""
+Formato binário de gravação (.bin), alternativo ao CSV.
+
+Cabeçalho (24 bytes, little-endian):
+    8s  assinatura b"BATREC1\\0"
+    H   versão do formato (1)
+    H   tamanho de cada registro em bytes (19)
+    I   reservado (0)
+    d   criação do arquivo (time.time())
+
+Registros de tamanho fixo, sem alinhamento (19 bytes):
+    d   tempo desde o início do teste (s)
+    f   tensão (V)
+    f   corrente (A), NaN quando o firmware não envia
+    B   estado: bit0 modo AUTO, bit1 carga ON, bit2 descarga ON,
+            bit3 marca de lacuna (queda da conexão; tensão NaN)
+    H   ciclo
+
+Pode ser lido direto com numpy.memmap(dtype=DTYPE_NUMPY, offset=TAMANHO_CABECALHO)
+ou convertido para o CSV histórico com exportar_csv().
+"""
+import csv
+import math
+import os
+import struct
+import sys
+import time
+
+from .amostra import MODO_LACUNA
+from .gravador import CABECALHO_CSV
+
+ASSINATURA = b"BATREC1\0"
+VERSAO = 1
+_CABECALHO = struct.Struct("<8sHHId")
+_REGISTRO = struct.Struct("<dffBH")
+_F32 = struct.Struct("<f")
+
+TAMANHO_CABECALHO = _CABECALHO.size
+TAMANHO_REGISTRO = _REGISTRO.size
+
+BIT_AUTO = 1
+BIT_CARGA = 2
+BIT_DESCARGA = 4
+BIT_LACUNA = 8
+
+# Campos para numpy (o import do numpy fica por conta de quem usa)
+DTYPE_NUMPY = [
+    ("tempo", "<f8"),
+    ("tensao", "<f4"),
+    ("corrente", "<f4"),
+    ("estado", "u1"),
+    ("ciclo", "<u2"),
+]
+
+
+def empacotar_estado(modo, carga, descarga):
+    if modo == MODO_LACUNA:
+        return BIT_LACUNA
+    return (
+        (BIT_AUTO if modo == "AUTO" else 0)
+        | (BIT_CARGA if carga == "ON" else 0)
+        | (BIT_DESCARGA if descarga == "ON" else 0)
+    )
+
+
+def desempacotar_estado(estado):
+    if estado & BIT_LACUNA:
+        return (MODO_LACUNA, "", "")
+    return (
+        "AUTO" if estado & BIT_AUTO else "MANUAL",
+        "ON" if estado & BIT_CARGA else "OFF",
+        "ON" if estado & BIT_DESCARGA else "OFF",
+    )
+
+
+def ler_cabecalho(f):
+    dados = f.read(TAMANHO_CABECALHO)
+    if len(dados) < TAMANHO_CABECALHO:
+        raise ValueError("Arquivo binário sem cabeçalho completo.")
+    assinatura, versao, tamanho, _, criado_em = _CABECALHO.unpack(dados)
+    if assinatura != ASSINATURA:
+        raise ValueError("Arquivo não é uma gravação binária do Monitor de Bateria.")
+    if versao != VERSAO or tamanho != TAMANHO_REGISTRO:
+        raise ValueError(f"Versão de gravação binária não suportada: {versao}")
+    return {"versao": versao, "criado_em": criado_em}
+
+
+class FormatoBinario:
+    """Mesma interface do FormatoCSV, usada pelo GravadorCSV."""
+    extensao = ".bin"
+
+    def criar(self, caminho):
+        if not os.path.exists(caminho):
+            with open(caminho, "wb") as f:
+                f.write(_CABECALHO.pack(ASSINATURA, VERSAO, TAMANHO_REGISTRO, 0, time.time()))
+
+    def abrir(self, caminho):
+        self.criar(caminho)
+        with open(caminho, "rb+") as f:
+            ler_cabecalho(f)
+            # Descarta um registro incompleto no final (gravação interrompida)
+            tamanho = os.fstat(f.fileno()).st_size
+            sobra = (tamanho - TAMANHO_CABECALHO) % TAMANHO_REGISTRO
+            if sobra:
+                f.truncate(tamanho - sobra)
+                print(f"[Gravador] Registro incompleto removido do final de {caminho}")
+        self._arquivo = open(caminho, "ab")
+        return self._arquivo
+
+    def escrever(self, registros):
+        """registros: lista de (tempo relativo, Amostra, ciclo)."""
+        pack = _REGISTRO.pack
+        nan = math.nan
+        self._arquivo.write(b"".join([
+            pack(
+                t,
+                a.tensao,
+                a.corrente if a.corrente is not None else nan,
+                empacotar_estado(a.modo, a.carga, a.descarga),
+                ciclo,
+            )
+            for t, a, ciclo in registros
+        ]))
+
+
+def ler_registros(caminho, lote=4096):
+    """
+    Percorre o arquivo em blocos, devolvendo tuplas
+    (tempo, tensao, corrente, estado, ciclo) sem carregar tudo na memória.
+    """
+    with open(caminho, "rb") as f:
+        ler_cabecalho(f)
+        tamanho_bloco = lote * TAMANHO_REGISTRO
+        while True:
+            bloco = f.read(tamanho_bloco)
+            completo = len(bloco) - len(bloco) % TAMANHO_REGISTRO
+            if completo:
+                yield from _REGISTRO.iter_unpack(bloco[:completo])
+            if len(bloco) < tamanho_bloco:
+                return
+
+
+def carregar_numpy(caminho):
+    """Abre a gravação como numpy.memmap somente leitura (registros completos)."""
+    import numpy as np
+
+    dtype = np.dtype(DTYPE_NUMPY)
+    n = (os.path.getsize(caminho) - TAMANHO_CABECALHO) // dtype.itemsize
+    with open(caminho, "rb") as f:
+        ler_cabecalho(f)
+    if n <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(caminho, dtype=dtype, mode="r", offset=TAMANHO_CABECALHO, shape=(n,))
+
+
+def _texto_f32(x):
+    """Menor texto decimal que volta exatamente ao mesmo float32."""
+    if x != x:
+        return ""
+    alvo = _F32.pack(x)
+    texto = f"{x:.3f}"
+    if _F32.pack(float(texto)) == alvo:
+        return texto
+    for p in range(6, 10):
+        texto = f"{x:.{p}g}"
+        if _F32.pack(float(texto)) == alvo:
+            return texto
+    return repr(x)
+
+
+def exportar_csv(caminho_bin, caminho_csv=None):
+    """
+    Converte uma gravação binária para o CSV histórico (mesmas colunas do
+    GravadorCSV), em streaming. Os números são escritos com o menor texto
+    que reproduz exatamente o valor gravado. Retorna o caminho do CSV.
+    """
+    if caminho_csv is None:
+        caminho_csv = os.path.splitext(caminho_bin)[0] + ".csv"
+    estados = [desempacotar_estado(e) for e in range(16)]
+    with open(caminho_csv, "w", newline='') as saida:
+        writer = csv.writer(saida)
+        writer.writerow(CABECALHO_CSV)
+        linhas = []
+        for t, v, i, estado, ciclo in ler_registros(caminho_bin):
+            modo, carga, descarga = estados[estado & 15]
+            linhas.append((repr(t), _texto_f32(v), _texto_f32(i), modo, carga, descarga, ciclo))
+            if len(linhas) >= 4096:
+                writer.writerows(linhas)
+                linhas.clear()
+        writer.writerows(linhas)
+    return caminho_csv
+
+
+if __name__ == "__main__":
+    # python -m core.formato_binario gravacao.bin [saida.csv]
+    if len(sys.argv) < 2:
+        print("Uso: python -m core.formato_binario <gravacao.bin> [saida.csv]")
+        sys.exit(1)
+    print(exportar_csv(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
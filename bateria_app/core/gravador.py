@@ -0,0 +1,299 @@
+# core/gravador.py
+import csv
+import os
+import queue
+import threading
+import time
+
+from .amostra import MODO_LACUNA
+
+CABECALHO_CSV = [
+    "Tempo (s)",
+    "Tensao (V)",
+    "Corrente (A)",
+    "Modo",
+    "Carga",
+    "Descarga",
+    "Ciclo"
+]
+
+
+def _reparar_final(caminho):
+    """
+    Se o arquivo terminar no meio de uma linha (queda de energia, processo
+    morto durante a escrita), corta a linha incompleta para que as próximas
+    linhas não sejam coladas nela.
+    """
+    with open(caminho, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        tamanho = f.tell()
+        if tamanho == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return
+        bloco = min(tamanho, 65536)
+        f.seek(tamanho - bloco)
+        dados = f.read(bloco)
+        fim = dados.rfind(b"\n")
+        f.truncate(tamanho - bloco + fim + 1 if fim >= 0 else 0)
+        print(f"[Gravador] Linha incompleta removida do final de {caminho}")
+
+
+class FormatoCSV:
+    """Formato texto com o cabeçalho histórico do projeto."""
+    extensao = ".csv"
+
+    def criar(self, caminho):
+        """Cria o arquivo com cabeçalho, se ainda não existir."""
+        if not os.path.exists(caminho):
+            with open(caminho, "w", newline='') as f:
+                csv.writer(f).writerow(CABECALHO_CSV)
+
+    def abrir(self, caminho):
+        self.criar(caminho)
+        _reparar_final(caminho)
+        self._arquivo = open(caminho, "a", newline='')
+        self._writer = csv.writer(self._arquivo)
+        return self._arquivo
+
+    def escrever(self, registros):
+        """registros: lista de (tempo relativo, Amostra, ciclo)."""
+        self._writer.writerows([
+            (
+                f"{t:.6f}",   # µs: a 1 kHz, duas leituras da serial podem vir a poucos µs uma da outra
+                f"{a.tensao:.3f}" if a.tensao == a.tensao else "",   # vazio na marca de lacuna
+                f"{a.corrente:.3f}" if a.corrente is not None else "",
+                a.modo,
+                a.carga,
+                a.descarga,
+                ciclo
+            )
+            for t, a, ciclo in registros
+        ])
+
+
+class PoliticaFlush:
+    """
+    Quando descarregar o buffer do arquivo para o SO (e, com fsync, para o disco):
+      "linha"     -> a cada linha
+      "lote:N"    -> a cada N linhas
+      "tempo:T"   -> a cada T segundos (e ao parar)
+    """
+
+    def __init__(self, spec="tempo:1", fsync=True):
+        tipo, _, valor = str(spec).partition(":")
+        self.tipo = tipo.strip().lower()
+        if self.tipo == "linha":
+            self.n, self.intervalo = 1, None
+        elif self.tipo == "lote":
+            self.n, self.intervalo = max(1, int(valor or 100)), None
+        elif self.tipo == "tempo":
+            self.n, self.intervalo = None, float(valor or 1.0)
+        else:
+            raise ValueError(f"Política de flush desconhecida: {spec}")
+        self.fsync = fsync
+
+    def __repr__(self):
+        base = self.tipo if self.tipo == "linha" else f"{self.tipo}:{self.n or self.intervalo:g}"
+        return base + ("+fsync" if self.fsync else "")
+
+
+class NucleoGravacao:
+    """
+    Parte da gravação que não depende de thread: abre o arquivo no
+    `formato`, aplica o decimador, escreve os lotes e descarrega conforme a
+    PoliticaFlush. Usada pela thread GravadorCSV e pela tarefa asyncio do
+    core/monitor_async.py.
+
+    A fila entre o leitor e a gravação é limitada a CAPACIDADE_FILA
+    amostras: se o disco travar por muito tempo, as amostras que não
+    cabem são descartadas e contadas em `descartadas`, em vez de a
+    memória crescer sem limite (~65 s de atraso a 1000 quadros/s).
+    """
+    CAPACIDADE_FILA = 65536
+
+    def __init__(self, caminho, tempo_inicial, decimador=None, politica=None, formato=None):
+        self.caminho = caminho
+        self.tempo_inicial = tempo_inicial
+        self.decimador = decimador
+        self.politica = politica or PoliticaFlush()
+        self.formato = formato or FormatoCSV()
+        self.arquivo = None
+
+        self.linhas_gravadas = 0
+        self.linhas_duraveis = 0   # linhas já entregues ao SO (e ao disco, com fsync)
+        self.erros = 0
+        self.descartadas = 0
+        self._pendentes = 0
+        self._ultimo_flush = time.monotonic()
+        self._ciclo = 0   # ciclo da última amostra entregue ao decimador
+        # Resumo para o catálogo (core/catalogo.py), definido pelo leitor
+        self.resumo = None
+
+    def abrir(self):
+        self.arquivo = self.formato.abrir(self.caminho)
+
+    def fechar(self):
+        try:
+            self.flush()
+            self.arquivo.close()
+        except Exception as e:
+            print(f"[Gravador] Erro ao fechar {self.caminho}: {e}")
+        self.publicar_resumo(forcar=True)
+
+    def publicar_resumo(self, forcar=False):
+        if self.resumo is not None:
+            self.resumo.publicar(forcar)
+
+    def prazo_flush(self):
+        """Segundos até o próximo flush por tempo (None se não houver)."""
+        if self.politica.intervalo is None or not self._pendentes:
+            return None
+        return max(0.0, self._ultimo_flush + self.politica.intervalo - time.monotonic())
+
+    def flush_vencido(self):
+        return (
+            self.politica.intervalo is not None
+            and time.monotonic() - self._ultimo_flush >= self.politica.intervalo
+        )
+
+    def gravar_lote(self, lote):
+        """lote: lista de (Amostra, ciclo)."""
+        t0 = self.tempo_inicial
+        if self.decimador is None:
+            registros = [(a.t - t0, a, ciclo) for a, ciclo in lote]
+        else:
+            registros = []
+            for a, ciclo in lote:
+                if a.modo == MODO_LACUNA:
+                    # fecha a janela anterior à queda; a marca não entra na média
+                    registros.extend((d.t - t0, d, self._ciclo) for d in self.decimador.finalizar())
+                    registros.append((a.t - t0, a, ciclo))
+                    continue
+                for d in self.decimador.alimentar(a):
+                    # Uma janela fechada pertence ao ciclo da sua última amostra
+                    registros.append((d.t - t0, d, ciclo if d.seq == a.seq else self._ciclo))
+                self._ciclo = ciclo
+        self._escrever_registros(registros)
+
+    def finalizar_decimador(self):
+        """Grava a janela em aberto do decimador."""
+        if self.decimador is not None:
+            t0 = self.tempo_inicial
+            self._escrever_registros(
+                [(d.t - t0, d, self._ciclo) for d in self.decimador.finalizar()]
+            )
+
+    def _escrever_registros(self, registros):
+        n = self.politica.n
+        i = 0
+        try:
+            while i < len(registros):
+                # "linha"/"lote": respeita a fronteira de flush dentro do lote
+                fim = len(registros) if n is None else i + n - self._pendentes
+                parte = registros[i:fim]
+                self.formato.escrever(parte)
+                if self.resumo is not None:
+                    self.resumo.acrescentar(parte)
+                self._pendentes += len(parte)
+                self.linhas_gravadas += len(parte)
+                i += len(parte)
+                if n is not None and self._pendentes >= n:
+                    self.flush()
+        except Exception as e:
+            self.erros += 1
+            print(f"[Gravador] Erro ao escrever {self.caminho}: {e}")
+
+    def flush(self):
+        self._ultimo_flush = time.monotonic()
+        if not self._pendentes:
+            return
+        self.arquivo.flush()
+        if self.politica.fsync:
+            os.fsync(self.arquivo.fileno())
+        self.linhas_duraveis = self.linhas_gravadas
+        self._pendentes = 0
+        self.publicar_resumo()
+
+
+class GravadorCSV(NucleoGravacao, threading.Thread):
+    """
+    Thread dedicada à gravação. Mantém o arquivo aberto, recebe as amostras
+    por uma fila, aplica o decimador (se houver) e escreve em lotes,
+    descarregando conforme a PoliticaFlush. O layout do arquivo vem do
+    `formato` (FormatoCSV ou core.formato_binario.FormatoBinario).
+    """
+    _DESCARREGAR = object()
+    _PARAR = object()
+
+    def __init__(self, caminho, tempo_inicial, decimador=None, politica=None, formato=None):
+        threading.Thread.__init__(self, daemon=True, name=f"GravadorCSV({os.path.basename(caminho)})")
+        NucleoGravacao.__init__(self, caminho, tempo_inicial, decimador, politica, formato)
+        self.fila = queue.SimpleQueue()
+
+    # ---------- lado produtor (thread do ESPReader / UI) ----------
+    def enfileirar(self, amostra, ciclo):
+        if self.fila.qsize() >= self.CAPACIDADE_FILA:
+            self.descartadas += 1
+            return
+        self.fila.put((amostra, ciclo))
+
+    def descarregar(self):
+        """Fecha a janela do decimador e força flush, sem encerrar a thread."""
+        self.fila.put(self._DESCARREGAR)
+
+    def parar(self, timeout=5.0):
+        """Grava o que estiver na fila, faz flush final e fecha o arquivo."""
+        self.fila.put(self._PARAR)
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    # ---------- lado consumidor ----------
+    def run(self):
+        try:
+            self.abrir()
+        except Exception as e:
+            print(f"[Gravador] Não foi possível abrir {self.caminho}: {e}")
+            self.erros += 1
+            return
+
+        try:
+            self._laco()
+        finally:
+            self.fechar()
+
+    def _laco(self):
+        lote_max = 1024
+        while True:
+            try:
+                item = self.fila.get(timeout=self.prazo_flush())
+            except queue.Empty:
+                self.flush()
+                continue
+
+            # Junta o que já estiver na fila num só lote
+            lote = []
+            controle = None
+            while True:
+                if item is self._DESCARREGAR or item is self._PARAR:
+                    controle = item
+                    break
+                lote.append(item)
+                if len(lote) >= lote_max:
+                    break
+                try:
+                    item = self.fila.get_nowait()
+                except queue.Empty:
+                    break
+
+            if lote:
+                self.gravar_lote(lote)
+
+            if controle is not None:
+                self.finalizar_decimador()
+                self.flush()
+                if controle is self._PARAR:
+                    return
+            elif self.flush_vencido():
+                self.flush()
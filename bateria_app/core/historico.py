@@ -1,58 +1,385 @@
 # core/historico.py
 import csv
+import io
 import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .formato_binario import BIT_AUTO, BIT_CARGA, BIT_DESCARGA, BIT_LACUNA, FormatoBinario, carregar_numpy
+from .piramide import PiramideMinMax
+from .segmentos import IndiceSegmentos
+
+# Nomes aceitos para cada coluna, em ordem de preferência
+COLUNAS = {
+    "tempo": ("Tempo (s)", "Tempo", "Time", "t"),
+    "tensao": ("Tensao (V)", "Tensao", "Tensão (V)", "Tensão", "Voltage", "Vbat", "Tensao(V)"),
+    "corrente": ("Corrente (A)", "Corrente", "Current"),
+    "ciclo": ("Ciclo", "Cycle"),
+    "modo": ("Modo", "Mode"),
+    "carga": ("Carga", "Charge"),
+    "descarga": ("Descarga", "Disch", "Discharge"),
+}
+NUMERICAS = ("tempo", "tensao", "corrente", "ciclo")
+RELES = ("carga", "descarga")
+
+_DECIMAL_VIRGULA = re.compile(r"\d,\d")
+
+
+def farejar_formato(cabecalho, amostra):
+    """
+    (delimitador, separador decimal) de um CSV, a partir do cabeçalho e de
+    algumas linhas de dados. O delimitador é o mais frequente no cabeçalho
+    entre ";", "," e tabulação; a vírgula decimal só é considerada quando o
+    delimitador não é vírgula.
+    """
+    delimitador = max((";", ",", "\t"), key=cabecalho.count)
+    if not cabecalho.count(delimitador):
+        delimitador = ","
+    decimal = "," if delimitador != "," and _DECIMAL_VIRGULA.search(amostra) else "."
+    return delimitador, decimal
+
+
+def mapear_colunas(nomes):
+    """{coluna: índice} das colunas conhecidas presentes no cabeçalho."""
+    limpos = [n.strip().strip('"') for n in nomes]
+    mapa = {}
+    for coluna, candidatos in COLUNAS.items():
+        for nome in candidatos:
+            if nome in limpos:
+                mapa[coluna] = limpos.index(nome)
+                break
+    return mapa
+
+
+def _numeros(valores):
+    """Converte textos em float de uma vez; vazio vira NaN. Levanta ValueError se algum for inválido."""
+    # np.array(lista, dtype=float) é bem mais rápido que .astype() de um array de texto;
+    # só quando há campos vazios é que a lista é refeita
+    try:
+        return np.array(valores, dtype=float)
+    except ValueError:
+        return np.array([v or "nan" for v in valores], dtype=float)
+
+
+def _numeros_tolerante(valores):
+    saida = np.empty(len(valores))
+    for k, texto in enumerate(valores):
+        try:
+            saida[k] = float(texto) if texto else np.nan
+        except ValueError:
+            saida[k] = np.nan
+    return saida
+
+
+def _montar(mapa, coluna_de, tolerante=False):
+    """Converte as colunas mapeadas; descarta linhas sem tempo ou tensão e ordena por tempo."""
+    colunas = {}
+    for nome, indice in mapa.items():
+        valores = coluna_de(indice)
+        if nome in NUMERICAS:
+            colunas[nome] = _numeros_tolerante(valores) if tolerante else _numeros(valores)
+        elif nome in RELES:
+            colunas[nome] = np.fromiter((v == "ON" for v in valores), bool, len(valores))
+        else:
+            colunas[nome] = np.array(valores, dtype=object)
+    return _filtrar(colunas)
+
+
+def _filtrar(colunas):
+    validas = ~(np.isnan(colunas["tempo"]) | np.isnan(colunas["tensao"]))
+    if not validas.all():
+        colunas = {nome: col[validas] for nome, col in colunas.items()}
+    tempo = colunas["tempo"]
+    if len(tempo) > 1 and (np.diff(tempo) < 0).any():
+        # fora de ordem (arquivos juntados à mão): ordena mantendo empates na ordem do arquivo
+        ordem = np.argsort(tempo, kind="stable")
+        colunas = {nome: col[ordem] for nome, col in colunas.items()}
+    return colunas
+
+
+def ler_csv(caminho):
+    """
+    Lê um CSV de gravação em arrays numpy, um por coluna conhecida
+    ("tempo", "tensao" e, se existirem, "corrente", "ciclo", "modo",
+    "carga"/"descarga" como bool). O delimitador, o separador decimal e o
+    mapeamento das colunas são resolvidos uma vez por arquivo; cada coluna
+    é convertida de uma só vez. Linhas sem tempo ou tensão (marcas de
+    lacuna, linhas incompletas) são descartadas.
+
+    Se o arquivo não tiver a forma esperada (aspas, número de campos
+    variando, texto numa coluna numérica), cai para uma leitura linha a
+    linha com o módulo csv que pula o que não der para converter.
+    """
+    with open(caminho, "r", encoding="utf-8", errors="replace", newline="") as f:
+        texto = f.read()
+    if "\r" in texto:
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    cabecalho, _, corpo = texto.partition("\n")
+    delimitador, decimal = farejar_formato(cabecalho, corpo[:4096])
+    nomes = cabecalho.split(delimitador)
+    mapa = mapear_colunas(nomes)
+    if "tempo" not in mapa or "tensao" not in mapa:
+        raise ValueError("colunas de tempo e tensão não encontradas no cabeçalho")
+    if decimal == ",":
+        corpo = corpo.replace(",", ".")
+    corpo = corpo.rstrip("\n")
+    if not corpo:
+        return _filtrar({nome: np.empty(0) for nome in ("tempo", "tensao")})
+
+    n = len(nomes)
+    if '"' not in corpo:
+        linhas = corpo.count("\n") + 1
+        campos = corpo.replace("\n", delimitador).split(delimitador)
+        if len(campos) == linhas * n:
+            try:
+                return _montar(mapa, lambda i: campos[i::n])
+            except ValueError:
+                pass
+
+    # leitura tolerante: só as linhas com o número certo de campos
+    linhas = [l for l in csv.reader(io.StringIO(corpo), delimiter=delimitador) if len(l) == n]
+    return _montar(mapa, lambda i: [l[i] for l in linhas], tolerante=True)
+
+
+def ler_binario(caminho):
+    """Mesmas colunas de ler_csv() para uma gravação binária (core/formato_binario.py)."""
+    registros = carregar_numpy(caminho)
+    estado = registros["estado"]
+    colunas = {
+        "tempo": np.array(registros["tempo"], dtype=float),
+        "tensao": np.where(estado & BIT_LACUNA, np.nan, registros["tensao"]).astype(float),
+        "corrente": np.array(registros["corrente"], dtype=float),
+        "ciclo": np.array(registros["ciclo"], dtype=float),
+        "modo": np.where(estado & BIT_AUTO, "AUTO", "MANUAL").astype(object),
+        "carga": (estado & BIT_CARGA) != 0,
+        "descarga": (estado & BIT_DESCARGA) != 0,
+    }
+    return _filtrar(colunas)
+
+
+# ===============================
+# Cache das gravações já lidas
+# ===============================
+EXTENSAO_SIDECAR = ".npz"
+
+
+def assinatura(caminho):
+    """(tamanho, mtime em ns) do arquivo: muda sempre que a gravação muda."""
+    info = os.stat(caminho)
+    return info.st_size, info.st_mtime_ns
+
+
+def _somente_leitura(colunas):
+    # os arrays são compartilhados entre quem pede a mesma gravação
+    for col in colunas.values():
+        col.setflags(write=False)
+    return colunas
+
+
+class CacheGravacoes:
+    """
+    Colunas já convertidas das gravações, indexadas por caminho e
+    validadas pela assinatura (tamanho, mtime) do arquivo de origem.
+
+    Dois níveis:
+      - memória: LRU limitada a `limite_bytes` (soma dos arrays); a menos
+        usada sai primeiro;
+      - sidecar: "<gravação>.npz" ao lado do arquivo, com as mesmas colunas
+        e a assinatura da origem. Reabrir a gravação em outra sessão lê o
+        .npz (sem parse); se a origem mudou (teste ainda gravando, arquivo
+        editado), o sidecar é ignorado e refeito.
+
+    Além das colunas ("colunas"), guarda do mesmo jeito outras partes
+    calculadas de cada gravação (dicionários de arrays), cada uma com o
+    seu sidecar "<gravação>.<parte>.npz": o índice de segmentos
+    (core/segmentos.py) e a pirâmide de mín/máx (core/piramide.py).
+
+    Falhas ao gravar o sidecar (pasta só de leitura, disco cheio) só avisam:
+    a gravação continua carregada da origem.
+    """
+    def __init__(self, limite_bytes=256 * 2**20, sidecars=True):
+        self.limite_bytes = limite_bytes
+        self.sidecars = sidecars
+        self._entradas = OrderedDict()   # (caminho, parte) -> (assinatura, arrays, bytes)
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self.acertos = 0          # respondidos da memória
+        self.acertos_sidecar = 0  # respondidos de um .npz válido
+        self.leituras = 0         # parse da origem
+
+    @staticmethod
+    def caminho_sidecar(caminho, parte="colunas"):
+        if parte == "colunas":
+            return caminho + EXTENSAO_SIDECAR
+        return f"{caminho}.{parte}{EXTENSAO_SIDECAR}"
+
+    def obter(self, caminho, carregar, sidecar=True, parte="colunas"):
+        """
+        Arrays da `parte` da gravação em `caminho`; `carregar(caminho)` só
+        é chamado se nem a memória nem o sidecar tiverem a versão atual do
+        arquivo. sidecar=False usa só a memória (gravações .bin, que já
+        abrem sem parse).
+        """
+        caminho = os.path.abspath(caminho)
+        chave = assinatura(caminho)
+        with self._trava:
+            entrada = self._entradas.get((caminho, parte))
+            if entrada is not None and entrada[0] == chave:
+                self._entradas.move_to_end((caminho, parte))
+                self.acertos += 1
+                return entrada[1]
+
+        sidecar = sidecar and self.sidecars
+        arrays = self._ler_sidecar(caminho, parte, chave) if sidecar else None
+        if arrays is not None:
+            self.acertos_sidecar += 1
+        else:
+            arrays = carregar(caminho)
+            self.leituras += 1
+            if sidecar:
+                self._gravar_sidecar(caminho, parte, chave, arrays)
+        arrays = _somente_leitura(arrays)
+        self._guardar((caminho, parte), chave, arrays)
+        return arrays
+
+    def descartar(self, caminho=None):
+        """Tira uma gravação (todas as partes), ou todas, da memória. Os sidecars ficam."""
+        with self._trava:
+            if caminho is None:
+                self._entradas.clear()
+                self._bytes = 0
+                return
+            caminho = os.path.abspath(caminho)
+            for indice in [i for i in self._entradas if i[0] == caminho]:
+                self._bytes -= self._entradas.pop(indice)[2]
+
+    def memoria_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _guardar(self, indice, chave, arrays):
+        tamanho = sum(col.nbytes for col in arrays.values())
+        with self._trava:
+            antiga = self._entradas.pop(indice, None)
+            if antiga is not None:
+                self._bytes -= antiga[2]
+            if tamanho > self.limite_bytes:
+                return   # maior que o cache inteiro: não expulsa as outras
+            self._entradas[indice] = (chave, arrays, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.limite_bytes:
+                _, (_, _, liberados) = self._entradas.popitem(last=False)
+                self._bytes -= liberados
+
+    def _ler_sidecar(self, caminho, parte, chave):
+        try:
+            with np.load(self.caminho_sidecar(caminho, parte), allow_pickle=False) as npz:
+                if tuple(npz["_origem"]) != chave:
+                    return None
+                colunas = {nome: npz[nome] for nome in npz.files if nome != "_origem"}
+        except (OSError, KeyError, ValueError):
+            return None
+        if "modo" in colunas:
+            colunas["modo"] = colunas["modo"].astype(object)
+        return colunas
+
+    def _gravar_sidecar(self, caminho, parte, chave, colunas):
+        destino = self.caminho_sidecar(caminho, parte)
+        temporario = destino + ".tmp"
+        dados = dict(colunas)
+        if "modo" in dados:
+            dados["modo"] = dados["modo"].astype(str)   # .npz sem pickle
+        try:
+            with open(temporario, "wb") as f:
+                np.savez(f, _origem=np.array(chave, dtype=np.int64), **dados)
+            os.replace(temporario, destino)
+        except OSError as e:
+            print(f"[HISTORICO] Não foi possível gravar {os.path.basename(destino)}: {e}")
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+
 
 class Historico:
     """
     Manipula arquivos CSV contendo dados de tensão ao longo do tempo.
     Responsável por carregar e preparar dados para o gráfico.
+    As gravações lidas ficam num CacheGravacoes (memória + sidecar .npz).
     """
-    def __init__(self, pasta_dados="assets/dados"):
+    def __init__(self, pasta_dados="assets/dados", cache=None):
         self.pasta = pasta_dados
         if not os.path.exists(self.pasta):
             os.makedirs(self.pasta)
+        self.cache = cache if cache is not None else CacheGravacoes()
 
     def listar_csvs(self):
-        """Retorna uma lista dos arquivos CSV disponíveis na pasta de dados."""
-        return [f for f in os.listdir(self.pasta) if f.lower().endswith(".csv")]
+        """Retorna uma lista das gravações (CSV e binárias) disponíveis na pasta de dados."""
+        return [
+            f for f in os.listdir(self.pasta)
+            if f.lower().endswith((".csv", FormatoBinario.extensao))
+        ]
 
-    def carregar_dados(self, nome_arquivo):
+    def carregar_colunas(self, nome_arquivo):
         """
-        Carrega dados de um arquivo CSV e retorna listas de tempo e tensão.
-        Tenta ser tolerante a cabeçalhos diferentes e linhas inválidas.
+        Carrega uma gravação (CSV ou .bin) como dicionário de arrays numpy
+        (ver ler_csv), em ordem de tempo, passando pelo cache. Os arrays são
+        somente leitura. Em caso de erro, avisa e retorna tempo e tensão
+        vazios.
         """
         caminho = os.path.join(self.pasta, nome_arquivo)
-        tempos, tensoes = [], []
         try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # tenta várias chaves possíveis para tempo e tensão
-                    t_raw = None
-                    for key in ("Tempo (s)", "Tempo", "Time", "t"):
-                        if key in row and row[key] not in (None, ""):
-                            t_raw = row[key]
-                            break
-                    v_raw = None
-                    for key in ("Tensao (V)", "Tensao", "Tensão (V)", "Tensão", "Voltage", "Vbat", "Tensao(V)"):
-                        if key in row and row[key] not in (None, ""):
-                            v_raw = row[key]
-                            break
-
-                    # Se faltou tempo ou tensão, pula a linha
-                    if t_raw is None or v_raw is None:
-                        continue
-
-                    # tenta converter para float (aceita vírgula)
-                    try:
-                        t = float(str(t_raw).replace(",", "."))
-                        v = float(str(v_raw).replace(",", "."))
-                    except Exception:
-                        # linha inválida -> ignora
-                        continue
-
-                    tempos.append(t)
-                    tensoes.append(v)
+            if nome_arquivo.lower().endswith(FormatoBinario.extensao):
+                return self.cache.obter(caminho, ler_binario, sidecar=False)
+            return self.cache.obter(caminho, ler_csv)
         except Exception as e:
             print(f"[ERRO] Falha ao carregar {nome_arquivo}: {e}")
-        return tempos, tensoes
\ No newline at end of file
+            return {"tempo": np.empty(0), "tensao": np.empty(0)}
+
+    def carregar_segmentos(self, nome_arquivo):
+        """
+        Índice de segmentos (core/segmentos.py) da gravação, calculado na
+        primeira vez e depois lido do cache. Vazio em caso de erro.
+        """
+        caminho = os.path.join(self.pasta, nome_arquivo)
+        binario = nome_arquivo.lower().endswith(FormatoBinario.extensao)
+        try:
+            arrays = self.cache.obter(
+                caminho,
+                lambda _: IndiceSegmentos.de_colunas(self.carregar_colunas(nome_arquivo)).arrays(),
+                sidecar=not binario,
+                parte="segmentos",
+            )
+            return IndiceSegmentos.de_arrays(arrays)
+        except Exception as e:
+            print(f"[ERRO] Falha ao indexar {nome_arquivo}: {e}")
+            return IndiceSegmentos.de_colunas({"tempo": np.empty(0)})
+
+    def carregar_piramide(self, nome_arquivo):
+        """
+        Pirâmide de mín/máx (core/piramide.py) da gravação, calculada na
+        primeira vez e depois lida do cache. Vazia em caso de erro.
+        """
+        caminho = os.path.join(self.pasta, nome_arquivo)
+        binario = nome_arquivo.lower().endswith(FormatoBinario.extensao)
+        try:
+            arrays = self.cache.obter(
+                caminho,
+                lambda _: PiramideMinMax.de_tensoes(self.carregar_colunas(nome_arquivo)["tensao"]).arrays(),
+                sidecar=not binario,
+                parte="piramide",
+            )
+            return PiramideMinMax.de_arrays(arrays)
+        except Exception as e:
+            print(f"[ERRO] Falha ao montar a pirâmide de {nome_arquivo}: {e}")
+            return PiramideMinMax([], [])
+
+    def carregar_dados(self, nome_arquivo):
+        """Tempo e tensão de uma gravação, como arrays numpy em ordem de tempo."""
+        colunas = self.carregar_colunas(nome_arquivo)
+        return colunas["tempo"], colunas["tensao"]
@@ -0,0 +1,203 @@
+# core/metricas.py
+import bisect
+import math
+import threading
+
+
+class Histograma:
+    """
+    Histograma com faixas em escala logarítmica, barato o bastante para ser
+    atualizado a cada evento. Guarda só as contagens por faixa, o total, a
+    soma, o mínimo e o máximo; os percentis são estimados pela faixa (o
+    erro fica limitado à largura dela).
+
+    Com os padrões, as faixas vão de 0,1 ms a ~100 s, 8 por década.
+    """
+
+    def __init__(self, minimo=1e-4, maximo=100.0, faixas_por_decada=8, unidade="s"):
+        self.unidade = unidade
+        decadas = math.log10(maximo / minimo)
+        n = int(math.ceil(decadas * faixas_por_decada))
+        # limites superiores de cada faixa; a última recebe tudo acima de `maximo`
+        self.limites = [minimo * 10 ** (k / faixas_por_decada) for k in range(n + 1)]
+        self.contagens = [0] * (len(self.limites) + 1)
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def registrar(self, valor):
+        k = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self.contagens[k] += 1
+            self.total += 1
+            self.soma += valor
+            if valor < self.minimo:
+                self.minimo = valor
+            if valor > self.maximo:
+                self.maximo = valor
+
+    def zerar(self):
+        with self._lock:
+            self.contagens = [0] * (len(self.limites) + 1)
+            self.total = 0
+            self.soma = 0.0
+            self.minimo = math.inf
+            self.maximo = -math.inf
+
+    def percentil(self, p):
+        """Limite superior da faixa que contém o percentil p (0-100)."""
+        with self._lock:
+            if not self.total:
+                return None
+            alvo = max(1, int(math.ceil(p / 100.0 * self.total)))
+            acumulado = 0
+            for k, c in enumerate(self.contagens):
+                acumulado += c
+                if acumulado >= alvo:
+                    if k >= len(self.limites):
+                        return self.maximo
+                    # não passa do máximo observado
+                    return min(self.limites[k], self.maximo)
+        return self.maximo
+
+    def media(self):
+        return self.soma / self.total if self.total else None
+
+    def faixas(self):
+        """Lista de (limite superior, contagem) das faixas não vazias."""
+        with self._lock:
+            contagens = list(self.contagens)
+        return [
+            (self.limites[k] if k < len(self.limites) else math.inf, c)
+            for k, c in enumerate(contagens) if c
+        ]
+
+    def resumo(self):
+        return {
+            "n": self.total,
+            "media": self.media(),
+            "min": self.minimo if self.total else None,
+            "p50": self.percentil(50),
+            "p90": self.percentil(90),
+            "p99": self.percentil(99),
+            "max": self.maximo if self.total else None,
+        }
+
+    def __repr__(self):
+        r = self.resumo()
+        if not r["n"]:
+            return "Histograma(vazio)"
+        ms = 1000.0 if self.unidade == "s" else 1.0
+        return (
+            f"Histograma(n={r['n']}, média={r['media'] * ms:.1f}, p50={r['p50'] * ms:.1f}, "
+            f"p99={r['p99'] * ms:.1f}, máx={r['max'] * ms:.1f}"
+            f"{' ms' if self.unidade == 's' else ''})"
+        )
+
+    def somar(self, outro):
+        """Acumula as contagens de `outro` (mesmas faixas) neste histograma."""
+        with outro._lock:
+            contagens = list(outro.contagens)
+            total, soma, minimo, maximo = outro.total, outro.soma, outro.minimo, outro.maximo
+        with self._lock:
+            for k, c in enumerate(contagens):
+                self.contagens[k] += c
+            self.total += total
+            self.soma += soma
+            self.minimo = min(self.minimo, minimo)
+            self.maximo = max(self.maximo, maximo)
+        return self
+
+
+class HistogramaMovel:
+    """
+    Histograma das últimas `janela`..2×`janela` segundos: dois Histograma
+    que se alternam; ao virar a janela o mais antigo é zerado. A virada é
+    verificada no próprio registrar(), com o tempo do evento, sem relógio
+    extra.
+    """
+
+    def __init__(self, janela=60.0, **opcoes):
+        self.janela = float(janela)
+        self._opcoes = opcoes
+        self._atual = Histograma(**opcoes)
+        self._anterior = Histograma(**opcoes)
+        self._virada = None
+
+    def registrar(self, valor, agora):
+        if self._virada is None:
+            self._virada = agora + self.janela
+        elif agora >= self._virada:
+            self._anterior, self._atual = self._atual, self._anterior
+            self._atual.zerar()
+            self._virada = agora + self.janela
+        self._atual.registrar(valor)
+
+    def zerar(self):
+        self._atual.zerar()
+        self._anterior.zerar()
+        self._virada = None
+
+    def histograma(self):
+        """Histograma combinado das duas janelas (cópia)."""
+        return Histograma(**self._opcoes).somar(self._anterior).somar(self._atual)
+
+    def resumo(self):
+        return self.histograma().resumo()
+
+
+class MetricasEnlace:
+    """
+    Saúde do enlace serial de um leitor (ESPReader/LeitorAsync): bytes
+    recebidos, intervalo entre quadros e tempo de interpretação de cada
+    quadro (HistogramaMovel), linhas por leitura da serial e "quase
+    timeouts" (intervalos maiores que metade do timeout do watchdog). Os contadores de quadros válidos,
+    malformados e outras linhas ficam no ParserTelemetria.
+
+    Na leitura só há incrementos e registrar(); taxas e percentis são
+    calculados apenas quando alguém consulta (NucleoLeitura.diagnostico()).
+    """
+
+    def __init__(self, limite_quase_timeout, janela=60.0):
+        self.limite_quase_timeout = limite_quase_timeout
+        self.bytes = 0
+        self.quase_timeout = 0
+        # faixas de ~6 %: resolução suficiente para ver o jitter de um quadro a cada 100 ms
+        self.intervalo = HistogramaMovel(janela, faixas_por_decada=40)
+        # interpretação de um quadro: de 0,1 µs a 100 ms
+        self.interpretacao = HistogramaMovel(janela, minimo=1e-7, maximo=0.1, faixas_por_decada=20)
+        self.leituras = 0            # leituras da serial que trouxeram linhas
+        self.linhas_lidas = 0
+        self.max_linhas_leitura = 0
+        self._ultimo_quadro = None
+        self._taxa_ref = None   # (instante, quadros, bytes) da última consulta
+
+    def registrar_quadro(self, t, duracao):
+        """Um quadro válido recebido em `t` (monotonic), interpretado em `duracao` s."""
+        anterior = self._ultimo_quadro
+        self._ultimo_quadro = t
+        self.interpretacao.registrar(duracao, t)
+        if anterior is not None:
+            intervalo = t - anterior
+            self.intervalo.registrar(intervalo, t)
+            if intervalo > self.limite_quase_timeout:
+                self.quase_timeout += 1
+
+    def registrar_leitura(self, linhas):
+        """Uma leitura da serial que trouxe `linhas` linhas completas."""
+        self.leituras += 1
+        self.linhas_lidas += linhas
+        if linhas > self.max_linhas_leitura:
+            self.max_linhas_leitura = linhas
+
+    def reiniciar_intervalo(self):
+        """Depois de uma queda: o próximo intervalo não conta (a lacuna já foi contada como queda)."""
+        self._ultimo_quadro = None
+
+    def taxas(self, quadros, agora):
+        """(quadros/s, bytes/s) desde a consulta anterior (None na primeira)."""
+        anterior = self._taxa_ref
+        self._taxa_ref = (agora, quadros, self.bytes)
+        if anterior is None or agora <= anterior[0]:
+            return None, None
+        dt = agora - anterior[0]
+        return (quadros - anterior[1]) / dt, (self.bytes - anterior[2]) / dt
@@ -1,94 +1,214 @@
 # core/monitor.py
 import serial
-import serial.tools.list_ports
 from .bateria import BateriaController
+from .parser import ParserTelemetria
+from .amostra import Amostra, BufferAmostras, marca_lacuna
+from .decimacao import criar_decimador
+from .gravador import FormatoCSV, GravadorCSV, PoliticaFlush
+from .formato_binario import FormatoBinario
+from .autodetect import detectar_esp, identidade_porta, reabrir_esp
+from .agendador import agendador_padrao
+from .metricas import MetricasEnlace
+from .captura import GravadorCaptura
+from .catalogo import Catalogo, ResumoGravacao
+from .urlhandler import e_url
 import threading
 import time
 import os
-import csv
 
-class ESPReader(threading.Thread):
+
+class SeparadorLinhas:
     """
-    Thread que lê dados da ESP32 via serial.
-    Grava CSV por timer periódico controlado (para evitar gravações duplicadas).
-    Possui controle de envio periódico de comandos (USB ON).
+    Acumula os bytes recebidos da serial e devolve as linhas completas.
+    Mesmo papel do Packetizer do pyserial (serial.threaded), mas separa
+    todas as linhas de um bloco de uma vez, sem um split por linha.
     """
+    TERMINADOR = b"\n"
+
+    def __init__(self, limite=4096):
+        self.buffer = bytearray()
+        # Protege contra lixo sem terminador (baudrate errado, ruído)
+        self.limite = limite
+        self.descartados = 0   # bytes jogados fora por passar do limite
+
+    def alimentar(self, dados):
+        """Adiciona um bloco lido e retorna a lista de linhas completas (bytes)."""
+        self.buffer += dados
+        if self.TERMINADOR not in dados:
+            if len(self.buffer) > self.limite:
+                self.descartados += len(self.buffer)
+                del self.buffer[:]
+            return []
+        # split do bytes (não do bytearray) para entregar linhas hasheáveis ao parser
+        *linhas, resto = bytes(self.buffer).split(self.TERMINADOR)
+        self.buffer = bytearray(resto)
+        return linhas
+
+    def limpar(self):
+        del self.buffer[:]
+
+
+class NucleoLeitura:
+    """
+    Parte do leitor que não depende de como a serial é lida: converte as
+    linhas em Amostra, publica o último quadro, repassa as respostas de
+    comandos ao BateriaController e entrega as amostras à gravação.
+    Usada pelo ESPReader (thread) e pelo LeitorAsync (core/monitor_async.py).
+
+    Também guarda o tratamento comum das quedas da conexão: se a ESP parar
+    de enviar dados (watchdog) ou a leitura falhar, o leitor não encerra o
+    teste na hora. Ele marca a lacuna no arquivo gravado, tenta reabrir a
+    placa com espera exponencial entre as tentativas (ATRASO_RECONEXAO) e,
+    quando ela volta, restaura os relés pelo BateriaController. O teste só
+    é dado como perdido se a queda passar de `orcamento_queda` segundos.
+    """
+    ORCAMENTO_QUEDA = 300.0           # s sem conexão antes de desistir do teste
+    ATRASO_RECONEXAO = (0.5, 10.0)    # espera entre tentativas: inicial, máxima
 
-    def __init__(self, porta=None, baudrate=115200):
-        super().__init__(daemon=True)
-
+    def __init__(self, porta=None, baudrate=115200, orcamento_queda=None):
         self.porta = porta
         self.baudrate = baudrate
         self.ser = None
+        # Identidade USB da placa, para reencontrá-la depois de uma queda
+        self._identidade = None
+
+        # Reconexão
+        self.orcamento_queda = self.ORCAMENTO_QUEDA if orcamento_queda is None else float(orcamento_queda)
+        self.conectado = False
+        self.quedas = 0
+        self.tempo_sem_conexao = 0.0   # soma das quedas já recuperadas (s)
 
         # IMPORTANTE: não começa rodando, mas run() garante ativação
         self.running = False
         self._stop_requested = False
 
         self.ultima_leitura = None
-        self.ultima_tensao = None
-        self.corrente = None
+
+        # Última amostra publicada (snapshot imutável, troca atômica de referência)
+        self.amostra = None
+        self.amostras = BufferAmostras()
+        self._seq = 0
+
+        # Estado lógico dos relés (também ajustado pela UI ao enviar comandos)
         self.modo = "AUTO"
         self.carga = "OFF"
         self.descarga = "OFF"
 
+        # Separação de linhas dos blocos lidos e conversão dos quadros
+        self._separador = SeparadorLinhas()
+        self.parser = ParserTelemetria()
+        self._leitura_anterior = None   # instante (monotonic) da última leitura com linhas
+
         self.arquivo_csv = None
-        self.tempo_inicial = time.time()
+        # Origem do eixo de tempo do CSV, em time.monotonic()
+        self.tempo_inicial = time.monotonic()
+        # Gravação do arquivo atual (criada em definir_csv)
+        self.gravador = None
         self.bateria_controller = BateriaController(self)
 
         # Envio periódico
-        self._envio_ativo = False
-        self._thread_envio = None
         self._envio_intervalo = 3
         self._envio_comando = "USB ON"
 
-        # Gravação periódica
+        # Gravação (ativada junto com o envio periódico)
         self.enviando = False
-        self._save_timer = None
-        self._save_interval = 1.0
-
-        # Proteções
-        self._last_save_time = 0.0
-        self._save_min_interval = 0.8
         self._ciclo_cache = 0
 
         # Watchdog
         self._ultimo_dado_ts = time.time()
         self._timeout_serial = 5.0
 
+        # Saúde do enlace (consultada por diagnostico())
+        self.metricas = MetricasEnlace(limite_quase_timeout=self._timeout_serial / 2)
+
+        # Captura do fluxo cru para replay:// (ver definir_captura)
+        self.captura = None
+
         # Controller (UI)
         self.controller = None
 
-
     # ===============================
     # CSV
     # ===============================
-    def definir_csv(self, caminho_csv, retomar=False, tempo_decorrido=0):
+    def definir_csv(self, caminho_csv, retomar=False, tempo_decorrido=0,
+                    decimacao=None, flush="tempo:1", fsync=True, formato=None, metadados=None):
+        """
+        Define o arquivo de gravação e inicia a thread gravadora.
+        `formato` é "csv" ou "bin" (core/formato_binario.py); se omitido,
+        é escolhido pela extensão do arquivo (.bin -> binário).
+        `decimacao` segue criar_decimador(): None grava todos os quadros,
+        "n:10" um a cada 10, "media:1" a média de cada janela de 1 s
+        (também "min:T"/"max:T").
+        `flush` segue PoliticaFlush: "linha", "lote:N" ou "tempo:T"; com
+        `fsync` cada flush também é forçado para o disco.
+        A gravação entra no catálogo da pasta (core/catalogo.py) com os
+        `metadados` dados ({"bateria": ..., "tipo": ...}); o resumo é
+        atualizado pelo gravador enquanto grava.
+        """
         self.arquivo_csv = os.path.abspath(caminho_csv)
         pasta = os.path.dirname(self.arquivo_csv)
         os.makedirs(pasta, exist_ok=True)
 
-        if not os.path.exists(self.arquivo_csv):
-            with open(self.arquivo_csv, "w", newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "Tempo (s)",
-                    "Tensao (V)",
-                    "Corrente (A)",
-                    "Modo",
-                    "Carga",
-                    "Descarga",
-                    "Ciclo"
-                ])
-
         if retomar:
             # continua o tempo
-            self.tempo_inicial = time.time() - float(tempo_decorrido or 0)
+            self.tempo_inicial = time.monotonic() - float(tempo_decorrido or 0)
         else:
-            self.tempo_inicial = time.time()
+            self.tempo_inicial = time.monotonic()
+
+        # Troca de arquivo: encerra o gravador anterior antes de abrir o novo
+        if self.gravador is not None:
+            self.gravador.parar()
+
+        self.gravador = self._criar_gravador(
+            decimador=criar_decimador(decimacao, t0=self.tempo_inicial),
+            politica=PoliticaFlush(flush, fsync=fsync),
+            formato=self._criar_formato(formato),
+        )
+        # Cabeçalho criado já aqui: o arquivo existe assim que a tela abre
+        self.gravador.formato.criar(self.arquivo_csv)
+        self.gravador.resumo = self._catalogar(retomar, tempo_decorrido, metadados)
+        self.gravador.start()
+
+    def _catalogar(self, retomar, tempo_decorrido, metadados):
+        """Registra a gravação no catálogo da pasta e devolve o ResumoGravacao (None se falhar)."""
+        try:
+            catalogo = Catalogo(os.path.dirname(self.arquivo_csv))
+            resumo = ResumoGravacao(catalogo, self.arquivo_csv)
+            anterior = catalogo.obter(self.arquivo_csv) if retomar else None
+            resumo.continuar(anterior)
+            # arquivo novo (ou sobrescrito): o resumo antigo da linha é zerado
+            campos = resumo.campos()
+            campos.update({k: v for k, v in (metadados or {}).items() if v not in (None, "")})
+            if not (anterior and anterior.get("inicio")):
+                campos.setdefault("inicio", time.time() - float(tempo_decorrido or 0))
+            catalogo.registrar(self.arquivo_csv, **campos)
+            return resumo
+        except Exception as e:
+            print(f"[CATALOGO] Gravação fora do catálogo: {e}")
+            return None
+
+    def definir_captura(self, caminho):
+        """Grava as linhas cruas recebidas e os comandos enviados (core/captura.py)."""
+        self._fechar_captura()
+        self.captura = GravadorCaptura(caminho, self.porta)
+
+    def _fechar_captura(self):
+        if self.captura is not None:
+            self.captura.fechar()
+            self.captura = None
+
+    def _criar_gravador(self, **opcoes):
+        return GravadorCSV(self.arquivo_csv, self.tempo_inicial, **opcoes)
+
+    def _criar_formato(self, formato):
+        if formato is None:
+            formato = "bin" if self.arquivo_csv.lower().endswith(FormatoBinario.extensao) else "csv"
+        if formato == "bin":
+            return FormatoBinario()
+        if formato == "csv":
+            return FormatoCSV()
+        raise ValueError(f"Formato de gravação desconhecido: {formato}")
 
-        self._last_save_time = 0.0
-        
     def restaurar_estado(self, modo, carga, descarga):
         """Restaura estado lógico após retomada."""
         self.modo = modo
@@ -103,43 +223,206 @@ class ESPReader(threading.Thread):
         except:
             self._ciclo_cache = 0
 
-    def salvar_csv(self, tensao, corrente):
-        """Salva uma linha no CSV. Throttling para evitar duplicatas."""
+    def gravar_amostra(self, amostra):
+        """Entrega a amostra à thread gravadora (decimação e escrita ocorrem lá)."""
         # Bloqueia gravação se já requisitado parar
         if self._stop_requested:
             return
 
-        # Só grava se arquivo definido e gravação periódica ativada (enviando)
-        if not self.arquivo_csv:
-            return
-        # Se gravação periódica não estiver ativa, não gravar (evita gravação pela UI)
-        if not self.enviando:
+        # Só grava se arquivo definido e gravação ativada (enviando)
+        if self.gravador is None or not self.enviando:
             return
 
-        agora = time.time()
-        if agora - self._last_save_time < self._save_min_interval:
-            # evita gravações repetidas muito próximas (ex.: run + timer + UI)
+        self.gravador.enfileirar(amostra, self._ciclo_cache)
+
+    # ===============================
+    # Loop de leitura principal
+    # ===============================
+    @property
+    def ultima_tensao(self):
+        a = self.amostra
+        return a.tensao if a is not None else None
+
+    @property
+    def corrente(self):
+        a = self.amostra
+        return a.corrente if a is not None else None
+
+    def _processar_bloco(self, linhas, recebido):
+        """
+        Linhas completas de uma leitura da serial feita em `recebido`
+        (monotonic). Uma leitura pode trazer dezenas de quadros acumulados
+        desde a anterior; em vez de todos no mesmo instante, o tempo entre
+        as duas leituras é repartido igualmente entre eles (o último fica em
+        `recebido`). Na primeira leitura da conexão, o passo é o tempo de
+        transmissão das linhas no baudrate.
+        """
+        n = len(linhas)
+        anterior = self._leitura_anterior
+        self._leitura_anterior = recebido
+        self.metricas.registrar_leitura(n)
+        if anterior is not None and recebido > anterior:
+            passo = (recebido - anterior) / n
+        else:
+            passo = sum(len(l) + 1 for l in linhas) * 10 / self.baudrate / n
+        for i, linha in enumerate(linhas):
+            self._processar_linha(linha, recebido - (n - 1 - i) * passo)
+
+    def _processar_linha(self, linha, t):
+        """Interpreta uma linha crua (bytes) recebida em `t` (monotonic) e grava no CSV."""
+        if self.captura is not None:
+            self.captura.recebida(linha, t)
+        inicio = time.perf_counter()
+        leitura = self.parser.interpretar(linha)
+        if leitura is None:
+            # Respostas aos comandos confirmam os envios pendentes
+            if not linha.startswith(b"Vbat:"):
+                self.bateria_controller.receber_resposta(linha, t)
             return
 
-        self._last_save_time = agora
+        self.metricas.registrar_quadro(t, time.perf_counter() - inicio)
+        self._seq += 1
+        amostra = Amostra(self._seq, t, *leitura)
+        self.amostras.adicionar(amostra)
+        # Publicação: quem lê self.amostra vê o quadro inteiro ou o anterior
+        self.amostra = amostra
+
+        self.modo = leitura.modo
+        self.carga = leitura.carga
+        self.descarga = leitura.descarga
 
-        t = agora - self.tempo_inicial
+        self.gravar_amostra(amostra)
 
-        ciclo = getattr(self, "_ciclo_cache", 0)
+    # ===============================
+    # Quedas da conexão
+    # ===============================
+    def _inicio_queda(self):
+        """Registra a queda: fecha a serial, marca a lacuna e cancela os comandos pendentes."""
+        self.conectado = False
+        self.quedas += 1
         try:
-            with open(self.arquivo_csv, "a", newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    f"{t:.1f}",
-                    f"{tensao:.3f}" if tensao is not None else "",
-                    f"{corrente:.3f}" if corrente is not None else "",
-                    self.modo,
-                    self.carga,
-                    self.descarga,
-                    ciclo
-                ])
-        except Exception as e:
-            print(f"[ESPReader] Erro ao escrever CSV: {e}")
+            if self.ser is not None:
+                self.ser.close()
+        except Exception:
+            pass
+        self.bateria_controller.cancelar_pendentes("Conexão perdida")
+        ultima = self.amostra
+        self.gravar_amostra(marca_lacuna(ultima.t if ultima is not None else time.monotonic()))
+        print(f"⚠️ Conexão com a ESP32 perdida ({self.porta}). "
+              f"Tentando reconectar por até {self.orcamento_queda:.0f} s...")
+        return time.monotonic()
+
+    def _atrasos_reconexao(self, inicio):
+        """Gera as esperas entre tentativas (exponencial), até acabar o orçamento da queda."""
+        atraso, maximo = self.ATRASO_RECONEXAO
+        while True:
+            restante = self.orcamento_queda - (time.monotonic() - inicio)
+            if restante <= 0:
+                return
+            yield min(atraso, restante)
+            atraso = min(atraso * 2, maximo)
+
+    def _fim_queda(self, porta, ser, inicio):
+        """A placa voltou: retoma a leitura e reaplica o estado dos relés."""
+        self.porta = porta
+        self.ser = ser
+        self._separador.limpar()
+        self._leitura_anterior = None
+        self._ultimo_dado_ts = time.time()
+        duracao = time.monotonic() - inicio
+        self.tempo_sem_conexao += duracao
+        self.metricas.reiniciar_intervalo()
+        self.conectado = True
+        print(f"✅ ESP32 reconectada em {porta} após {duracao:.1f} s sem conexão.")
+        self.bateria_controller.restaurar_estado(self.modo, self.carga, self.descarga)
+
+    def _desistir_queda(self, inicio):
+        print(f"❌ ESP32 não voltou em {time.monotonic() - inicio:.0f} s: teste interrompido.")
+
+    # ===============================
+    # Diagnóstico do enlace
+    # ===============================
+    def diagnostico(self):
+        """
+        Retrato da saúde do enlace serial: contadores, taxas desde a
+        consulta anterior e resumos (n, média, min, p50, p90, p99, max, em s)
+        do intervalo entre quadros, do tempo de interpretação e da latência
+        dos comandos. Só é calculado aqui, quando alguém pergunta.
+
+        O intervalo entre quadros usa os instantes repartidos por
+        _processar_bloco: dentro de uma leitura com vários quadros ele é a
+        média da leitura, então o p50/jitter mostram o ritmo das leituras.
+        Quantos quadros cada leitura trouxe vai à parte, em
+        "quadros_por_leitura" (média) e "max_quadros_leitura".
+        """
+        m = self.metricas
+        parser = self.parser
+        controlador = self.bateria_controller
+        quadros_s, bytes_s = m.taxas(parser.quadros, time.monotonic())
+        intervalo = m.intervalo.resumo()
+        jitter = None
+        if intervalo["n"]:
+            jitter = intervalo["p99"] - intervalo["p50"]
+        return {
+            "conectado": self.conectado,
+            "quadros": parser.quadros,
+            "quadros_s": quadros_s,
+            "bytes": m.bytes,
+            "bytes_s": bytes_s,
+            "malformados": parser.malformados,
+            "ultima_malformada": parser.ultima_malformada,
+            "outras_linhas": parser.outras,
+            "bytes_descartados": self._separador.descartados,
+            "perdidas_buffer": self.amostras.perdidas,
+            "descartadas_gravacao": self.gravador.descartadas if self.gravador is not None else 0,
+            "quase_timeout": m.quase_timeout,
+            "quedas": self.quedas,
+            "tempo_sem_conexao": self.tempo_sem_conexao,
+            "reenvios": controlador.reenvios,
+            "falhas_comando": controlador.falhas,
+            "respostas_orfas": controlador.respostas_orfas,
+            "intervalo": intervalo,
+            "jitter": jitter,
+            "quadros_por_leitura": m.linhas_lidas / m.leituras if m.leituras else None,
+            "max_quadros_leitura": m.max_linhas_leitura,
+            "interpretacao": m.interpretacao.resumo(),
+            "latencia_comando": controlador.latencia.resumo(),
+        }
+
+    def _parar_gravacao(self):
+        """Interrompe a gravação, fechando a janela do decimador em aberto."""
+        if self.enviando:
+            self.enviando = False
+            if self.gravador is not None:
+                self.gravador.descarregar()
+
+
+class ESPReader(NucleoLeitura, threading.Thread):
+    """
+    Thread que lê dados da ESP32 via serial.
+    A leitura é em bloco: cada chamada pega tudo que está em in_waiting e
+    a thread só acorda quando chegam dados (ou no timeout do watchdog).
+    Cada quadro válido é gravado no CSV uma única vez, com o tempo medido por
+    time.monotonic() na recepção; a taxa gravada pode ser reduzida de
+    propósito por um decimador (ver core/decimacao.py). A escrita em disco é
+    feita por uma thread GravadorCSV com o arquivo sempre aberto.
+    As tarefas periódicas (envio de USB ON, watchdog e reenvio de comandos)
+    não têm thread própria: rodam no Agendador compartilhado por todas as
+    placas (ver core/agendador.py).
+    Se a conexão cair, a thread tenta reabrir a placa em vez de encerrar
+    (ver NucleoLeitura); só termina sozinha quando o orçamento da queda acaba.
+    """
+
+    def __init__(self, porta=None, baudrate=115200, agendador=None, orcamento_queda=None):
+        threading.Thread.__init__(self, daemon=True)
+        NucleoLeitura.__init__(self, porta, baudrate, orcamento_queda)
+        # Interrompe a espera entre tentativas de reconexão
+        self._parada = threading.Event()
+
+        # Tarefas periódicas (no agendador compartilhado)
+        self.agendador = agendador or agendador_padrao()
+        self._tarefa_envio = None
+        self._tarefas_leitura = []
 
     # ===============================
     # Conexão
@@ -147,47 +430,25 @@ class ESPReader(threading.Thread):
     def conectar(self):
         try:
             if self.porta is None:
-                portas = list(serial.tools.list_ports.comports())
-                if not portas:
-                    raise Exception("Nenhuma porta serial encontrada.")
-
-                for p in portas:
-                    try:
-                        self.ser = serial.Serial(
-                            p.device,
-                            self.baudrate,
-                            timeout=0.2  # <<< CRÍTICO
-                        )
-                        time.sleep(1)
-                        try:
-                            self.ser.reset_input_buffer()
-                        except:
-                            pass
-
-                        linha = self.ser.readline().decode(errors="ignore").strip()
-                        if linha:
-                            self.porta = p.device
-                            print(f"✅ ESP32 detectada na porta {p.device}")
-                            break
-                        else:
-                            self.ser.close()
-                            self.ser = None
-                    except Exception:
-                        continue
-
-                if not self.ser:
-                    raise Exception("Nenhuma ESP32 respondendo.")
+                # Sondagem paralela com handshake, começando pela placa do cache
+                self.porta, self.ser = detectar_esp(self.baudrate)
+                self.ser.timeout = 0.2  # <<< CRÍTICO
+                print(f"✅ ESP32 detectada na porta {self.porta}")
 
             else:
-                self.ser = serial.Serial(
+                # serial_for_url: aceita também replay:// (core/urlhandler)
+                self.ser = serial.serial_for_url(
                     self.porta,
                     self.baudrate,
                     timeout=0.2  # <<< CRÍTICO
                 )
-                time.sleep(1)
+                if not e_url(self.porta):
+                    time.sleep(1)
                 print(f"✅ Conectado manualmente à ESP32 na porta {self.porta}")
 
+            self._identidade = identidade_porta(self.porta)
             self.running = True
+            self.conectado = True
 
         except Exception as e:
             print("❌ Erro ao conectar à ESP32:", e)
@@ -215,54 +476,48 @@ class ESPReader(threading.Thread):
             return
 
         self._ultimo_dado_ts = time.time()
+        self._separador.limpar()
+        self._leitura_anterior = None
+        self._tarefas_leitura = [
+            self.agendador.agendar_periodico(0.5, self._verificar_watchdog, nome=f"watchdog {self.porta}"),
+            self.agendador.agendar_periodico(
+                0.1, self.bateria_controller.verificar_prazos, nome=f"reenvio {self.porta}"
+            ),
+        ]
 
         while self.running and not self._stop_requested:
-            agora = time.time()
-
-            # -------- WATCHDOG --------
-            if agora - self._ultimo_dado_ts > self._timeout_serial:
-                print("❌ Timeout serial: ESP desconectada.")
+            if not self.conectado and not self._reconectar():
                 break
-
             try:
                 if not (self.ser and self.ser.is_open):
                     raise Exception("Serial fechada")
 
-                linha = self.ser.readline().decode(errors="ignore").strip()
-            except Exception:
-                time.sleep(0.1)
+                # Bloqueia até chegar ao menos 1 byte (ou o timeout da porta)
+                # e depois pega de uma vez tudo que já está no buffer do SO.
+                dados = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                if not self._stop_requested:
+                    print(f"❌ Erro de leitura na porta {self.porta}: {e}")
+                    self.conectado = False
+                continue
+
+            if not dados:
                 continue
 
-            if not linha:
-                time.sleep(0.05)
+            self.metricas.bytes += len(dados)
+            linhas = self._separador.alimentar(dados)
+            if not linhas:
                 continue
 
             # -------- DADO RECEBIDO --------
-            self._ultimo_dado_ts = agora
-
-            if linha.startswith("Vbat:"):
-                partes = [p.strip() for p in linha.split("|")]
-                if len(partes) >= 5:
-                    try:
-                        self.ultima_tensao = float(
-                            partes[0].split(":")[1].replace("V", "").strip()
-                        )
-                        self.modo = partes[1].split(":")[1].strip()
-                        self.carga = partes[2].split(":")[1].strip()
-                        self.descarga = partes[3].split(":")[1].strip()
-                        self.corrente = float(
-                            partes[4].split(":")[1].replace("A", "").strip()
-                        )
-
-                        self.salvar_csv(
-                            self.ultima_tensao,
-                            self.corrente
-                        )
-                    except:
-                        pass
+            self._ultimo_dado_ts = time.time()
+            self._processar_bloco(linhas, time.monotonic())
 
         # -------- ENCERRAMENTO --------
         falha_inesperada = not self._stop_requested
+        for tarefa in self._tarefas_leitura:
+            tarefa.cancelar()
+        self.bateria_controller.cancelar_pendentes()
 
         try:
             if self.ser and self.ser.is_open:
@@ -271,6 +526,7 @@ class ESPReader(threading.Thread):
             pass
 
         self.running = False
+        self.conectado = False
 
         if falha_inesperada and self.controller:
             self.controller.after(
@@ -278,86 +534,65 @@ class ESPReader(threading.Thread):
                 self.controller._esp_desconectada_inesperadamente
             )
 
+    def _reconectar(self):
+        """
+        Tenta reabrir a placa até ela responder ou o orçamento da queda
+        acabar. Roda na thread de leitura; retorna False se desistiu (ou se
+        pediram para parar durante a espera).
+        """
+        inicio = self._inicio_queda()
+        for atraso in self._atrasos_reconexao(inicio):
+            if self._parada.wait(atraso):
+                return False
+            aberta = reabrir_esp(self.porta, self._identidade, self.baudrate)
+            if self._stop_requested:
+                if aberta:
+                    aberta[1].close()
+                return False
+            if aberta:
+                porta, ser = aberta
+                ser.timeout = 0.2
+                self._fim_queda(porta, ser, inicio)
+                return True
+        self._desistir_queda(inicio)
+        return False
+
     # ===============================
-    # Envio periódico de comando (USB ON) e inicio do loop de gravação
+    # Envio periódico de comando (USB ON) e início da gravação
     # ===============================
-    def _sending_thread(self):
-        """Thread que envia o comando USB ON a cada intervalo (se ativo)."""
-        while self._envio_ativo and self.ser and getattr(self.ser, "is_open", False):
-            try:
-                self.ser.write((self._envio_comando + "\n").encode())
-                print(f"📤 Enviado para ESP32: {self._envio_comando}")
-            except Exception as e:
-                print(f"[SERIAL] Falha ao enviar '{self._envio_comando}': {e}")
-            # aguarda intervalo, mas pode sair se _envio_ativo virar False
-            for _ in range(int(self._envio_intervalo * 10)):
-                if not self._envio_ativo:
-                    break
-                time.sleep(0.1)
-
-    def _loop_save(self):
-        """Loop de gravação periódica acionado via threading.Timer."""
-        if not self.enviando or self._stop_requested:
-            return
-        try:
-            # grava usando os últimos valores lidos
-            self.salvar_csv(self.ultima_tensao, self.corrente)
-        except Exception as e:
-            print("[ESPReader] erro ao salvar CSV:", e)
-        # agenda próxima execução
-        try:
-            self._save_timer = threading.Timer(self._save_interval, self._loop_save)
-            self._save_timer.daemon = True
-            self._save_timer.start()
-        except Exception as e:
-            print("[ESPReader] falha ao agendar next save:", e)
+    def _verificar_watchdog(self):
+        """Tarefa do agendador: avisa a thread de leitura se a ESP parar de enviar dados."""
+        if self.conectado and time.time() - self._ultimo_dado_ts > self._timeout_serial:
+            print("❌ Timeout serial: sem dados da ESP.")
+            # o laço de leitura tenta reconectar na próxima volta (no máximo o timeout da porta)
+            self.conectado = False
+
+    def _enviar_heartbeat(self):
+        """Tarefa do agendador: envia o comando periódico (USB ON)."""
+        if self.ser and getattr(self.ser, "is_open", False):
+            # Passa pelo BateriaController para não intercalar com outros comandos
+            self.bateria_controller.enviar(self._envio_comando)
 
     def iniciar_envio_periodico(self, comando="USB ON", intervalo=3):
-        """Inicia thread que envia comando periódico à ESP e inicia a gravação periódica."""
-        # Inicia envio de comando (thread contínua)
+        """Agenda o envio periódico do comando à ESP e ativa a gravação dos quadros."""
         try:
             self._envio_comando = comando
             self._envio_intervalo = intervalo
-            if not (self._thread_envio and self._thread_envio.is_alive()):
-                self._envio_ativo = True
-                self._thread_envio = threading.Thread(target=self._sending_thread, daemon=True)
-                self._thread_envio.start()
+            if self._tarefa_envio is None or self._tarefa_envio.cancelada:
+                self._tarefa_envio = self.agendador.agendar_periodico(
+                    intervalo, self._enviar_heartbeat, nome=f"{comando} {self.porta}", atraso=0
+                )
         except Exception as e:
-            print("[ESPReader] falha ao iniciar thread de envio:", e)
+            print("[ESPReader] falha ao agendar envio periódico:", e)
 
-        # Inicia gravação periódica (timer)
-        try:
-            if not self.enviando:
-                self.enviando = True
-                # garante que não temos timer ativo
-                try:
-                    if self._save_timer:
-                        self._save_timer.cancel()
-                except:
-                    pass
-                # começa loop de gravação
-                self._loop_save()
-        except Exception as e:
-            print("[ESPReader] falha ao iniciar gravação periódica:", e)
+        # Ativa a gravação de cada quadro recebido
+        self.enviando = True
 
     def parar_envio_periodico(self):
-        """Interrompe o envio periódico e a gravação periódica."""
-        self._envio_ativo = False
-        try:
-            if self._thread_envio and self._thread_envio.is_alive():
-                # thread verá _envio_ativo False e terminará
-                pass
-        except:
-            pass
-
-        # para gravação periódica
-        self.enviando = False
-        try:
-            if self._save_timer:
-                self._save_timer.cancel()
-        except:
-            pass
-        self._save_timer = None
+        """Interrompe o envio periódico e a gravação."""
+        if self._tarefa_envio is not None:
+            self._tarefa_envio.cancelar()
+        self._parar_gravacao()
 
     # ===============================
     # Encerramento
@@ -366,6 +601,7 @@ class ESPReader(threading.Thread):
         """Parada limpa: impede gravação e encerra conexão serial."""
         self._stop_requested = True
         self.running = False
+        self._parada.set()
 
         # para timers/loops
         try:
@@ -373,7 +609,18 @@ class ESPReader(threading.Thread):
         except:
             pass
 
-        # fecha serial para desbloquear readline
+        # grava o que falta e fecha o arquivo
+        try:
+            if self.gravador is not None:
+                self.gravador.parar()
+        except Exception as e:
+            print("[ESPReader] erro ao encerrar gravador:", e)
+
+        # comandos ainda sem resposta não serão mais confirmados
+        self.bateria_controller.cancelar_pendentes()
+        self._fechar_captura()
+
+        # fecha serial para desbloquear a leitura
         try:
             if self.ser:
                 try:
@@ -0,0 +1,497 @@
+# core/monitor_async.py
+"""
+Leitor da ESP32 sobre asyncio (só POSIX).
+
+Em vez de uma thread bloqueada em serial.read() por placa, o descritor da
+serial é registrado no event loop com loop.add_reader(): o loop só acorda
+quando há bytes para ler, e um único loop atende dezenas de placas. O envio
+de USB ON, o watchdog, o reenvio de comandos e a gravação do CSV rodam como
+tarefas no mesmo loop.
+
+O LeitorAsync tem a mesma interface pública do ESPReader (amostra,
+amostras, definir_csv, iniciar_envio_periodico, parar, start...), então a
+UI Tk pode usá-lo sem mudanças: start() o coloca na PonteAsync, um event
+loop rodando numa thread de fundo. Para código asyncio puro:
+
+    leitor = LeitorAsync("/dev/ttyUSB0")
+    tarefa = asyncio.create_task(leitor.executar())
+    async for amostra in leitor:
+        ...
+
+criar_leitor() escolhe entre ESPReader (padrão) e LeitorAsync (com a
+variável de ambiente BATERIA_LEITOR=async, em POSIX).
+"""
+import asyncio
+import os
+import threading
+import time
+
+from .autodetect import abrir_serial, detectar_esp, identidade_porta, reabrir_esp
+from .gravador import NucleoGravacao
+from .monitor import ESPReader, NucleoLeitura
+from .urlhandler import e_url
+
+
+def _no_loop(loop):
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def _agendar(loop, coro):
+    """Cria a tarefa no `loop` a partir de qualquer thread. Retorna algo com cancel()/done()."""
+    if _no_loop(loop):
+        return loop.create_task(coro)
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def _cancelar(loop, tarefa):
+    if tarefa is None:
+        return
+    if isinstance(tarefa, asyncio.Task) and not _no_loop(loop):
+        loop.call_soon_threadsafe(tarefa.cancel)
+    else:
+        tarefa.cancel()
+
+
+# ===============================
+# Ponte para a UI (loop numa thread de fundo)
+# ===============================
+class PonteAsync:
+    """Roda um event loop numa thread de fundo e recebe corrotinas de outras threads."""
+
+    def __init__(self, nome="PonteAsync"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._rodar, daemon=True, name=nome)
+        self._thread.start()
+
+    def _rodar(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def executar(self, coro):
+        """Agenda a corrotina no loop; retorna um concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def chamar(self, funcao, *args):
+        self.loop.call_soon_threadsafe(funcao, *args)
+
+    def parar(self, timeout=1.0):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+
+_ponte = None
+_lock_ponte = threading.Lock()
+
+
+def ponte_padrao():
+    """Ponte compartilhada pelo aplicativo (criada na primeira chamada)."""
+    global _ponte
+    with _lock_ponte:
+        if _ponte is None or not _ponte._thread.is_alive():
+            _ponte = PonteAsync()
+        return _ponte
+
+
+# ===============================
+# Gravação como tarefa do loop
+# ===============================
+class GravadorAsync(NucleoGravacao):
+    """
+    Mesma gravação do GravadorCSV, mas como tarefa asyncio. A escrita vai
+    para o buffer do arquivo no próprio loop; só o fsync (que pode demorar)
+    é feito no executor, enquanto as outras placas continuam sendo lidas.
+    """
+    _DESCARREGAR = object()
+    _PARAR = object()
+
+    def __init__(self, caminho, tempo_inicial, loop, decimador=None, politica=None, formato=None):
+        super().__init__(caminho, tempo_inicial, decimador, politica, formato)
+        self.loop = loop
+        self.fila = asyncio.Queue()
+        self._tarefa = None
+        self._terminou = threading.Event()
+        self._fsync_ate = None
+
+    # ---------- lado produtor ----------
+    def start(self):
+        self._tarefa = _agendar(self.loop, self._executar())
+
+    def _colocar(self, item):
+        if _no_loop(self.loop):
+            self.fila.put_nowait(item)
+        else:
+            self.loop.call_soon_threadsafe(self.fila.put_nowait, item)
+
+    def enfileirar(self, amostra, ciclo):
+        if self.fila.qsize() >= self.CAPACIDADE_FILA:
+            self.descartadas += 1
+            return
+        self._colocar((amostra, ciclo))
+
+    def descarregar(self):
+        self._colocar(self._DESCARREGAR)
+
+    def parar(self, timeout=5.0):
+        self._colocar(self._PARAR)
+        if not _no_loop(self.loop):
+            self._terminou.wait(timeout)
+
+    async def aguardar(self):
+        while not self._terminou.is_set():
+            await asyncio.sleep(0.01)
+
+    # ---------- lado consumidor ----------
+    def flush(self):
+        # O fsync fica para depois do lote, fora do loop (ver _executar)
+        self._ultimo_flush = time.monotonic()
+        if not self._pendentes:
+            return
+        self.arquivo.flush()
+        self._pendentes = 0
+        if self.politica.fsync:
+            self._fsync_ate = self.linhas_gravadas
+        else:
+            self.linhas_duraveis = self.linhas_gravadas
+        self.publicar_resumo()
+
+    async def _sincronizar(self):
+        if self._fsync_ate is None:
+            return
+        ate, self._fsync_ate = self._fsync_ate, None
+        try:
+            await self.loop.run_in_executor(None, os.fsync, self.arquivo.fileno())
+            self.linhas_duraveis = ate
+        except Exception as e:
+            self.erros += 1
+            print(f"[Gravador] Erro no fsync de {self.caminho}: {e}")
+
+    async def _executar(self):
+        try:
+            self.abrir()
+        except Exception as e:
+            print(f"[Gravador] Não foi possível abrir {self.caminho}: {e}")
+            self.erros += 1
+            self._terminou.set()
+            return
+
+        try:
+            while True:
+                prazo = self.prazo_flush()
+                try:
+                    if prazo is None:
+                        item = await self.fila.get()
+                    else:
+                        item = await asyncio.wait_for(self.fila.get(), prazo)
+                except asyncio.TimeoutError:
+                    self.flush()
+                    await self._sincronizar()
+                    continue
+
+                lote = []
+                controle = None
+                while True:
+                    if item is self._DESCARREGAR or item is self._PARAR:
+                        controle = item
+                        break
+                    lote.append(item)
+                    if self.fila.empty() or len(lote) >= 1024:
+                        break
+                    item = self.fila.get_nowait()
+
+                if lote:
+                    self.gravar_lote(lote)
+                if controle is not None:
+                    self.finalizar_decimador()
+                    self.flush()
+                elif self.flush_vencido():
+                    self.flush()
+                await self._sincronizar()
+                if controle is self._PARAR:
+                    return
+        finally:
+            self.flush()
+            await self._sincronizar()
+            try:
+                self.arquivo.close()
+            except Exception as e:
+                print(f"[Gravador] Erro ao fechar {self.caminho}: {e}")
+            self.publicar_resumo(forcar=True)
+            self._terminou.set()
+
+
+# ===============================
+# Leitor
+# ===============================
+class LeitorAsync(NucleoLeitura):
+    """
+    Leitor de uma placa dirigido pelo event loop (loop.add_reader).
+    Os quadros recebidos ficam em `amostra`/`amostras`, como no ESPReader,
+    e também podem ser consumidos com `async for amostra in leitor`.
+    """
+
+    def __init__(self, porta=None, baudrate=115200, loop=None, ponte=None, orcamento_queda=None):
+        if os.name != "posix":
+            raise RuntimeError("LeitorAsync requer POSIX (loop.add_reader em serial).")
+        super().__init__(porta, baudrate, orcamento_queda)
+        self.ponte = ponte
+        self.loop = loop if loop is not None else (ponte.loop if ponte is not None else None)
+
+        self._fd = None
+        self._fim = None          # asyncio.Event criado no loop em executar()
+        self._tarefas = []
+        self._tarefa_envio = None
+        self._execucao = None
+        self._finalizado = threading.Event()
+        self._assinantes = set()
+
+    def _obter_loop(self):
+        if self.loop is None:
+            try:
+                self.loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.ponte = ponte_padrao()
+                self.loop = self.ponte.loop
+        return self.loop
+
+    def _criar_gravador(self, **opcoes):
+        return GravadorAsync(self.arquivo_csv, self.tempo_inicial, self._obter_loop(), **opcoes)
+
+    # ===============================
+    # Conexão e laço
+    # ===============================
+    async def conectar(self):
+        loop = asyncio.get_running_loop()
+        try:
+            if self.porta is None:
+                self.porta, self.ser = await loop.run_in_executor(None, detectar_esp, self.baudrate)
+                print(f"✅ ESP32 detectada na porta {self.porta}")
+            else:
+                self.ser = await loop.run_in_executor(None, abrir_serial, self.porta, self.baudrate, 0)
+                print(f"✅ Conectado à ESP32 na porta {self.porta}")
+            self.ser.timeout = 0   # leituras nunca bloqueiam o loop
+            self._identidade = await loop.run_in_executor(None, identidade_porta, self.porta)
+            self.running = True
+            self.conectado = True
+        except Exception as e:
+            print("❌ Erro ao conectar à ESP32:", e)
+            self.running = False
+            raise
+
+    async def executar(self):
+        """Conecta (se preciso) e lê até parar() ou até a ESP cair e não voltar."""
+        self.loop = asyncio.get_running_loop()
+        self._fim = asyncio.Event()
+        self.running = True
+        self._stop_requested = False
+        self._finalizado.clear()
+
+        try:
+            if not self.ser:
+                await self.conectar()
+        except Exception:
+            self._finalizado.set()
+            self._avisar_queda()
+            return
+
+        self._ultimo_dado_ts = time.time()
+        self._separador.limpar()
+        self._leitura_anterior = None
+        self._tarefas = [
+            self.loop.create_task(self._watchdog()),
+            self.loop.create_task(self._reenvios()),
+        ]
+
+        try:
+            while not self._stop_requested:
+                self._fd = self.ser.fileno()
+                self.loop.add_reader(self._fd, self._ao_ler)
+                try:
+                    await self._fim.wait()
+                finally:
+                    self.loop.remove_reader(self._fd)
+                if self._stop_requested or not await self._reconectar():
+                    break
+        finally:
+            for tarefa in self._tarefas:
+                tarefa.cancel()
+            _cancelar(self.loop, self._tarefa_envio)
+            self.bateria_controller.cancelar_pendentes()
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+            self.running = False
+            self.conectado = False
+            for fila in list(self._assinantes):
+                fila.put_nowait(None)
+            self._finalizado.set()
+
+        if not self._stop_requested:
+            self._avisar_queda()
+
+    def _ao_ler(self):
+        """Callback do loop: há bytes na serial."""
+        try:
+            dados = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            dados = b""
+        if not dados:
+            print("❌ Serial fechada: ESP desconectada.")
+            self.conectado = False
+            self._fim.set()
+            return
+
+        self.metricas.bytes += len(dados)
+        linhas = self._separador.alimentar(dados)
+        if not linhas:
+            return
+
+        self._ultimo_dado_ts = time.time()
+        self._processar_bloco(linhas, time.monotonic())
+
+    def _processar_linha(self, linha, t):
+        anterior = self.amostra
+        super()._processar_linha(linha, t)
+        amostra = self.amostra
+        if amostra is not anterior and self._assinantes:
+            for fila in self._assinantes:
+                if fila.full():
+                    fila.get_nowait()   # consumidor lento: descarta a mais antiga
+                fila.put_nowait(amostra)
+
+    async def _reconectar(self):
+        """Versão assíncrona de ESPReader._reconectar (a sondagem roda no executor)."""
+        inicio = self._inicio_queda()
+        self._fim.clear()
+        for atraso in self._atrasos_reconexao(inicio):
+            try:
+                # parar() acorda a espera pelo mesmo _fim
+                await asyncio.wait_for(self._fim.wait(), atraso)
+                return False
+            except asyncio.TimeoutError:
+                pass
+            aberta = await self.loop.run_in_executor(
+                None, reabrir_esp, self.porta, self._identidade, self.baudrate
+            )
+            if self._stop_requested:
+                if aberta:
+                    aberta[1].close()
+                return False
+            if aberta:
+                porta, ser = aberta
+                ser.timeout = 0
+                self._fim_queda(porta, ser, inicio)
+                return True
+        self._desistir_queda(inicio)
+        return False
+
+    async def _watchdog(self):
+        while True:
+            await asyncio.sleep(0.5)
+            if self.conectado and time.time() - self._ultimo_dado_ts > self._timeout_serial:
+                print("❌ Timeout serial: sem dados da ESP.")
+                self.conectado = False
+                self._fim.set()
+
+    async def _reenvios(self):
+        while True:
+            await asyncio.sleep(0.1)
+            self.bateria_controller.verificar_prazos()
+
+    def _avisar_queda(self):
+        if self.controller:
+            self.controller.after(0, self.controller._esp_desconectada_inesperadamente)
+
+    # ===============================
+    # Amostras como iterador assíncrono
+    # ===============================
+    def __aiter__(self):
+        return self.assinar()
+
+    async def assinar(self, maximo=1024):
+        """Gera cada nova amostra; termina quando a leitura acaba."""
+        fila = asyncio.Queue(maximo)
+        self._assinantes.add(fila)
+        try:
+            while True:
+                amostra = await fila.get()
+                if amostra is None:
+                    return
+                yield amostra
+        finally:
+            self._assinantes.discard(fila)
+
+    # ===============================
+    # Envio periódico (tarefa no loop)
+    # ===============================
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        prazo = loop.time()
+        while True:
+            if self.ser and getattr(self.ser, "is_open", False):
+                self.bateria_controller.enviar(self._envio_comando)
+            prazo += self._envio_intervalo
+            await asyncio.sleep(max(0.0, prazo - loop.time()))
+
+    def iniciar_envio_periodico(self, comando="USB ON", intervalo=3):
+        """Inicia a tarefa de envio periódico e ativa a gravação dos quadros."""
+        self._envio_comando = comando
+        self._envio_intervalo = intervalo
+        if self._tarefa_envio is None or self._tarefa_envio.done():
+            self._tarefa_envio = _agendar(self._obter_loop(), self._heartbeat())
+        self.enviando = True
+
+    def parar_envio_periodico(self):
+        _cancelar(self.loop, self._tarefa_envio)
+        self._tarefa_envio = None
+        self._parar_gravacao()
+
+    # ===============================
+    # Interface de thread (para a UI)
+    # ===============================
+    def start(self):
+        """Roda executar() na ponte (event loop em thread de fundo)."""
+        loop = self._obter_loop()
+        self._execucao = _agendar(loop, self.executar())
+
+    def is_alive(self):
+        return self._execucao is not None and not self._finalizado.is_set()
+
+    def join(self, timeout=None):
+        self._finalizado.wait(timeout)
+
+    def parar(self):
+        """Parada limpa; pode ser chamada de qualquer thread."""
+        self._stop_requested = True
+        self.running = False
+        try:
+            self.parar_envio_periodico()
+        except Exception:
+            pass
+        try:
+            if self.gravador is not None:
+                self.gravador.parar()
+        except Exception as e:
+            print("[LeitorAsync] erro ao encerrar gravador:", e)
+        self._fechar_captura()
+        if self.loop is not None and self._fim is not None:
+            self.loop.call_soon_threadsafe(self._fim.set)
+            if not _no_loop(self.loop):
+                self._finalizado.wait(1)
+
+
+def criar_leitor(porta=None, baudrate=115200, orcamento_queda=None):
+    """
+    ESPReader (thread) por padrão; LeitorAsync com BATERIA_LEITOR=async em POSIX.
+    URLs (replay://...) sempre usam o ESPReader: portas virtuais não têm descritor.
+    """
+    if (os.environ.get("BATERIA_LEITOR", "").lower() == "async" and os.name == "posix"
+            and not e_url(porta)):
+        return LeitorAsync(porta, baudrate, ponte=ponte_padrao(), orcamento_queda=orcamento_queda)
+    return ESPReader(porta=porta, baudrate=baudrate, orcamento_queda=orcamento_queda)
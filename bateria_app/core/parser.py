@@ -0,0 +1,117 @@
+# core/parser.py
+import re
+from typing import NamedTuple, Optional
+
+
+class Leitura(NamedTuple):
+    """Um quadro de telemetria já convertido. corrente é None no firmware sem ACS712."""
+    tensao: float
+    corrente: Optional[float]
+    modo: str
+    carga: str
+    descarga: str
+
+
+# Quadro impresso pelos firmwares v_2.0 a v_4.0:
+#   Vbat: 3.874 V | Mode: AUTO | Charge: ON | Disch: OFF | Corrente: 0.123 A
+# O firmware antigo (outros/monitor_serial_python) não tem o campo Corrente.
+# Aceita espaços extras, \r\n e "nan"/"inf" (Serial.print de float inválido).
+_NUM = rb"(-?(?:\d+(?:\.\d*)?|\.\d+)|-?nan|-?inf|ovf)"
+_PADRAO_QUADRO = re.compile(
+    rb"Vbat:\s*" + _NUM + rb"\s*V\s*"
+    rb"\|\s*Mode:\s*(AUTO|MANUAL)\s*"
+    rb"\|\s*Charge:\s*(ON|OFF)\s*"
+    rb"\|\s*Disch:\s*(ON|OFF)"
+    rb"(?:\s*\|\s*Corrente:\s*" + _NUM + rb"\s*A)?"
+    rb"\s*$"
+)
+_PREFIXO = b"Vbat:"
+
+# Reaproveita sempre os mesmos objetos str para os campos de estado
+_ESTADOS = {b"AUTO": "AUTO", b"MANUAL": "MANUAL", b"ON": "ON", b"OFF": "OFF"}
+
+# Construtor direto da tupla, sem o __new__ em Python do NamedTuple
+_nova_leitura = tuple.__new__
+
+
+class ParserTelemetria:
+    """
+    Converte linhas cruas (bytes) da ESP32 em Leitura.
+    Linhas que começam com "Vbat:" mas não batem com o padrão são contadas
+    em `malformados` em vez de descartadas em silêncio; as demais linhas
+    (respostas a comandos, mensagens de boot) são contadas em `outras`.
+    """
+
+    def __init__(self):
+        self.quadros = 0
+        self.malformados = 0
+        self.outras = 0
+        self.ultima_malformada = None
+
+    def interpretar(self, linha):
+        """Retorna uma Leitura, ou None se a linha não for um quadro válido."""
+        if not linha.startswith(_PREFIXO):
+            self.outras += 1
+            return None
+
+        # Caminho rápido: layout exato do firmware, separado por espaços
+        # Vbat: x V | Mode: m | Charge: c | Disch: d [| Corrente: i A]
+        p = linha.split()
+        n = len(p)
+        try:
+            if (
+                (n == 16 or n == 12)
+                and p[2] == b"V" and p[4] == b"Mode:"
+                and p[7] == b"Charge:" and p[10] == b"Disch:"
+            ):
+                if n == 16:
+                    if p[13] != b"Corrente:" or p[15] != b"A":
+                        raise ValueError
+                    corrente = float(p[14])
+                else:
+                    corrente = None
+                leitura = _nova_leitura(
+                    Leitura,
+                    (float(p[1]), corrente, _ESTADOS[p[5]], _ESTADOS[p[8]], _ESTADOS[p[11]]),
+                )
+            else:
+                leitura = self._interpretar_tolerante(linha)
+        except (ValueError, KeyError, TypeError):
+            # TypeError: linha de tipo inesperado (bytearray não indexa _ESTADOS)
+            leitura = None
+
+        if leitura is None:
+            self.malformados += 1
+            self.ultima_malformada = linha
+            return None
+
+        self.quadros += 1
+        return leitura
+
+    @staticmethod
+    def _interpretar_tolerante(linha):
+        """Espaçamento fora do padrão: usa a expressão regular completa."""
+        m = _PADRAO_QUADRO.match(linha)
+        if m is None:
+            return None
+        tensao, modo, carga, descarga, corrente = m.groups()
+        return Leitura(
+            float(tensao),
+            float(corrente) if corrente is not None else None,
+            _ESTADOS[modo],
+            _ESTADOS[carga],
+            _ESTADOS[descarga],
+        )
+
+    def contadores(self):
+        return {
+            "quadros": self.quadros,
+            "malformados": self.malformados,
+            "outras": self.outras,
+        }
+
+    def zerar(self):
+        self.quadros = 0
+        self.malformados = 0
+        self.outras = 0
+        self.ultima_malformada = None
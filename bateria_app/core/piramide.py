@@ -0,0 +1,126 @@
+# core/piramide.py
+"""
+Pirâmide de mín/máx de uma gravação, para o gráfico do histórico
+desenhar qualquer trecho com um número limitado de pontos.
+
+O nível k divide as linhas em blocos de FATOR**(k + 1) linhas e guarda,
+de cada bloco, a linha da menor e a da maior tensão. Cada nível sai do
+anterior (FATOR blocos viram um), até sobrarem no máximo MAXIMO_TOPO
+blocos. Como só guarda índices de linha (int32), a pirâmide inteira ocupa
+cerca de um terço de um array de tensões, e os pontos desenhados são
+amostras reais: picos e vales aparecem no tempo em que aconteceram.
+
+Para desenhar um trecho numa largura de `pixels`, pontos() escolhe o
+nível mais fino que ainda tem no máximo dois blocos por pixel (as
+amostras cruas, se forem poucas) e devolve os mín/máx dos blocos do
+trecho: no máximo ~4 pontos por pixel, qualquer que seja o tamanho do
+arquivo ou o zoom.
+
+Calculada uma vez por gravação e guardada no CacheGravacoes (memória e
+sidecar "<gravação>.piramide.npz"), como o índice de segmentos.
+
+Usa numpy (importado aqui; o cli.py não carrega este módulo).
+"""
+import numpy as np
+
+
+class PiramideMinMax:
+    """Níveis da pirâmide: listas `imin` e `imax` (índices de linha), do mais fino ao mais grosso."""
+    FATOR = 4
+    MAXIMO_TOPO = 256   # blocos do nível mais grosso
+
+    def __init__(self, imin, imax):
+        self.imin = imin
+        self.imax = imax
+
+    @classmethod
+    def de_tensoes(cls, tensao):
+        """Pirâmide de um array de tensões (finitas, em ordem de tempo, como em core/historico.py)."""
+        tensao = np.asarray(tensao, dtype=float)
+        imin, imax = [], []
+        linhas = np.arange(len(tensao), dtype=np.int32)
+        bmin = bmax = linhas
+        while len(bmin) > cls.MAXIMO_TOPO:
+            bmin = cls._reduzir(bmin, tensao, np.argmin)
+            bmax = cls._reduzir(bmax, tensao, np.argmax)
+            imin.append(bmin)
+            imax.append(bmax)
+        return cls(imin, imax)
+
+    @classmethod
+    def _reduzir(cls, indices, tensao, escolher):
+        """Junta cada FATOR índices vizinhos no que tem a tensão escolhida (o último grupo pode ser menor)."""
+        completos = len(indices) // cls.FATOR * cls.FATOR
+        grupos = indices[:completos].reshape(-1, cls.FATOR)
+        escolhidos = grupos[np.arange(len(grupos)), escolher(tensao[grupos], axis=1)]
+        resto = indices[completos:]
+        if len(resto):
+            escolhidos = np.append(escolhidos, resto[escolher(tensao[resto])])
+        return escolhidos.astype(np.int32)
+
+    # Conversão para o CacheGravacoes (dicionário de arrays)
+    @classmethod
+    def de_arrays(cls, arrays):
+        niveis = len([nome for nome in arrays if nome.startswith("min")])
+        return cls([arrays[f"min{k}"] for k in range(niveis)], [arrays[f"max{k}"] for k in range(niveis)])
+
+    def arrays(self):
+        arrays = {f"min{k}": imin for k, imin in enumerate(self.imin)}
+        arrays.update({f"max{k}": imax for k, imax in enumerate(self.imax)})
+        return arrays
+
+    def __len__(self):
+        return len(self.imin)
+
+    def nivel(self, linhas, pixels):
+        """Nível mais fino com no máximo dois blocos por pixel para `linhas` linhas (-1: amostras cruas)."""
+        if linhas <= 4 * pixels:
+            return -1
+        k = 0
+        while k < len(self) - 1 and linhas / self.FATOR ** (k + 1) > 2 * pixels:
+            k += 1
+        return min(k, len(self) - 1)
+
+    def pontos(self, colunas, t0, t1, pixels, primeira=0, ultima=None):
+        """
+        (tempos, tensões) para desenhar o trecho [t0, t1] das colunas
+        (completas, as mesmas da pirâmide) em `pixels` de largura, só das
+        linhas [primeira, ultima). Inclui uma amostra de cada lado do
+        trecho, para a linha chegar às bordas do gráfico.
+        """
+        tempo, tensao = colunas["tempo"], colunas["tensao"]
+        ultima = len(tempo) if ultima is None else ultima
+        a = max(primeira, int(np.searchsorted(tempo, t0, side="left")) - 1)
+        b = min(ultima, int(np.searchsorted(tempo, t1, side="right")) + 1)
+        if b <= a:
+            return tempo[:0], tensao[:0]
+        k = self.nivel(b - a, max(int(pixels), 1))
+        if k < 0:
+            return tempo[a:b], tensao[a:b]
+
+        bloco = self.FATOR ** (k + 1)
+        # blocos inteiros dentro de [a, b) vêm da pirâmide; os das pontas,
+        # só em parte no trecho, têm o mín/máx refeito das linhas cruas
+        i0, i1 = -(-a // bloco), b // bloco
+        if i0 >= i1:
+            pontas = ((a, b),)
+            i1 = i0
+        else:
+            pontas = ((a, i0 * bloco), (i1 * bloco, b))
+        pares = [self._extremos(tensao, *pontas[0]),
+                 np.column_stack((self.imin[k][i0:i1], self.imax[k][i0:i1]))]
+        if len(pontas) > 1:
+            pares.append(self._extremos(tensao, *pontas[1]))
+        pares = np.concatenate(pares).astype(np.int64)
+        # mín e máx de cada bloco na ordem em que aconteceram
+        pares.sort(axis=1)
+        indices = np.concatenate(([a], pares.ravel(), [b - 1]))
+        return tempo[indices], tensao[indices]
+
+    @staticmethod
+    def _extremos(tensao, inicio, fim):
+        """[[linha do mín, linha do máx]] das linhas [inicio, fim) (vazio se não houver linhas)."""
+        if fim <= inicio:
+            return np.empty((0, 2), dtype=np.int64)
+        trecho = tensao[inicio:fim]
+        return np.array([[inicio + int(np.argmin(trecho)), inicio + int(np.argmax(trecho))]])
@@ -0,0 +1,209 @@
+# core/reducao.py
+"""
+Memória do gráfico em tempo real, limitada qualquer que seja a duração do
+teste.
+
+Uma tela de algumas centenas de pixels não mostra 200 mil pontos, mas
+também não pode perder um pico de um quadro nem a borda de um corte. A
+SerieCamadas guarda a série em três camadas:
+
+    recentes   amostras cruas dos últimos `janela_recente` s (no máximo
+               `max_recentes`)
+    médias     faixas de `largura_media` s com mín/média/máx, pelas
+               últimas `janela_media` s
+    longas     faixas mín/média/máx do resto do teste; quando passam de
+               `max_longas` a largura dobra e as vizinhas são fundidas
+
+O que sai de uma camada entra agregado na seguinte, então cada lote novo
+só mexe no fim da série (custo constante por amostra) e a memória é
+limitada pelas capacidades, não pelo tempo. Tudo fica em array('d'); a
+agregação de cada bloco é feita de uma vez com numpy.
+
+Para desenhar, pontos() devolve as amostras recentes e, de cada faixa
+mais antiga, o mínimo e o máximo: o contorno da série inteira, com os
+picos, em poucos milhares de pontos.
+
+Usa numpy (importado aqui; o cli.py não carrega este módulo).
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+class _Faixas:
+    """
+    Faixas de tempo de mesma largura, alinhadas a `origem`, da mais antiga
+    para a mais nova. Cada faixa guarda início, mínimo, máximo, soma e
+    número de amostras.
+    """
+    CAMPOS = ("t", "vmin", "vmax", "soma", "n")
+
+    def __init__(self, largura, origem):
+        self.largura = float(largura)
+        self.origem = origem
+        for campo in self.CAMPOS:
+            setattr(self, campo, array("d"))
+        self._inicio = 0   # faixas antes daqui já saíram (compactadas aos poucos)
+
+    def __len__(self):
+        return len(self.t) - self._inicio
+
+    def acrescentar(self, t, vmin, vmax, soma, n):
+        """Agrega amostras (ou faixas mais estreitas) em ordem de tempo, dadas em arrays numpy."""
+        if not len(t):
+            return
+        k = np.floor((t - self.origem) / self.largura)
+        inicios = np.concatenate(([0], np.flatnonzero(np.diff(k)) + 1))
+        novas = (
+            self.origem + k[inicios] * self.largura,
+            np.minimum.reduceat(vmin, inicios),
+            np.maximum.reduceat(vmax, inicios),
+            np.add.reduceat(soma, inicios),
+            np.add.reduceat(n, inicios),
+        )
+        if len(self) and self.t[-1] == novas[0][0]:
+            # a primeira faixa do bloco continua a última guardada
+            self.vmin[-1] = min(self.vmin[-1], novas[1][0])
+            self.vmax[-1] = max(self.vmax[-1], novas[2][0])
+            self.soma[-1] += novas[3][0]
+            self.n[-1] += novas[4][0]
+            novas = tuple(c[1:] for c in novas)
+        for campo, valores in zip(self.CAMPOS, novas):
+            getattr(self, campo).frombytes(valores.tobytes())
+
+    def retirar(self, quantidade):
+        """Tira as `quantidade` faixas mais antigas e as devolve como arrays numpy."""
+        a, b = self._inicio, self._inicio + quantidade
+        saida = tuple(np.array(getattr(self, campo)[a:b]) for campo in self.CAMPOS)
+        self._inicio = b
+        if self._inicio > 1024 and self._inicio * 2 > len(self.t):
+            for campo in self.CAMPOS:
+                del getattr(self, campo)[:self._inicio]
+            self._inicio = 0
+        return saida
+
+    def terminadas_antes(self, limite):
+        """Quantas faixas terminam até `limite`."""
+        return bisect_right(self.t, limite - self.largura, self._inicio) - self._inicio
+
+    def dobrar(self):
+        """Dobra a largura, fundindo as faixas vizinhas."""
+        antigas = self.retirar(len(self))
+        for campo in self.CAMPOS:
+            setattr(self, campo, array("d"))
+        self._inicio = 0
+        self.largura *= 2
+        self.acrescentar(*antigas)
+
+    def arrays(self):
+        """Cópias numpy (t, vmin, vmax, soma, n) das faixas guardadas."""
+        return tuple(np.array(getattr(self, campo)[self._inicio:]) for campo in self.CAMPOS)
+
+    def bytes(self):
+        return sum(getattr(self, campo).buffer_info()[1] * 8 for campo in self.CAMPOS)
+
+
+class SerieCamadas:
+    """Série tempo × tensão em camadas (recentes, médias, longas) com memória limitada."""
+
+    def __init__(self, janela_recente=1800.0, max_recentes=2048,
+                 largura_media=30.0, janela_media=6 * 3600.0, largura_longa=60.0, max_longas=256):
+        if largura_longa % largura_media:
+            raise ValueError("largura_longa deve ser múltiplo de largura_media")
+        self.janela_recente = float(janela_recente)
+        self.max_recentes = int(max_recentes)
+        self.largura_media = float(largura_media)
+        self.janela_media = float(janela_media)
+        self.largura_longa = float(largura_longa)
+        self.max_longas = int(max_longas)
+        self.limpar()
+
+    def limpar(self):
+        self.t0 = None
+        self.amostras = 0
+        self.ultimo = None   # (t, v) da amostra mais recente
+        self.v_min = np.inf
+        self.v_max = -np.inf
+        self._rt = array("d")
+        self._rv = array("d")
+        self._r0 = 0
+        self.medias = None
+        self.longas = None
+
+    def __len__(self):
+        return self.amostras
+
+    def acrescentar(self, tempos, tensoes):
+        """Acrescenta um lote de amostras em ordem de tempo."""
+        t = np.asarray(tempos, dtype=float)
+        v = np.asarray(tensoes, dtype=float)
+        if not len(t):
+            return
+        if self.t0 is None:
+            self.t0 = float(t[0])
+            self.medias = _Faixas(self.largura_media, self.t0)
+            self.longas = _Faixas(self.largura_longa, self.t0)
+        self._rt.frombytes(t.tobytes())
+        self._rv.frombytes(v.tobytes())
+        self.amostras += len(t)
+        agora = float(t[-1])
+        self.ultimo = (agora, float(v[-1]))
+        self.v_min = min(self.v_min, float(v.min()))
+        self.v_max = max(self.v_max, float(v.max()))
+
+        # recentes -> médias
+        corte = bisect_left(self._rt, agora - self.janela_recente, self._r0)
+        corte = max(corte, len(self._rt) - self.max_recentes)
+        if corte > self._r0:
+            bt = np.array(self._rt[self._r0:corte])
+            bv = np.array(self._rv[self._r0:corte])
+            self.medias.acrescentar(bt, bv, bv, bv, np.ones(len(bt)))
+            self._r0 = corte
+            if self._r0 > 1024 and self._r0 * 2 > len(self._rt):
+                del self._rt[:self._r0]
+                del self._rv[:self._r0]
+                self._r0 = 0
+
+        # médias -> longas
+        saindo = self.medias.terminadas_antes(agora - self.janela_media)
+        if saindo:
+            self.longas.acrescentar(*self.medias.retirar(saindo))
+            while len(self.longas) > self.max_longas:
+                self.longas.dobrar()
+
+    def pontos(self):
+        """(tempos, tensões) para desenhar: mín e máx de cada faixa antiga, depois as amostras recentes."""
+        if not self.amostras:
+            return np.empty(0), np.empty(0)
+        partes_t, partes_v = [], []
+        for faixas in (self.longas, self.medias):
+            t, vmin, vmax, _, _ = faixas.arrays()
+            centro = t + faixas.largura / 2
+            partes_t.append(np.repeat(centro, 2))
+            pares = np.empty(2 * len(t))
+            pares[0::2] = vmin
+            pares[1::2] = vmax
+            partes_v.append(pares)
+        partes_t.append(np.array(self._rt[self._r0:]))
+        partes_v.append(np.array(self._rv[self._r0:]))
+        return np.concatenate(partes_t), np.concatenate(partes_v)
+
+    def faixas(self):
+        """Resumo de cada camada: {"medias"/"longas": (t, mín, média, máx), "recentes": (t, v)}."""
+        resumo = {}
+        for nome, faixas in (("longas", self.longas), ("medias", self.medias)):
+            if faixas is None:
+                continue
+            t, vmin, vmax, soma, n = faixas.arrays()
+            resumo[nome] = (t, vmin, soma / np.maximum(n, 1), vmax)
+        resumo["recentes"] = (np.array(self._rt[self._r0:]), np.array(self._rv[self._r0:]))
+        return resumo
+
+    def memoria_bytes(self):
+        """Bytes ocupados pelos arrays das três camadas."""
+        total = (self._rt.buffer_info()[1] + self._rv.buffer_info()[1]) * 8
+        for faixas in (self.medias, self.longas):
+            if faixas is not None:
+                total += faixas.bytes()
+        return total
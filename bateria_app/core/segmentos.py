@@ -0,0 +1,139 @@
+# core/segmentos.py
+"""
+Índice de segmentos de uma gravação: as linhas de cada fase (carga,
+descarga, descanso) de cada ciclo, como faixas [início, fim) de linhas.
+
+Calculado uma vez por gravação, de uma só passada vetorizada sobre as
+colunas de core/historico.py, e guardado junto com elas no
+CacheGravacoes (memória e sidecar "<gravação>.segmentos.npz"). Mostrar
+um ciclo ou uma faixa de ciclos é então só fatiar as colunas.
+
+Fases pelos relés de cada linha: só carga ligada -> CARGA, só descarga
+-> DESCARGA, nenhum (ou os dois) -> DESCANSO. Um segmento é uma sequência
+de linhas na mesma fase.
+
+Um ciclo começa na troca carga <-> descarga que fecha o anterior: as
+poucas linhas da fase nova antes do descanso já são do ciclo seguinte.
+A coluna Ciclo diz quantos ciclos houve, mas o gravador só a atualiza no
+tique do ControleEnsaio, algumas linhas depois da troca; cada mudança de
+Ciclo é então puxada para a troca de relés logo antes dela (até
+ATRASO_MAX linhas). Gravações sem a coluna Ciclo têm os ciclos refeitos
+pelos relés, contando as mesmas trocas que o ControleEnsaio conta
+(core/ensaio.py); sem relés, a gravação inteira é um segmento de fase
+SEM_RELES.
+
+Usa numpy (importado aqui; o cli.py não carrega este módulo).
+"""
+import numpy as np
+
+DESCANSO, CARGA, DESCARGA, SEM_RELES = 0, 1, 2, 3
+NOMES_FASE = {DESCANSO: "descanso", CARGA: "carga", DESCARGA: "descarga", SEM_RELES: "sem relés"}
+
+
+def fases(carga, descarga):
+    """Fase de cada linha a partir das colunas booleanas dos relés."""
+    fase = np.full(len(carga), DESCANSO, dtype=np.int8)
+    fase[carga & ~descarga] = CARGA
+    fase[descarga & ~carga] = DESCARGA
+    return fase
+
+
+ATRASO_MAX = 5   # linhas entre a troca de relés e a mudança da coluna Ciclo
+
+
+def trocas(fase):
+    """Linhas que começam uma troca direta carga -> descarga ou descarga -> carga."""
+    anterior, atual = fase[:-1], fase[1:]
+    troca = ((anterior == CARGA) & (atual == DESCARGA)) | ((anterior == DESCARGA) & (atual == CARGA))
+    return np.flatnonzero(troca) + 1
+
+
+def ciclos_pelos_reles(fase):
+    """Ciclo de cada linha para gravações sem a coluna Ciclo: soma 1 a cada troca."""
+    ciclo = np.zeros(len(fase), dtype=np.int32)
+    ciclo[trocas(fase)] = 1
+    return np.cumsum(ciclo, dtype=np.int32)
+
+
+def alinhar_ciclos(ciclo, fase):
+    """
+    Coluna Ciclo com cada mudança puxada para a troca de relés que a
+    causou (a última troca até ATRASO_MAX linhas antes); mudanças sem troca
+    por perto ficam onde estão.
+    """
+    mudancas = np.flatnonzero(np.diff(ciclo)) + 1
+    linhas_troca = trocas(fase)
+    if not len(mudancas) or not len(linhas_troca):
+        return ciclo
+    k = np.searchsorted(linhas_troca, mudancas, side="right") - 1
+    troca = linhas_troca[np.maximum(k, 0)]
+    perto = (k >= 0) & (mudancas - troca <= ATRASO_MAX)
+    bordas = np.maximum.accumulate(np.where(perto, troca, mudancas))
+    bordas = np.concatenate(([0], bordas, [len(ciclo)]))
+    valores = np.concatenate((ciclo[:1], ciclo[mudancas]))
+    return np.repeat(valores, np.diff(bordas))
+
+
+class IndiceSegmentos:
+    """
+    Segmentos de uma gravação, em ordem: arrays `inicio` e `fim` (linhas,
+    fim exclusivo), `fase` e `ciclo`, todos do mesmo tamanho.
+    """
+    CAMPOS = ("inicio", "fim", "fase", "ciclo")
+
+    def __init__(self, inicio, fim, fase, ciclo):
+        self.inicio = inicio
+        self.fim = fim
+        self.fase = fase
+        self.ciclo = ciclo
+
+    @classmethod
+    def de_colunas(cls, colunas):
+        """Índice das colunas carregadas por core/historico.py."""
+        n = len(colunas["tempo"])
+        if "carga" in colunas and "descarga" in colunas:
+            fase = fases(colunas["carga"], colunas["descarga"])
+        else:
+            fase = np.full(n, SEM_RELES, dtype=np.int8)
+        if "ciclo" in colunas:
+            ciclo = alinhar_ciclos(np.nan_to_num(colunas["ciclo"]).astype(np.int32), fase)
+        else:
+            ciclo = ciclos_pelos_reles(fase)
+        if not n:
+            vazio = np.empty(0, dtype=np.int64)
+            return cls(vazio, vazio, np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int32))
+        inicio = np.concatenate(([0], np.flatnonzero(np.diff(fase)) + 1))
+        fim = np.append(inicio[1:], n)
+        return cls(inicio, fim, fase[inicio], ciclo[inicio])
+
+    # Conversão para o CacheGravacoes (dicionário de arrays)
+    @classmethod
+    def de_arrays(cls, arrays):
+        return cls(*(arrays[campo] for campo in cls.CAMPOS))
+
+    def arrays(self):
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    def __len__(self):
+        return len(self.inicio)
+
+    def __iter__(self):
+        """(inicio, fim, fase, ciclo) de cada segmento."""
+        return zip(self.inicio.tolist(), self.fim.tolist(), self.fase.tolist(), self.ciclo.tolist())
+
+    def ciclos(self):
+        """Números de ciclo presentes, em ordem."""
+        return np.unique(self.ciclo)
+
+    def linhas(self, primeiro, ultimo=None):
+        """Faixa [início, fim) de linhas dos ciclos `primeiro` a `ultimo` (inclusive)."""
+        ultimo = primeiro if ultimo is None else ultimo
+        dentro = np.flatnonzero((self.ciclo >= primeiro) & (self.ciclo <= ultimo))
+        if not len(dentro):
+            return 0, 0
+        return int(self.inicio[dentro[0]]), int(self.fim[dentro[-1]])
+
+    def fatiar(self, colunas, primeiro, ultimo=None):
+        """As colunas só dos ciclos `primeiro` a `ultimo` (views, sem cópia)."""
+        a, b = self.linhas(primeiro, ultimo)
+        return {nome: col[a:b] for nome, col in colunas.items()}
@@ -0,0 +1,32 @@
+# core/urlhandler
+"""
+Transportes do pyserial próprios do aplicativo, abertos por URL com
+serial.serial_for_url() (o ESPReader aceita a URL no lugar da porta):
+
+    replay://caminho?speed=50   reproduz uma captura (core/captura.py) ou um
+                                CSV de ensaio, convertido em quadros
+    sim://?rate=10&seed=1       placa simulada com o modelo de bateria do
+                                outros/simu_ser/simu.py
+
+Mesmo esquema dos handlers do pyserial (serial/urlhandler/protocol_*.py):
+registrar() inclui este pacote em serial.protocol_handler_packages. O
+pyserial importa os protocol_*.py pelo nome, em tempo de execução, então
+registrar() também os importa diretamente: é assim que o PyInstaller os
+encontra e os põe no executável (sem eles, sim:// e replay:// dariam
+"URL inválida" só no .exe).
+"""
+import serial
+
+PACOTE = __name__
+
+
+def registrar():
+    from . import protocol_replay, protocol_sim  # noqa: F401 (ver docstring do módulo)
+
+    if PACOTE not in serial.protocol_handler_packages:
+        serial.protocol_handler_packages.append(PACOTE)
+
+
+def e_url(porta):
+    """True se `porta` for uma URL do pyserial (loop://, replay://...) em vez de um dispositivo."""
+    return isinstance(porta, str) and "://" in porta
@@ -0,0 +1,172 @@
+# core/urlhandler/_virtual.py
+import threading
+import time
+
+try:
+    import urlparse
+except ImportError:
+    import urllib.parse as urlparse
+
+from serial.serialutil import PortNotOpenError, SerialBase, SerialException, to_bytes
+
+from ..bateria import BateriaController
+
+
+class SerialVirtual(SerialBase):
+    """
+    Base das "placas" em software (replay://, sim://). A subclasse só diz o
+    que a placa envia e quando (_avancar) e o que fazer com cada comando
+    recebido (_tratar_comando); leitura com timeout, in_waiting e buffers
+    ficam aqui. Não há thread: o que a placa "já enviou" é calculado na
+    hora da leitura a partir de time.monotonic().
+
+    Não tem descritor de arquivo, então não serve para o LeitorAsync.
+    """
+    ESQUEMA = None
+    BAUDRATES = (9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600)
+
+    def __init__(self, *args, **kwargs):
+        self._saida = bytearray()     # bytes da placa ainda não lidos
+        self._entrada = bytearray()   # comando incompleto recebido
+        self._cond = threading.Condition()
+        super(SerialVirtual, self).__init__(*args, **kwargs)
+
+    # ---------- ganchos da subclasse ----------
+    def _configurar(self, caminho, opcoes):
+        """Aplica o caminho e as opções da URL (chamado no open)."""
+        raise NotImplementedError
+
+    def _avancar(self, agora):
+        """
+        Acrescenta a self._saida tudo que a placa já teria enviado até `agora`.
+        Retorna o instante (monotonic) do próximo envio, ou None.
+        """
+        raise NotImplementedError
+
+    def _tratar_comando(self, linha):
+        """Um comando recebido (bytes, sem \\n). Respostas vão para self._saida."""
+
+    def _responder_como_firmware(self, linha):
+        """Resposta do firmware v_4.0 ao comando (nenhuma para USB ON)."""
+        comando = linha.strip().upper().decode("ascii", "replace")
+        if not comando:
+            return
+        resposta = BateriaController.RESPOSTAS.get(comando, BateriaController.RESPOSTA_INVALIDO)
+        if resposta is not None:
+            self._saida += resposta + b"\n"
+
+    # ---------- abertura ----------
+    def open(self):
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        if self._port is None:
+            raise SerialException("Port must be configured before it can be used.")
+        partes = urlparse.urlsplit(self.port)
+        if partes.scheme != self.ESQUEMA:
+            raise SerialException(
+                "esperado {}://...: {!r}".format(self.ESQUEMA, self.port))
+        opcoes = {k: v[-1] for k, v in urlparse.parse_qs(partes.query, True).items()}
+        try:
+            self._configurar(partes.netloc + partes.path, opcoes)
+        except (ValueError, OSError) as e:
+            raise SerialException("{}: {}".format(self.port, e))
+        self._saida.clear()
+        self._entrada.clear()
+        self.is_open = True
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+        super(SerialVirtual, self).close()
+
+    def _reconfigure_port(self):
+        pass
+
+    # ---------- leitura / escrita ----------
+    @property
+    def in_waiting(self):
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._cond:
+            self._avancar(time.monotonic())
+            return len(self._saida)
+
+    def read(self, size=1):
+        if not self.is_open:
+            raise PortNotOpenError()
+        prazo = None if self._timeout is None else time.monotonic() + self._timeout
+        dados = bytearray()
+        with self._cond:
+            while self.is_open:
+                agora = time.monotonic()
+                proximo = self._avancar(agora)
+                if self._saida:
+                    n = size - len(dados)
+                    dados += self._saida[:n]
+                    del self._saida[:n]
+                    if len(dados) >= size:
+                        break
+                if prazo is not None and agora >= prazo:
+                    break
+                espera = None
+                if proximo is not None:
+                    espera = max(0.0, proximo - agora)
+                if prazo is not None:
+                    espera = prazo - agora if espera is None else min(espera, prazo - agora)
+                self._cond.wait(espera)
+        return bytes(dados)
+
+    def write(self, data):
+        if not self.is_open:
+            raise PortNotOpenError()
+        data = to_bytes(data)
+        with self._cond:
+            self._entrada += data
+            while b"\n" in self._entrada:
+                linha, _, resto = bytes(self._entrada).partition(b"\n")
+                self._entrada = bytearray(resto)
+                self._tratar_comando(linha)
+            self._cond.notify_all()
+        return len(data)
+
+    def reset_input_buffer(self):
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._cond:
+            self._avancar(time.monotonic())
+            self._saida.clear()
+
+    def reset_output_buffer(self):
+        if not self.is_open:
+            raise PortNotOpenError()
+
+    @property
+    def out_waiting(self):
+        return 0
+
+    # ---------- linhas de controle (sem efeito) ----------
+    def _update_break_state(self):
+        pass
+
+    def _update_rts_state(self):
+        pass
+
+    def _update_dtr_state(self):
+        pass
+
+    @property
+    def cts(self):
+        return True
+
+    @property
+    def dsr(self):
+        return True
+
+    @property
+    def ri(self):
+        return False
+
+    @property
+    def cd(self):
+        return True
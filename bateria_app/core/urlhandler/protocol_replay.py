@@ -0,0 +1,141 @@
+# core/urlhandler/protocol_replay.py
+"""
+Reprodução de uma sessão gravada como se fosse a ESP32.
+
+URL:    replay://caminho[?opção=valor&...]
+
+    caminho   captura (core/captura.py) ou CSV de ensaio (ensaios_de_teste,
+              assets/dados): cada linha com tensão vira um quadro do firmware
+              v_4.0 no tempo da coluna "Tempo (s)"
+    speed     velocidade da reprodução (padrão 1; 50 = 50x; 0 = sem espera)
+    ack       1 (padrão) responde aos comandos como o firmware, para o
+              BateriaController receber as confirmações; 0 ignora comandos
+    repetir   1 recomeça do início ao chegar ao fim; 0 (padrão) fica mudo
+
+Exemplos:
+    ESPReader(porta="replay://../ensaios_de_teste/ensaios/teste_2_ciclo_carga_descarga.csv?speed=50")
+    ESPReader(porta="replay:///home/lab/sessao.cap")
+
+Só a entrada da placa é reproduzida: os relés seguem o que foi gravado,
+não os comandos enviados agora. `terminou` fica True depois do último
+quadro entregue (e não é reiniciado sem repetir=1).
+"""
+import csv
+import math
+
+from ..bateria import BateriaController
+from ..captura import RECEBIDA, ler_captura
+from ._virtual import SerialVirtual
+
+_CHAVES_TEMPO = ("Tempo (s)", "Tempo", "Time", "t")
+_CHAVES_TENSAO = ("Tensao (V)", "Tensao", "Tensão (V)", "Tensão", "Voltage", "Vbat", "Tensao(V)")
+_CHAVES_CORRENTE = ("Corrente (A)", "Corrente", "Current")
+
+_RESPOSTAS_FIRMWARE = set(BateriaController.RESPOSTAS.values()) | {BateriaController.RESPOSTA_INVALIDO}
+
+
+def _campo(row, chaves):
+    for chave in chaves:
+        valor = row.get(chave)
+        if valor not in (None, ""):
+            return valor
+    return None
+
+
+def _numero(texto):
+    return float(str(texto).replace(",", "."))
+
+
+def quadros_de_csv(caminho):
+    """Converte um CSV de ensaio em [(tempo, linha do firmware)], pulando linhas sem tensão."""
+    eventos = []
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        cabecalho = f.readline()
+        f.seek(0)
+        delimitador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+        for row in csv.DictReader(f, delimiter=delimitador):
+            t_raw = _campo(row, _CHAVES_TEMPO)
+            v_raw = _campo(row, _CHAVES_TENSAO)
+            if t_raw is None or v_raw is None:
+                continue
+            try:
+                t = _numero(t_raw)
+                v = _numero(v_raw)
+                i_raw = _campo(row, _CHAVES_CORRENTE)
+                i = _numero(i_raw) if i_raw is not None else None
+            except ValueError:
+                continue
+            linha = (
+                f"Vbat: {v:.3f} V | Mode: {row.get('Modo') or 'AUTO'} | "
+                f"Charge: {row.get('Carga') or 'OFF'} | Disch: {row.get('Descarga') or 'OFF'}"
+            )
+            if i is not None:
+                linha += f" | Corrente: {i:.3f} A"
+            eventos.append((t, linha.encode()))
+    return eventos
+
+
+def quadros_de_captura(caminho, sem_respostas=False):
+    """Linhas recebidas de uma captura; com `sem_respostas`, sem as respostas a comandos."""
+    return [
+        (t, linha) for t, direcao, linha in ler_captura(caminho)
+        if direcao == RECEBIDA and not (sem_respostas and linha.strip() in _RESPOSTAS_FIRMWARE)
+    ]
+
+
+class Serial(SerialVirtual):
+    """Porta que entrega as linhas gravadas no ritmo original dividido por `speed`."""
+    ESQUEMA = "replay"
+
+    def _configurar(self, caminho, opcoes):
+        desconhecidas = set(opcoes) - {"speed", "ack", "repetir"}
+        if desconhecidas:
+            raise ValueError("opção desconhecida: {}".format(", ".join(sorted(desconhecidas))))
+        velocidade = float(opcoes.get("speed", 1))
+        if velocidade < 0:
+            raise ValueError("speed deve ser >= 0")
+        self.velocidade = math.inf if velocidade == 0 else velocidade
+        self.ack = opcoes.get("ack", "1") != "0"
+        self.repetir = opcoes.get("repetir", "0") == "1"
+
+        if caminho.lower().endswith(".csv"):
+            eventos = quadros_de_csv(caminho)
+        else:
+            # as respostas gravadas viriam fora de hora; com ack elas são geradas na hora
+            eventos = quadros_de_captura(caminho, sem_respostas=self.ack)
+        if not eventos:
+            raise ValueError("nenhum quadro para reproduzir")
+        t0 = eventos[0][0]
+        self._tempos = [t - t0 for t, _ in eventos]
+        self._linhas = [linha + b"\n" for _, linha in eventos]
+        self._indice = 0
+        self._inicio = None
+        self.terminou = False
+
+    def _avancar(self, agora):
+        if self._inicio is None:
+            self._inicio = agora
+        tempos, n, v = self._tempos, len(self._tempos), self.velocidade
+        i = self._indice
+        while i < n and self._inicio + tempos[i] / v <= agora:
+            i += 1
+        if i > self._indice:
+            self._saida += b"".join(self._linhas[self._indice:i])
+            self._indice = i
+        if i < n:
+            return self._inicio + tempos[i] / v
+        if self.repetir:
+            self._indice = 0
+            self._inicio = agora
+            return agora
+        self.terminou = True
+        return None
+
+    def _tratar_comando(self, linha):
+        if self.ack:
+            self._responder_como_firmware(linha)
+
+    @property
+    def progresso(self):
+        """Fração dos quadros já entregues (0 a 1)."""
+        return self._indice / len(self._tempos)
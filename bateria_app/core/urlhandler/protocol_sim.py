@@ -0,0 +1,130 @@
+# core/urlhandler/protocol_sim.py
+"""
+Placa simulada: o modelo de bateria e os comandos de outros/simu_ser/simu.py
+dentro do processo, sem PTY nem /tmp/ttyVIRTUAL.
+
+URL:    sim://[?opção=valor&...]
+
+    cells     células em série (padrão 1): a tensão enviada e os limites
+              3,0-4,2 V são multiplicados por este número
+    rate      quadros por segundo (padrão 2, o período de 0,5 s do simu.py)
+    noise     ruído uniforme ± do ADC, em V por célula e em A (padrão 0.005)
+    seed      semente do ruído, para repetir uma sessão (padrão: aleatória)
+    v0        tensão inicial por célula (padrão 3.7)
+
+Exemplos:
+    ESPReader(porta="sim://")
+    ESPReader(porta="sim://?cells=1&rate=100&noise=0.005&seed=1")
+
+Cada quadro é uma iteração do laço do simu.py: em AUTO a tensão anda 0,10 V
+por quadro e inverte nos limites; em MANUAL anda 0,01 V com o relé forçado.
+Com `rate` maior a bateria não muda mais devagar, só mais vezes por
+segundo. Cada porta aberta é uma placa independente.
+"""
+import random
+import time
+
+from ._virtual import SerialVirtual
+
+V_BATT_MIN = 3.0
+V_BATT_MAX = 4.2
+
+MANUAL_STEP = 0.01
+AUTO_STEP = 0.10
+
+CURRENT_NOMINAL = 2.5
+OFFSET_CURRENT = 0.05
+
+
+class Serial(SerialVirtual):
+    """Porta que gera quadros do firmware v_4.0 a partir do modelo do simu.py."""
+    ESQUEMA = "sim"
+
+    def _configurar(self, caminho, opcoes):
+        if caminho:
+            raise ValueError("sim:// não usa caminho, só opções (sim://?rate=10)")
+        desconhecidas = set(opcoes) - {"cells", "rate", "noise", "seed", "v0"}
+        if desconhecidas:
+            raise ValueError("opção desconhecida: {}".format(", ".join(sorted(desconhecidas))))
+        self.celulas = int(opcoes.get("cells", 1))
+        if self.celulas < 1:
+            raise ValueError("cells deve ser >= 1")
+        taxa = float(opcoes.get("rate", 2))
+        if taxa <= 0:
+            raise ValueError("rate deve ser > 0")
+        self.periodo = 1.0 / taxa
+        self.ruido = float(opcoes.get("noise", 0.005))
+        semente = opcoes.get("seed")
+        self._aleatorio = random.Random(int(semente) if semente is not None else None)
+
+        # estado do simu.py
+        self.modo = "MANUAL"
+        self.carga = False
+        self.descarga = False
+        self.v_celula = float(opcoes.get("v0", 3.7))
+
+        self.quadros = 0
+        self._inicio = None
+
+    # ---------- modelo ----------
+    def _passo(self):
+        """Uma iteração do core0_task do simu.py."""
+        if self.modo == "AUTO":
+            if self.carga and self.descarga:
+                self.carga = False
+            elif not self.carga and not self.descarga:
+                self.carga = True
+            if self.carga:
+                self.v_celula += AUTO_STEP
+            else:
+                self.v_celula -= AUTO_STEP
+        elif self.carga:
+            self.v_celula += MANUAL_STEP
+        elif self.descarga:
+            self.v_celula -= MANUAL_STEP
+
+        if self.v_celula > V_BATT_MAX:
+            self.v_celula = V_BATT_MAX
+            if self.modo == "AUTO":
+                self.carga, self.descarga = False, True
+        if self.v_celula < V_BATT_MIN:
+            self.v_celula = V_BATT_MIN
+            if self.modo == "AUTO":
+                self.carga, self.descarga = True, False
+
+    def _quadro(self):
+        ruido = self._aleatorio.uniform
+        tensao = (self.v_celula + ruido(-self.ruido, self.ruido)) * self.celulas
+        corrente = CURRENT_NOMINAL + OFFSET_CURRENT + ruido(-self.ruido, self.ruido)
+        return (
+            f"Vbat: {tensao:.3f} V | Mode: {self.modo} | "
+            f"Charge: {'ON' if self.carga else 'OFF'} | "
+            f"Disch: {'ON' if self.descarga else 'OFF'} | "
+            f"Corrente: {corrente:.3f} A\n"
+        ).encode()
+
+    # ---------- ganchos do SerialVirtual ----------
+    def _avancar(self, agora):
+        if self._inicio is None:
+            self._inicio = agora
+        # quadro k sai em inicio + k*periodo; os atrasados saem todos de uma vez
+        while self._inicio + self.quadros * self.periodo <= agora:
+            self._passo()
+            self._saida += self._quadro()
+            self.quadros += 1
+        return self._inicio + self.quadros * self.periodo
+
+    def _tratar_comando(self, linha):
+        # os quadros devidos até agora saem com o estado anterior ao comando
+        self._avancar(time.monotonic())
+        comando = linha.strip().upper()
+        if comando == b"AUTO":
+            self.modo = "AUTO"
+            self.carga, self.descarga = True, False
+        elif comando in (b"CHARGE ON", b"CHARGE OFF"):
+            self.modo = "MANUAL"
+            self.carga = comando == b"CHARGE ON"
+        elif comando in (b"DISCH ON", b"DISCH OFF"):
+            self.modo = "MANUAL"
+            self.descarga = comando == b"DISCH ON"
+        self._responder_como_firmware(linha)
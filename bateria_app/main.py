@@ -1,11 +1,16 @@
 # main.py
+import multiprocessing
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "assets", "lib"))
 
-from ui.base_app import BatteryApp
-
 if __name__ == "__main__":
+    # executável congelado: os processos do catálogo (core/catalogo.py) partem daqui
+    multiprocessing.freeze_support()
+    # a interface só é importada aqui: os processos do catálogo (spawn/forkserver)
+    # reimportam este arquivo e não devem carregar Tk nem matplotlib
+    from ui.base_app import BatteryApp
+
     app = BatteryApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -2,7 +2,6 @@
 import os
 import sys
 import time
-import json
 import ttkbootstrap as tb
 from tkinter import PhotoImage, messagebox
 
@@ -12,10 +11,12 @@ from ui.tela_configuracao import TelaConfiguracao
 from ui.tela_monitoramento import TelaMonitoramento
 from ui.tela_ciclos import TelaCiclos
 from ui.tela_historico import TelaHistorico
+from core.diario import DiarioSessao
 
 # Import do ESPReader para poder recriar ao retomar
 try:
     from core.monitor import ESPReader
+    from core.monitor_async import criar_leitor
 except Exception:
     ESPReader = None  # se não disponível, o app continua mas sem conexão serial
 
@@ -30,8 +31,8 @@ class BatteryApp(tb.Window):
         self.esp_reader = None          # instância ativa do ESPReader
         self.simulacao_dados = {}       # dados carregados ou em execução
 
-        # Arquivo LOG
-        self.log_file = os.path.join(os.getcwd(), "assets", "dados", "simulacao_log.json")
+        # Arquivo LOG (diário da sessão, ver core/diario.py)
+        self.log_file = TelaMonitoramento.LOG_FILE
 
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
@@ -73,15 +74,13 @@ class BatteryApp(tb.Window):
     # RETOMADA DE SIMULAÇÃO
     # ======================================================================
     def _verificar_log(self):
-        if not os.path.exists(self.log_file):
-            self.show_frame("TelaInicial")
-            return
-
+        # recuperar() também converte o simulacao_log.json de versões anteriores
         try:
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                log_data = json.load(f)
+            log_data = DiarioSessao.recuperar(self.log_file)
         except Exception as e:
             print("Erro ao ler log:", e)
+            log_data = None
+        if not log_data:
             self.show_frame("TelaInicial")
             return
 
@@ -91,10 +90,7 @@ class BatteryApp(tb.Window):
         )
 
         if not resposta:
-            try:
-                os.remove(self.log_file)
-            except:
-                pass
+            self._apagar_log()
             self.show_frame("TelaInicial")
             return
 
@@ -121,13 +117,17 @@ class BatteryApp(tb.Window):
         # REABRE ESP
         # --------------------------------------------
         if ESPReader and self.simulacao_dados["porta"]:
-            esp = ESPReader(porta=self.simulacao_dados["porta"])
+            esp = criar_leitor(porta=self.simulacao_dados["porta"])
             esp.controller = self
 
             esp.definir_csv(
                 self.simulacao_dados["csv"],
                 retomar=True,
-                tempo_decorrido=self.simulacao_dados["tempo_decorrido"]
+                tempo_decorrido=self.simulacao_dados["tempo_decorrido"],
+                metadados={
+                    "bateria": self.simulacao_dados["dados_bateria"]["nome"],
+                    "tipo": self.simulacao_dados["tipo"],
+                },
             )
 
             esp.set_ciclo(self.simulacao_dados["ciclo_atual"])
@@ -148,6 +148,18 @@ class BatteryApp(tb.Window):
 
         self.show_frame("TelaMonitoramento")
 
+    def _apagar_log(self):
+        """Fecha e apaga o diário da sessão."""
+        frame = self.frames.get("TelaMonitoramento")
+        if frame is not None:
+            frame._apagar_log()
+
+    def _fechar_log(self):
+        """Fecha o diário da sessão mantendo o arquivo (para retomar depois)."""
+        frame = self.frames.get("TelaMonitoramento")
+        if frame is not None:
+            frame._fechar_log()
+
     # ======================================================================
     # TROCA DE TELAS
     # ======================================================================
@@ -191,20 +203,19 @@ class BatteryApp(tb.Window):
             except:
                 pass
 
-        if os.path.exists(self.log_file):
-            try:
-                os.remove(self.log_file)
-            except:
-                pass
+        self._apagar_log()
 
         self.simulacao_dados = {}
         self.show_frame("TelaInicial")
 
     def _esp_desconectada_inesperadamente(self):
     ###  Encerramento forçado por perda de comunicação com a ESP.
-    ###  Simula cancelamento manual sem confirmação.
+    ###  Só chega aqui depois que o leitor esgotou o orçamento de reconexão.
+    ###  O diário é mantido: o teste pode ser retomado ao reabrir o programa.
     # Para ESPReader
+        orcamento = None
         if self.esp_reader:
+            orcamento = getattr(self.esp_reader, "orcamento_queda", None)
             self.esp_reader._stop_requested = True
             try:
                 self.esp_reader.parar_envio_periodico()
@@ -216,12 +227,8 @@ class BatteryApp(tb.Window):
                 pass
             self.esp_reader = None
 
-        # Remove log
-        if os.path.exists(self.log_file):
-            try:
-                os.remove(self.log_file)
-            except:
-                pass
+        # Fecha o log sem apagar (retomada na próxima abertura)
+        self._fechar_log()
 
         # Limpa dados
         self.simulacao_dados = {}
@@ -230,9 +237,11 @@ class BatteryApp(tb.Window):
         self.show_frame("TelaInicial")
 
         # Informa o usuário
+        limite = f" em {orcamento:.0f} s" if orcamento else ""
         messagebox.showerror(
             "ESP desconectada",
-            "A ESP foi desconectada inesperadamente.\nO teste foi finalizado."
+            f"A conexão com a ESP não voltou{limite}.\nO teste foi interrompido; "
+            "ele poderá ser retomado na próxima vez que o programa for aberto."
         )
 
 
@@ -267,17 +276,11 @@ class BatteryApp(tb.Window):
                 pass
 
         # Apagar log
-        if os.path.exists(self.log_file):
-            try:
-                os.remove(self.log_file)
-            except:
-                pass
+        self._apagar_log()
 
         # Destruir frames com animações / after
         for frame in getattr(self, "frames", {}).values():
             try:
-                if hasattr(frame, 'ani') and frame.ani.event_source:
-                    frame.ani.event_source.stop()
                 frame.destroy()
             except:
                 pass
@@ -0,0 +1,83 @@
+# ui/grafico_vivo.py
+from core.reducao import SerieCamadas
+
+
+class GraficoVivo:
+    """
+    Gráfico de tensão em tempo real sobre uma única Line2D persistente.
+
+    As amostras ficam numa SerieCamadas (core/reducao.py): cruas nos
+    últimos 30 min, em faixas mín/média/máx antes disso. A linha recebe as
+    recentes e o mín/máx das faixas por set_data, poucos milhares de pontos
+    qualquer que seja a duração do teste, sem perder picos nem as bordas
+    dos cortes.
+    Eixos, rótulos e grade ficam num fundo guardado (copy_from_bbox) depois
+    de cada desenho completo; no tique comum o fundo é restaurado e só a
+    linha é redesenhada e copiada para a tela (blit). O desenho completo
+    acontece apenas quando os dados saem dos limites atuais (a nova escala
+    já deixa folga para os próximos minutos) ou quando o Tk redesenha a
+    figura (redimensionamento).
+    """
+    FOLGA_X = 0.5        # ao reescalar, o eixo x vai 50 % além do último ponto
+    JANELA_X_MIN = 60.0  # s, largura mínima do eixo x
+    FOLGA_Y = 0.05       # V, margem mínima acima e abaixo da tensão
+
+    def __init__(self, canvas, ax, linha, **camadas):
+        self.canvas = canvas
+        self.ax = ax
+        self.linha = linha
+        linha.set_animated(True)
+        self.serie = SerieCamadas(**camadas)
+        self._fundo = None
+        self.redesenhos = 0   # desenhos completos (reescala, resize)
+        canvas.mpl_connect("draw_event", self._ao_desenhar)
+
+    def __len__(self):
+        """Amostras recebidas (não os pontos desenhados)."""
+        return self.serie.amostras
+
+    def acrescentar(self, tempos, tensoes):
+        """Acrescenta amostras (sequências de mesmo tamanho) ao fim da linha."""
+        self.serie.acrescentar(tempos, tensoes)
+
+    def limpar(self):
+        """Apaga os pontos e redesenha os eixos vazios."""
+        self.serie.limpar()
+        self.linha.set_data([], [])
+        self.ax.set_xlim(0, self.JANELA_X_MIN)
+        self.canvas.draw()
+
+    def atualizar(self):
+        """Leva os pontos acrescentados à tela (chamado a cada tique)."""
+        if not self.serie.amostras:
+            return
+        self.linha.set_data(*self.serie.pontos())
+        if self._reescalar() or self._fundo is None:
+            # o draw_event guarda o novo fundo e desenha a linha
+            self.redesenhos += 1
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._fundo)
+        self.ax.draw_artist(self.linha)
+        self.canvas.blit(self.ax.bbox)
+
+    def _reescalar(self):
+        """Ajusta os limites se algum ponto saiu deles. Retorna True se mudou."""
+        serie = self.serie
+        t0, t1 = serie.t0, serie.ultimo[0]
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        mudou = False
+        if t0 < x0 or t1 > x1:
+            largura = max(self.JANELA_X_MIN, (t1 - t0) * (1 + self.FOLGA_X))
+            self.ax.set_xlim(t0, t0 + largura)
+            mudou = True
+        if serie.v_min < y0 or serie.v_max > y1:
+            margem = max(self.FOLGA_Y, 0.1 * (serie.v_max - serie.v_min))
+            self.ax.set_ylim(serie.v_min - margem, serie.v_max + margem)
+            mudou = True
+        return mudou
+
+    def _ao_desenhar(self, evento):
+        self._fundo = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.linha)
@@ -10,6 +10,8 @@ import serial.tools.list_ports
 import csv
 from ui.autocomplete import AutocompleteEntry
 from core.monitor import ESPReader
+from core.monitor_async import criar_leitor
+from core.gravador import CABECALHO_CSV
 
 class TelaConfiguracao(ttk.Frame):
     def __init__(self, parent, controller, dados_bateria=None):
@@ -174,15 +176,7 @@ class TelaConfiguracao(ttk.Frame):
                     # Limpa e reescreve cabeçalho
                     with open(csv_file, "w", newline='') as f:
                         writer = csv.writer(f)
-                        writer.writerow([
-                            "Tempo (s)",
-                            "Tensao (V)",
-                            "Corrente (A)",
-                            "Modo",
-                            "Carga",
-                            "Descarga",
-                            "Ciclo"
-                        ])
+                        writer.writerow(CABECALHO_CSV)
                     print(f"🧹 Arquivo sobrescrito e cabeçalho recriado: {csv_file}")
                     break
                 except Exception as e:
@@ -212,9 +206,12 @@ class TelaConfiguracao(ttk.Frame):
 
         # Inicializa e conecta a ESPReader
         try:
-            self.controller.esp_reader = ESPReader(porta=porta)
+            self.controller.esp_reader = criar_leitor(porta=porta)
             self.controller.esp_reader.controller = self.controller
-            self.controller.esp_reader.definir_csv(csv_file)
+            self.controller.esp_reader.definir_csv(
+                csv_file,
+                metadados={"bateria": self.dados_bateria.get("nome"), "tipo": tipo},
+            )
             self.controller.esp_reader.start()
         except Exception as e:
             print("Erro iniciando ESPReader:", e)
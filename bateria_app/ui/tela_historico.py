@@ -1,20 +1,67 @@
 # ui/tela_historico.py
+import threading
+import time
 import tkinter as tk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
+from core.catalogo import Catalogo
 from core.historico import Historico
 
+# (campo do catálogo, título, largura, alinhamento)
+COLUNAS_TABELA = (
+    ("arquivo", "Arquivo", 200, "w"),
+    ("bateria", "Bateria", 90, "w"),
+    ("tipo", "Tipo", 60, "w"),
+    ("inicio", "Início", 110, "center"),
+    ("duracao", "Duração", 70, "e"),
+    ("ciclos", "Ciclos", 50, "e"),
+    ("amostras", "Amostras", 70, "e"),
+    ("v_min", "V mín", 55, "e"),
+    ("v_max", "V máx", 55, "e"),
+    ("tamanho", "Tamanho", 70, "e"),
+)
+
+
+def _formatar(campo, valor):
+    if valor is None:
+        return "---"
+    if campo == "inicio":
+        return time.strftime("%d/%m/%Y %H:%M", time.localtime(valor))
+    if campo == "duracao":
+        s = int(valor)
+        return f"{s // 3600}:{s // 60 % 60:02d}:{s % 60:02d}"
+    if campo in ("v_min", "v_max"):
+        return f"{valor:.3f}"
+    if campo == "tamanho":
+        return f"{valor / 2**20:.1f} MB" if valor >= 2**20 else f"{valor / 1024:.0f} kB"
+    return str(valor)
+
+
 class TelaHistorico(tb.Frame):
     """
-    Exibe lista de arquivos CSV e gera gráfico de Tensão vs Tempo
-    para o arquivo selecionado.
+    Exibe a tabela das gravações (catálogo em core/catalogo.py) e gera
+    gráfico de Tensão vs Tempo para a gravação selecionada.
+    A tabela vem do catálogo, sem abrir nenhum CSV; gravações novas ou
+    alteradas são catalogadas em segundo plano ao atualizar a lista.
+    O gráfico desenha só os pontos da pirâmide de mín/máx
+    (core/piramide.py) que cabem no trecho visível, refeitos a cada zoom
+    ou deslocamento.
     """
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
         self.historico = Historico()  # Lida com leitura e listagem dos CSVs
+        self.catalogo = Catalogo(self.historico.pasta)
+        self._ordem = ("inicio", True)   # (campo, decrescente)
+        self._sincronizando = False
+        self._exibido = None   # gravação no gráfico
+        self._colunas = None
+        self._segmentos = None
+        self._piramide = None
+        self._linha = None     # Line2D da gravação
+        self._linhas = (0, 0)  # [primeira, última) linhas dos ciclos mostrados
 
         # ==============================
         # Layout principal
@@ -40,13 +87,39 @@ class TelaHistorico(tb.Frame):
         frame_main = tb.Frame(conteudo)
         frame_main.pack(fill="both", expand=True, pady=(0, 15))
 
-        # Lista de CSVs à esquerda
-        frame_lista = tb.Labelframe(frame_main, text="Arquivos CSV", bootstyle=INFO)
+        # Tabela de gravações à esquerda
+        frame_lista = tb.Labelframe(frame_main, text="Gravações", bootstyle=INFO)
         frame_lista.pack(side="left", fill="y", padx=(0, 15))
 
-        self.lista_csv = tk.Listbox(frame_lista, height=15, width=35)
-        self.lista_csv.pack(padx=5, pady=5, fill="both", expand=True)
-        self.lista_csv.bind("<<ListboxSelect>>", self.on_csv_select)
+        frame_filtro = tb.Frame(frame_lista)
+        frame_filtro.pack(padx=5, pady=(5, 0), fill="x")
+        tb.Label(frame_filtro, text="🔎 Filtrar:").pack(side="left", padx=(0, 5))
+        self.filtro_var = tk.StringVar()
+        self.filtro_var.trace_add("write", lambda *_: self._preencher_tabela())
+        tb.Entry(frame_filtro, textvariable=self.filtro_var).pack(side="left", fill="x", expand=True)
+
+        frame_tabela = tb.Frame(frame_lista)
+        frame_tabela.pack(padx=5, pady=5, fill="both", expand=True)
+        self.tabela = tb.Treeview(
+            frame_tabela,
+            columns=[c[0] for c in COLUNAS_TABELA],
+            show="headings",
+            height=15,
+            selectmode="browse",
+        )
+        for campo, titulo, largura, alinhamento in COLUNAS_TABELA:
+            self.tabela.heading(campo, text=titulo, command=lambda c=campo: self._ordenar(c))
+            self.tabela.column(campo, width=largura, anchor=alinhamento, stretch=False)
+        rolagem_y = tb.Scrollbar(frame_tabela, orient="vertical", command=self.tabela.yview)
+        rolagem_x = tb.Scrollbar(frame_tabela, orient="horizontal", command=self.tabela.xview)
+        self.tabela.configure(yscrollcommand=rolagem_y.set, xscrollcommand=rolagem_x.set)
+        rolagem_y.pack(side="right", fill="y")
+        rolagem_x.pack(side="bottom", fill="x")
+        self.tabela.pack(side="left", fill="both", expand=True)
+        self.tabela.bind("<<TreeviewSelect>>", self.on_csv_select)
+
+        self.status_lista = tb.Label(frame_lista, text="")
+        self.status_lista.pack(padx=5, anchor="w")
 
         tb.Button(
             frame_lista,
@@ -68,6 +141,28 @@ class TelaHistorico(tb.Frame):
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame_grafico)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        # largura nova em pixels: outro nível da pirâmide
+        self.canvas.mpl_connect("resize_event", lambda e: self._atualizar_trecho())
+
+        # Ciclos mostrados (índice de segmentos, core/segmentos.py)
+        frame_ciclos = tb.Frame(frame_grafico)
+        frame_ciclos.pack(fill="x", padx=5, pady=5)
+        tb.Label(frame_ciclos, text="Ciclos: de").pack(side="left")
+        self.ciclo_de = tb.Combobox(frame_ciclos, width=6, state="readonly")
+        self.ciclo_de.pack(side="left", padx=5)
+        tb.Label(frame_ciclos, text="até").pack(side="left")
+        self.ciclo_ate = tb.Combobox(frame_ciclos, width=6, state="readonly")
+        self.ciclo_ate.pack(side="left", padx=5)
+        for combo in (self.ciclo_de, self.ciclo_ate):
+            combo.bind("<<ComboboxSelected>>", lambda e: self._mostrar_ciclos())
+        tb.Button(
+            frame_ciclos,
+            text="Todos",
+            bootstyle="secondary-outline",
+            command=self._todos_ciclos
+        ).pack(side="left", padx=5)
+        self.info_ciclos = tb.Label(frame_ciclos, text="")
+        self.info_ciclos.pack(side="left", padx=10)
 
         # ------------------------------
         # Botão Voltar
@@ -88,61 +183,140 @@ class TelaHistorico(tb.Frame):
     # Métodos
     # ==============================
     def atualizar_lista(self):
-        """Atualiza a lista de arquivos CSV disponíveis."""
-        self.lista_csv.delete(0, "end")
-        for nome in self.historico.listar_csvs():
-            self.lista_csv.insert("end", nome)
+        """
+        Mostra o catálogo na hora e, numa thread, cataloga as gravações
+        novas ou alteradas (e tira as apagadas); a tabela é refeita no fim.
+        """
+        self._preencher_tabela()
+        if self._sincronizando:
+            return
+        self._sincronizando = True
+        self.status_lista.config(text="Atualizando catálogo...")
+        threading.Thread(target=self._sincronizar, daemon=True).start()
+
+    def _sincronizar(self):
+        try:
+            lidas = self.catalogo.sincronizar(self.historico.listar_csvs())
+            texto = f"{lidas} gravação(ões) catalogada(s)" if lidas else ""
+        except Exception as e:
+            print(f"[CATALOGO] Falha ao sincronizar: {e}")
+            texto = "Falha ao atualizar o catálogo"
+        self.after(0, self._fim_sincronizacao, texto)
+
+    def _fim_sincronizacao(self, texto):
+        self._sincronizando = False
+        self._preencher_tabela()
+        self.status_lista.config(text=texto)
+
+    def _ordenar(self, campo):
+        """Clique no título: ordena pela coluna (de novo na mesma coluna inverte)."""
+        atual, decrescente = self._ordem
+        self._ordem = (campo, not decrescente if campo == atual else campo != "arquivo")
+        self._preencher_tabela()
+
+    def _preencher_tabela(self):
+        campo, decrescente = self._ordem
+        selecionado = self.tabela.selection()
+        linhas = self.catalogo.listar(self.filtro_var.get().strip(), campo, decrescente)
+        self.tabela.delete(*self.tabela.get_children())
+        for linha in linhas:
+            self.tabela.insert(
+                "", "end", iid=linha["arquivo"],
+                values=[_formatar(c, linha[c]) for c, *_ in COLUNAS_TABELA],
+            )
+        for titulo_campo, titulo, *_ in COLUNAS_TABELA:
+            seta = (" ▼" if decrescente else " ▲") if titulo_campo == campo else ""
+            self.tabela.heading(titulo_campo, text=titulo + seta)
+        manter = [i for i in selecionado if self.tabela.exists(i)]
+        if manter:
+            self.tabela.selection_set(manter)
 
     def on_csv_select(self, event):
-        """Quando o usuário seleciona um CSV, gera o gráfico correspondente."""
-        selecionado = self.lista_csv.curselection()
+        """Quando o usuário seleciona uma gravação, gera o gráfico correspondente."""
+        selecionado = self.tabela.selection()
         if not selecionado:
             return
 
-        nome_arquivo = self.lista_csv.get(selecionado[0])
-        tempos, tensoes = self.historico.carregar_dados(nome_arquivo)
+        nome_arquivo = selecionado[0]
+        if nome_arquivo == self._exibido:
+            return   # a tabela foi refeita com a mesma seleção
+        self._exibido = nome_arquivo
+        # Colunas, segmentos e pirâmide vêm do cache depois da primeira vez
+        self._colunas = self.historico.carregar_colunas(nome_arquivo)
+        self._segmentos = self.historico.carregar_segmentos(nome_arquivo)
+        self._piramide = self.historico.carregar_piramide(nome_arquivo)
+
+        ciclos = [str(c + 1) for c in self._segmentos.ciclos().tolist()]
+        for combo in (self.ciclo_de, self.ciclo_ate):
+            combo.configure(values=ciclos)
+        self._todos_ciclos()
+
+    def _todos_ciclos(self):
+        valores = self.ciclo_de.cget("values")
+        self.ciclo_de.set(valores[0] if valores else "")
+        self.ciclo_ate.set(valores[-1] if valores else "")
+        self.info_ciclos.config(text="")
+        self._mostrar_ciclos()
+
+    def _mostrar_ciclos(self):
+        """Plota só os ciclos escolhidos, limitando as linhas pelo índice de segmentos."""
+        if self._exibido is None:
+            return
+        linhas, titulo = (0, len(self._colunas["tempo"])), self._exibido
+        if self.ciclo_de.get() and self.ciclo_ate.get():
+            de, ate = sorted((int(self.ciclo_de.get()) - 1, int(self.ciclo_ate.get()) - 1))
+            total = len(self.ciclo_de.cget("values"))
+            if ate - de + 1 < total:
+                linhas = self._segmentos.linhas(de, ate)
+                titulo += f" — ciclo {de + 1}" if de == ate else f" — ciclos {de + 1} a {ate + 1}"
+            self.info_ciclos.config(text=f"{total} ciclo(s), {len(self._segmentos)} segmentos")
+        self._plotar(linhas, titulo)
 
-        self.ax.clear()
-        if not tempos or not tensoes:
+    def _plotar(self, linhas, titulo):
+        self.ax.clear()   # também desliga o xlim_changed do gráfico anterior
+        self._linha = None
+        self._linhas = linhas
+        tempos = self._colunas["tempo"][linhas[0]:linhas[1]]
+        tensoes = self._colunas["tensao"][linhas[0]:linhas[1]]
+        if not len(tempos):
             # sem dados válidos — informa e atualiza o canvas
-            self.ax.set_title(f"Nenhum dado válido em {nome_arquivo}")
+            self.ax.set_title(f"Nenhum dado válido em {titulo}")
             self.ax.set_xlabel("Tempo (s)")
             self.ax.set_ylabel("Tensão (V)")
             self.ax.grid(True)
             self.canvas.draw()
             return
 
-        # Ordena por tempo caso o CSV não esteja em ordem (segurança)
-        try:
-            paired = sorted(zip(tempos, tensoes), key=lambda p: p[0])
-            tempos, tensoes = zip(*paired)
-        except Exception:
-            # se algo falhar, segue com os dados originais
-            pass
-
-        # Converte para listas (podem ser tuplas após zip)
-        tempos = list(tempos)
-        tensoes = list(tensoes)
-
-        # Plota normalmente
-        self.ax.plot(tempos, tensoes, color='tab:green')
-        self.ax.set_title(f"Tensão vs Tempo — {nome_arquivo}")
+        # Arrays já vêm em ordem de tempo (core/historico.py); só os pontos
+        # da pirâmide para a largura do gráfico, não a gravação inteira
+        t0, t1 = float(tempos[0]), float(tempos[-1])
+        self._linha, = self.ax.plot(*self._pontos(t0, t1), color='tab:green')
+        if t1 > t0:
+            self.ax.set_xlim(t0, t1)
+        self.ax.set_title(f"Tensão vs Tempo — {titulo}")
         self.ax.set_xlabel("Tempo (s)")
         self.ax.set_ylabel("Tensão (V)")
         # Ajusta limites do eixo Y de forma segura:
-        try:
-            vmin = min(tensoes)
-            vmax = max(tensoes)
-            if vmin == vmax:
-                # único valor: dá um range pequeno em torno dele
-                delta = abs(vmin) * 0.02 if abs(vmin) > 0 else 0.02
-                self.ax.set_ylim(vmin - delta, vmax + delta)
-            else:
-                self.ax.set_ylim(vmin * 0.95, vmax * 1.05)
-        except Exception:
-            # fallback simples
-            pass
+        vmin = float(tensoes.min())
+        vmax = float(tensoes.max())
+        if vmin == vmax:
+            # único valor: dá um range pequeno em torno dele
+            delta = abs(vmin) * 0.02 if abs(vmin) > 0 else 0.02
+            self.ax.set_ylim(vmin - delta, vmax + delta)
+        else:
+            self.ax.set_ylim(vmin * 0.95, vmax * 1.05)
 
         # Não força xlim iniciar em 0 — aceita que o primeiro tempo seja >0
         self.ax.grid(True)
-        self.canvas.draw()
\ No newline at end of file
+        self.ax.callbacks.connect("xlim_changed", lambda ax: self._atualizar_trecho())
+        self.canvas.draw()
+
+    def _pontos(self, t0, t1):
+        return self._piramide.pontos(self._colunas, t0, t1, self.ax.bbox.width, *self._linhas)
+
+    def _atualizar_trecho(self):
+        """Zoom, deslocamento ou janela redimensionada: refaz os pontos do trecho visível."""
+        if self._linha is None:
+            return
+        self._linha.set_data(*self._pontos(*self.ax.get_xlim()))
+        self.canvas.draw_idle()
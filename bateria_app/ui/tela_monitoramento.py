@@ -3,12 +3,12 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.animation import FuncAnimation
-from collections import deque
 import time
 import os
-import json
 from tkinter import messagebox
+from core.diario import ARQUIVO_SESSAO, DiarioSessao
+from core.ensaio import ControleEnsaio, estado_sessao
+from ui.grafico_vivo import GraficoVivo
 
 class TelaMonitoramento(tb.Frame):
     """
@@ -16,23 +16,22 @@ class TelaMonitoramento(tb.Frame):
     Exibe tensão e corrente em tempo real e salva dados via ESPReader.
     Implementa finalização automática para carga/descarga e para ciclos.
     """
-    LOG_FILE = os.path.join(os.getcwd(), "assets", "dados", "simulacao_log.json")
+    LOG_FILE = ARQUIVO_SESSAO
+    INTERVALO_TIQUE = 1.0   # s, labels + gráfico + checagem de término
 
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self.diario = DiarioSessao(self.LOG_FILE)
+        self._ultimo_tempo_registrado = None
         self.modo_ciclos = False
         self.tempo_inicial = time.time()
 
-        # Dados para gráfico (tensão apenas)
-        self.dados_tempo = deque()
-        self.dados_tensao = deque()
+        # Dados do gráfico (tensão apenas) ficam no GraficoVivo
+        self._ultimo_seq = 0  # seq da última amostra do ESPReader já plotada
 
-        # Controle de ciclos
-        self.ciclos_totais = 0
-        self.ciclo_atual = 0
-        self._prev_carga_state = None  # para detectar transições de carga/descarga
-        self._prev_disch_state = None
+        # Regras do teste (término e ciclos), compartilhadas com o cli.py
+        self.ensaio = ControleEnsaio(None, "")
 
         # Layout (mantive seu layout original)
         conteudo = tb.Frame(self)
@@ -114,6 +113,14 @@ class TelaMonitoramento(tb.Frame):
         self.descarga_label.grid(row=0, column=2, padx=10)
         frame_status.grid_columnconfigure((0,1,2), weight=1)
 
+        # Diagnóstico do enlace serial (escondido; só consulta o leitor quando visível)
+        self.frame_diagnostico = tb.Labelframe(conteudo, text="Diagnóstico do enlace serial")
+        self.diagnostico_label = tb.Label(
+            self.frame_diagnostico, text="--", font=("Consolas", 9), justify="left"
+        )
+        self.diagnostico_label.pack(fill="x", padx=8, pady=4)
+        self._diagnostico_visivel = False
+
         # Gráfico de tensão
         plt.style.use('dark_background')
         self.fig, self.ax = plt.subplots(figsize=(8,3))
@@ -125,6 +132,7 @@ class TelaMonitoramento(tb.Frame):
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=conteudo)
         self.canvas.get_tk_widget().pack(fill="both", expand=True, pady=(0,10))
+        self.grafico = GraficoVivo(self.canvas, self.ax, self.line)
 
         # Botões
         frame_botoes = tb.Frame(conteudo)
@@ -136,6 +144,11 @@ class TelaMonitoramento(tb.Frame):
         self.btn_descarga.grid(row=0, column=1, padx=5)
         self.btn_desativar = tb.Button(frame_botoes, text="⏹ Desativar Tudo", bootstyle=WARNING, command=self.desativar_tudo)
         self.btn_desativar.grid(row=0, column=2, padx=5)
+        self.btn_diagnostico = tb.Button(
+            frame_botoes, text="🩺 Diagnóstico", bootstyle="secondary-outline",
+            command=self.alternar_diagnostico
+        )
+        self.btn_diagnostico.grid(row=0, column=3, padx=5)
 
         # Voltar
         frame_voltar = tb.Frame(conteudo)
@@ -148,13 +161,10 @@ class TelaMonitoramento(tb.Frame):
             command=lambda: self.voltar_tela_inicial()
         ).pack()
 
-        # Animação do gráfico
-        self.ani = FuncAnimation(self.fig, self.atualizar_grafico, interval=1000, cache_frame_data=False)
+        # Um único tique do Tk atualiza labels e gráfico
         self.after_id = None
-        self._usb_on_job = None
-
-        # Inicia labels
-        self.atualizar_labels()
+        self._proximo_tique = None
+        self._tique()
 
     # =========================
     # Inicialização/retomada
@@ -165,40 +175,44 @@ class TelaMonitoramento(tb.Frame):
 
         if esp and "csv" in (dados or {}):
             try:
-                esp.definir_csv(dados["csv"])
+                esp.definir_csv(
+                    dados["csv"],
+                    retomar=retomar,
+                    tempo_decorrido=dados.get("tempo_decorrido", 0),
+                    decimacao=dados.get("decimacao")
+                )
             except Exception:
                 pass
 
-        self.ciclos_totais = int((dados or {}).get("ciclos", 0))
+        self.ensaio = ControleEnsaio(
+            esp,
+            (dados or {}).get("tipo", ""),
+            (dados or {}).get("dados_bateria", {}),
+            ciclos_totais=int((dados or {}).get("ciclos", 0)),
+            descanso=int((dados or {}).get("descanso", 60)),
+            registrar=self._registrar_evento,
+        )
+        # seq recomeça a cada ESPReader novo
+        self._ultimo_seq = 0
 
         if not retomar:
-            self.dados_tempo.clear()
-            self.dados_tensao.clear()
             self.tempo_inicial = time.time()
-            self.descanso_em_andamento = False
-            self.tempo_restante_descanso = 0
-            self.ax.clear()
-            self.ax.set_xlabel("Tempo (s)")
-            self.ax.set_ylabel("Tensão (V)")
-            self.ax.set_title("Tensão da Bateria em Tempo Real")
-            self.ax.grid(True)
-            self.canvas.draw()
-            self.ciclo_atual = 0
-            self._prev_carga_state = None
+            self.grafico.limpar()
             self.controller.simulacao_dados["ciclo_atual"] = self.ciclo_atual
             self._criar_log()
         else:
-                self.ciclo_atual = int(dados.get("ciclo_atual", 0))
+                # Continua acrescentando eventos no mesmo diário
+                try:
+                    if os.path.exists(self.LOG_FILE):
+                        self.diario.continuar()
+                except Exception as e:
+                    print(f"[LOG] Erro ao reabrir diário: {e}")
+                self.ensaio.retomar(
+                    dados.get("ciclo_atual", 0),
+                    dados.get("descanso_restante", 0)
+                )
                 self.tempo_inicial = time.time() - int(dados.get("tempo_decorrido", 0))
 
-                descanso_restante = int(dados.get("descanso_restante", 0))
-                if descanso_restante > 0:
-                    self.descanso_em_andamento = True
-                    self.tempo_restante_descanso = descanso_restante
-                else:
-                    self.descanso_em_andamento = False
-                    self.tempo_restante_descanso = 0
-
         # Se houver ESPReader, sincroniza ciclo inicial no cache do ESP
         if esp:
             try:
@@ -264,51 +278,64 @@ class TelaMonitoramento(tb.Frame):
             except Exception as e:
                 print(f"[MONITORAMENTO] Falha ao iniciar envio periódico: {e}")
 
+    # Andamento do teste (mantido pelo ControleEnsaio)
+    @property
+    def ciclo_atual(self):
+        return self.ensaio.ciclo_atual
+
+    @property
+    def ciclos_totais(self):
+        return self.ensaio.ciclos_totais
+
+    @property
+    def descanso_em_andamento(self):
+        return self.ensaio.descanso_em_andamento
+
+    @property
+    def tempo_restante_descanso(self):
+        return self.ensaio.tempo_restante_descanso
+
     # =========================
     # Log
     # =========================
     def _criar_log(self):
+        """Inicia o diário da sessão com o estado completo do teste."""
         try:
-            os.makedirs(os.path.dirname(self.LOG_FILE), exist_ok=True)
-
             tempo_decorrido = int(time.time() - self.tempo_inicial)
+            self.diario.iniciar(
+                estado_sessao(self.controller.simulacao_dados, self.ensaio, tempo_decorrido)
+            )
+            self._ultimo_tempo_registrado = tempo_decorrido
 
-            descanso_restante = 0
-            if getattr(self, "descanso_em_andamento", False):
-                descanso_restante = int(self.tempo_restante_descanso)
-
-            log_info = {
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "bateria": self.controller.simulacao_dados.get("dados_bateria", {}).get("nome", "---"),
-                "capacidade": self.controller.simulacao_dados.get("dados_bateria", {}).get("capacidade", "---"),
-                "serial": self.controller.simulacao_dados.get("porta", "---"),
-                "arquivo_csv": self.controller.simulacao_dados.get("csv", "---"),
-                "modo": self.controller.simulacao_dados.get("tipo", "---"),
-
-                # 🔹 ciclos
-                "ciclos_totais": self.ciclos_totais,
-                "ciclo_atual": self.ciclo_atual,
-
-                # 🔹 descanso
-                "descanso": int(self.controller.simulacao_dados.get("descanso", 0)),
-                "descanso_restante": descanso_restante,
-
-                # 🔹 tempo
-                "tempo_decorrido": tempo_decorrido
-            }
-
-            with open(self.LOG_FILE, "w", encoding="utf-8") as f:
-                json.dump(log_info, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"[LOG] Erro ao criar diário: {e}")
 
+    def _registrar_evento(self, evento, **dados):
+        try:
+            self.diario.registrar(evento, **dados)
         except Exception as e:
-            print(f"[LOG] Erro ao atualizar log: {e}")
+            print(f"[LOG] Erro ao registrar '{evento}' no diário: {e}")
+
+    def _registrar_tempo(self):
+        """Tique de 1 s: acrescenta só o tempo decorrido (e o descanso restante)."""
+        tempo_decorrido = int(time.time() - self.tempo_inicial)
+        if tempo_decorrido == self._ultimo_tempo_registrado:
+            return
+        self._ultimo_tempo_registrado = tempo_decorrido
+        if getattr(self, "descanso_em_andamento", False):
+            self._registrar_evento(
+                "tempo",
+                tempo_decorrido=tempo_decorrido,
+                descanso_restante=int(self.tempo_restante_descanso)
+            )
+        else:
+            self._registrar_evento("tempo", tempo_decorrido=tempo_decorrido)
 
     def _apagar_log(self):
-        if os.path.exists(self.LOG_FILE):
-            try:
-                os.remove(self.LOG_FILE)
-            except:
-                pass
+        self.diario.apagar()
+
+    def _fechar_log(self):
+        self.diario.fechar()
 
     # =========================
     # Botões / ações
@@ -320,7 +347,7 @@ class TelaMonitoramento(tb.Frame):
             esp.descarga = "OFF"
             esp.modo = "MANUAL"
             try:
-                esp.bateria_controller.iniciar_carga()
+                self._confirmar_comando(esp.bateria_controller.iniciar_carga(), "Iniciar carga")
             except Exception:
                 pass
 
@@ -331,7 +358,7 @@ class TelaMonitoramento(tb.Frame):
             esp.carga = "OFF"
             esp.modo = "MANUAL"
             try:
-                esp.bateria_controller.iniciar_descarga()
+                self._confirmar_comando(esp.bateria_controller.iniciar_descarga(), "Iniciar descarga")
             except Exception:
                 pass
 
@@ -339,9 +366,25 @@ class TelaMonitoramento(tb.Frame):
         esp = getattr(self.controller, "esp_reader", None)
         if esp:
             try:
-                esp.bateria_controller.desligar_tudo()
+                self._confirmar_comando(esp.bateria_controller.desligar_tudo(), "Desativar tudo")
+            except Exception:
+                pass
+
+    def _confirmar_comando(self, futuro, acao):
+        """Avisa o usuário se a ESP não confirmar o comando (após os reenvios)."""
+        def terminou(f):
+            erro = f.exception()
+            if erro is None:
+                print(f"[MONITORAMENTO] {acao}: confirmado pela ESP em {f.result() * 1000:.0f} ms")
+                return
+            print(f"[MONITORAMENTO] ⚠️ {acao}: {erro}")
+            try:
+                self.after(0, lambda: messagebox.showwarning(
+                    "ESP32", f"{acao}: a ESP32 não confirmou o comando.\n{erro}"
+                ))
             except Exception:
                 pass
+        futuro.add_done_callback(terminou)
 
     # =========================
     # Voltar / Encerrar
@@ -375,7 +418,30 @@ class TelaMonitoramento(tb.Frame):
             self.controller.show_frame("TelaInicial")
 
     # =========================
-    # Atualização labels (1s)
+    # Tique da tela (1s)
+    # =========================
+    def _tique(self):
+        """
+        Único temporizador da tela: atualiza labels e gráfico e reagenda
+        para o próximo prazo fixo (sem acumular o tempo gasto no tique).
+        """
+        if not self.winfo_exists():
+            return
+
+        self.atualizar_labels()
+        self.atualizar_grafico()
+
+        agora = time.monotonic()
+        if self._proximo_tique is None or self._proximo_tique + self.INTERVALO_TIQUE <= agora:
+            self._proximo_tique = agora
+        self._proximo_tique += self.INTERVALO_TIQUE
+        if self.winfo_exists():
+            self.after_id = self.after(
+                max(1, int((self._proximo_tique - agora) * 1000)), self._tique
+            )
+
+    # =========================
+    # Atualização labels
     # =========================
     def atualizar_labels(self):
         if not self.winfo_exists():
@@ -395,31 +461,43 @@ class TelaMonitoramento(tb.Frame):
             bateria = dados.get("dados_bateria", {})
             self.bateria_label.config(text=f"Bateria: {bateria.get('nome','---')}")
             self.capacidade_label.config(text=f"Capacidade: {bateria.get('capacidade','---')}")
-            self.porta_label.config(text=f"Porta: {dados.get('porta','---')}")
+            porta = esp.porta if esp and esp.porta else dados.get('porta', '---')
+            if esp and esp.running and not esp.conectado:
+                self.porta_label.config(text=f"Porta: {porta} (reconectando...)")
+            else:
+                self.porta_label.config(text=f"Porta: {porta}")
             self.tipo_label.config(text=f"Tipo: {dados.get('tipo','---')}")
             self.ciclo_label.config(text=f"Ciclo: {self.ciclo_atual}/{self.ciclos_totais}")
 
             # -------- DADOS DINÂMICOS (ESP) --------
             if esp:
+                # Um único snapshot: todos os campos vêm do mesmo quadro
+                amostra = esp.amostra
+
                 # Tensão
-                if esp.ultima_tensao is not None:
+                if amostra is not None:
                     self.tensao_label.config(
-                        text=f"Tensão: {esp.ultima_tensao:.3f} V"
+                        text=f"Tensão: {amostra.tensao:.3f} V"
                     )
                 else:
                     self.tensao_label.config(text="Tensão: -- V")
 
                 # Corrente
-                if esp.corrente is not None:
+                if amostra is not None and amostra.corrente is not None:
                     self.corrente_label.config(
-                        text=f"Corrente: {esp.corrente:.3f} A"
+                        text=f"Corrente: {amostra.corrente:.3f} A"
                     )
                 else:
                     self.corrente_label.config(text="Corrente: -- A")
 
-                self.modo_label.config(text=f"Modo: {esp.modo}")
-                self.carga_label.config(text=f"Carga: {esp.carga}")
-                self.descarga_label.config(text=f"Descarga: {esp.descarga}")
+                if amostra is not None:
+                    self.modo_label.config(text=f"Modo: {amostra.modo}")
+                    self.carga_label.config(text=f"Carga: {amostra.carga}")
+                    self.descarga_label.config(text=f"Descarga: {amostra.descarga}")
+                else:
+                    self.modo_label.config(text=f"Modo: {esp.modo}")
+                    self.carga_label.config(text=f"Carga: {esp.carga}")
+                    self.descarga_label.config(text=f"Descarga: {esp.descarga}")
 
             else:
                 # ESP inexistente
@@ -429,6 +507,10 @@ class TelaMonitoramento(tb.Frame):
                 self.carga_label.config(text="Carga: --")
                 self.descarga_label.config(text="Descarga: --")
 
+            # -------- DIAGNÓSTICO --------
+            if self._diagnostico_visivel:
+                self._atualizar_diagnostico(esp)
+
             # -------- TEMPO --------
             tempo_total = int(time.time() - self.tempo_inicial)
             self.tempo_execucao_label.config(text=f"Tempo: {tempo_total}s")
@@ -444,59 +526,98 @@ class TelaMonitoramento(tb.Frame):
         except Exception as e:
             print(f"[MONITORAMENTO] Erro em atualizar_labels: {e}")
 
-        # 🔹 atualiza log continuamente durante execução
+        # 🔹 registra o tempo no diário durante a execução
         if self.controller.simulacao_dados:
-            self._criar_log()
+            self._registrar_tempo()
 
-        # 🔁 SEMPRE reagenda
-        if self.winfo_exists():
-            self.after_id = self.after(1000, self.atualizar_labels)
+    # =========================
+    # Diagnóstico do enlace
+    # =========================
+    def alternar_diagnostico(self):
+        self._diagnostico_visivel = not self._diagnostico_visivel
+        if self._diagnostico_visivel:
+            self.frame_diagnostico.pack(fill="x", pady=(0, 10), before=self.canvas.get_tk_widget())
+            self._atualizar_diagnostico(getattr(self.controller, "esp_reader", None))
+        else:
+            self.frame_diagnostico.pack_forget()
+
+    def _atualizar_diagnostico(self, esp):
+        if not esp or not hasattr(esp, "diagnostico"):
+            self.diagnostico_label.config(text="Sem leitor ativo.")
+            return
+        d = esp.diagnostico()
+
+        def ms(valor, casas=1):
+            return "--" if valor is None else f"{valor * 1000:.{casas}f}"
+
+        def us(valor):
+            return "--" if valor is None else f"{valor * 1e6:.1f}"
+
+        taxa_q = "--" if d["quadros_s"] is None else f"{d['quadros_s']:.1f}"
+        taxa_b = "--" if d["bytes_s"] is None else f"{d['bytes_s']:.0f}"
+        iv, ip, lc = d["intervalo"], d["interpretacao"], d["latencia_comando"]
+        qpl = "--" if d["quadros_por_leitura"] is None else f"{d['quadros_por_leitura']:.1f}"
+        linhas = [
+            f"Quadros: {d['quadros']} ({taxa_q}/s)   Bytes: {d['bytes']} ({taxa_b} B/s)   "
+            f"Malformados: {d['malformados']}   Outras linhas: {d['outras_linhas']}   "
+            f"Descartados: {d['bytes_descartados']} B",
+            f"Amostras perdidas: buffer {d['perdidas_buffer']}, gravação {d['descartadas_gravacao']}",
+            f"Intervalo entre quadros (ms) p50/p99/máx: {ms(iv['p50'])}/{ms(iv['p99'])}/{ms(iv['max'])}   "
+            f"Jitter: {ms(d['jitter'])} ms   Quase timeout: {d['quase_timeout']}",
+            # vários quadros numa leitura dividem o tempo desde a leitura
+            # anterior: o intervalo mostra o ritmo das leituras da serial
+            f"Quadros por leitura da serial: média {qpl}, máx {d['max_quadros_leitura']}   "
+            f"(intervalo = tempo entre leituras ÷ quadros da leitura)",
+            f"Interpretação (µs) p50/p99: {us(ip['p50'])}/{us(ip['p99'])}   "
+            f"Comandos: RTT p50 {ms(lc['p50'])} ms, reenvios {d['reenvios']}, falhas {d['falhas_comando']}, "
+            f"órfãs {d['respostas_orfas']}",
+            f"Quedas: {d['quedas']} ({d['tempo_sem_conexao']:.0f} s sem conexão)"
+            + ("" if d["conectado"] else "   ⚠️ reconectando..."),
+        ]
+        if d["ultima_malformada"]:
+            linhas.append("Última malformada: " + d["ultima_malformada"][:80].decode("utf-8", "replace"))
+        self.diagnostico_label.config(text="\n".join(linhas))
 
     # =========================
     # Atualização do gráfico e checagem de término
     # =========================
-    def atualizar_grafico(self, frame):
+    def atualizar_grafico(self):
         esp = getattr(self.controller, "esp_reader", None)
-        if not esp or esp.ultima_tensao is None or not esp.running:
+        if not esp or not esp.running:
+            return
+        if not esp.conectado:
+            # Queda da conexão: o último quadro está velho, então as regras
+            # do teste (e o descanso) esperam a reconexão
+            return
+        if esp.porta and esp.porta != self.controller.simulacao_dados.get("porta"):
+            # Reconectou com outro nome de porta: a retomada deve usar o novo
+            self.controller.simulacao_dados["porta"] = esp.porta
+            self._registrar_evento("porta", serial=esp.porta)
+        amostra = esp.amostra
+        if amostra is None:
             return
 
         try:
-            # Atualiza buffers
-            t = time.time() - self.tempo_inicial
-            self.dados_tempo.append(t)
-            self.dados_tensao.append(esp.ultima_tensao)
-
-            # Redesenha gráfico
-            self.ax.clear()
-            self.ax.plot(self.dados_tempo, self.dados_tensao, color='tab:green')
-            self.ax.set_xlabel("Tempo (s)")
-            self.ax.set_ylabel("Tensão (V)")
-            self.ax.set_title("Tensão da Bateria em Tempo Real")
-            self.ax.grid(True)
-            self.canvas.draw()
-
-            # OBS: REMOVIDA gravação direta aqui. ESPReader controla gravação periódica.
-
-            # Dados para análise de encerramento
-            dados_bat = self.controller.simulacao_dados.get("dados_bateria", {}) or {}
-            tipo_teste = (self.controller.simulacao_dados.get("tipo", "") or "").lower().strip()
-
-            # Converte tensões com segurança
-            try:
-                tensao_carga = float(str(dados_bat.get("tensao_carga", "")).replace(",", ".") or 0)
-            except Exception:
-                tensao_carga = 0.0
-            try:
-                tensao_descarga = float(str(dados_bat.get("tensao_descarga", "")).replace(",", ".") or 0)
-            except Exception:
-                tensao_descarga = 0.0
-
-            tolerancia = 0.01  # 10 mV
+            # Acrescenta ao gráfico todas as amostras recebidas desde o último quadro
+            desloc = time.time() - time.monotonic() - self.tempo_inicial
+            novas = esp.amostras.desde(self._ultimo_seq)
+            self.grafico.acrescentar([a.t + desloc for a in novas], [a.tensao for a in novas])
+            if novas:
+                # cursor pela última entregue: quadros chegados depois de ler
+                # esp.amostra já vieram agora e não podem voltar no próximo tique
+                self._ultimo_seq = novas[-1].seq
+
+            # Só a linha é redesenhada (eixos reescalados quando os dados saem dos limites)
+            self.grafico.atualizar()
+
+            # Regras de término e ciclos (core/ensaio.py)
+            mensagem = self.ensaio.tique(amostra)
+            self.controller.simulacao_dados["ciclo_atual"] = self.ciclo_atual
+            self.ciclo_label.config(text=f"Ciclo: {self.ciclo_atual}/{self.ciclos_totais}")
+            if self.descanso_em_andamento:
+                self.descanso_label.config(text=f"Descanso: {int(self.tempo_restante_descanso)}s")
 
-            # ============================
-            # Finalização manual/carga/descarga
-            # ============================
-            def finalizar_teste(mensagem="Teste finalizado"):
+            if mensagem:
                 # Para tudo imediatamente
                 try: esp.bateria_controller.desligar_tudo()
                 except: pass
@@ -511,84 +632,6 @@ class TelaMonitoramento(tb.Frame):
 
                 self.controller.show_frame("TelaInicial")
                 self.after(100, lambda: messagebox.showinfo("Teste finalizado", mensagem))
-
-            # --- Teste de carga ---
-            if tipo_teste == "carga" and tensao_carga > 0:
-                if esp.ultima_tensao >= (tensao_carga - tolerancia):
-                    finalizar_teste("Tensão de carga atingida. Teste finalizado.")
-                    return
-
-            # --- Teste de descarga ---
-            if tipo_teste == "carga" and tensao_descarga > 0:
-                if esp.ultima_tensao <= (tensao_descarga + tolerancia):
-                    finalizar_teste("Tensão de descarga atingida. Teste finalizado.")
-                    return
-
-            # ============================
-            #          CICLOS
-            # ============================
-            if tipo_teste == "ciclos":
-
-                # DESCANSO
-                if self.descanso_em_andamento:
-                    self.tempo_restante_descanso -= 1
-                    if self.tempo_restante_descanso <= 0:
-                        self.descanso_em_andamento = False
-
-                        self._prev_carga_state = esp.carga
-                        self._prev_disch_state = esp.descarga
-
-                        try:
-                            esp.bateria_controller.alternar_modo()
-                        except:
-                            pass
-                    return
-
-                charge = esp.carga
-                disch = esp.descarga
-
-                if not hasattr(self, "_prev_disch_state") or self._prev_carga_state is None:
-                    self._prev_carga_state = charge
-                    self._prev_disch_state = disch
-                    return
-
-                troca_valida = (
-                    self._prev_disch_state == "ON" and disch == "OFF" and charge == "ON"
-                ) or (
-                    self._prev_carga_state == "ON" and charge == "OFF" and disch == "ON"
-                )
-
-                # Atualiza estados
-                self._prev_carga_state = charge
-                self._prev_disch_state = disch
-
-                if troca_valida:
-                    self.ciclo_atual += 1
-                    # atualiza cache do ESP para a gravação
-                    try:
-                        esp.set_ciclo(self.ciclo_atual)
-                    except:
-                        pass
-
-                    self.controller.simulacao_dados["ciclo_atual"] = self.ciclo_atual
-                    self._criar_log()
-                    self.ciclo_label.config(text=f"Ciclo: {self.ciclo_atual}/{self.ciclos_totais}")
-
-                    if self.ciclos_totais and self.ciclo_atual >= self.ciclos_totais:
-                        finalizar_teste("Todos os ciclos concluídos. Teste finalizado.")
-                        return
-
-                    descanso = int(self.controller.simulacao_dados.get("descanso", 60))
-                    self.descanso_em_andamento = True
-                    self.tempo_restante_descanso = descanso
-                    self.descanso_label.config(text=f"Descanso: {descanso}s")
-
-                    try:
-                        esp.bateria_controller.desligar_tudo()
-                    except:
-                        pass
-
-                    return
         except Exception as e:
             print(f"[MONITORAMENTO] Erro geral em atualizar_grafico: {e}")
             pass
@@ -613,12 +656,6 @@ class TelaMonitoramento(tb.Frame):
             except Exception:
                 pass
             self.after_id = None
-        if hasattr(self, 'ani') and self.ani.event_source:
-            try:
-                self.ani.event_source.stop()
-            except Exception:
-                pass
-            del self.ani
         if hasattr(self, 'fig'):
             try:
                 plt.close(self.fig)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+# Mesmo esquema do main.py: o pyserial vendorizado fica em assets/lib
+APP = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "bateria_app"))
+ENSAIOS = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "ensaios_de_teste", "ensaios"))
+
+sys.path.insert(0, APP)
+sys.path.insert(1, os.path.join(APP, "assets", "lib"))
+
+
+def linha_telemetria(i, tensao=3.7, modo="AUTO", carga="ON", descarga="OFF", corrente=0.123):
+    """Linha no formato impresso pelo firmware v_4.0 (bytes, com \\n)."""
+    return (
+        f"Vbat: {tensao:.3f} V | Mode: {modo} | Charge: {carga} | "
+        f"Disch: {descarga} | Corrente: {corrente:.3f} A\n"
+    ).encode()
+
+
+def criar_pty():
+    """Cria um par PTY em modo raw. Retorna (fd_mestre, caminho_escravo). Só POSIX."""
+    import pty
+    import tty
+
+    mestre, escravo = pty.openpty()
+    tty.setraw(escravo)
+    return mestre, os.ttyname(escravo)
+
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, int(round(p / 100.0 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+# Mensagens por comando/conexão do BateriaController e do ESPReader
+# (envio, reenvio, confirmação e conexão) que só atrapalham as tabelas
+RUIDO = ("📤", "🔁", "✅")
+
+
+def silenciar_prints(prefixos=RUIDO):
+    """Troca o print embutido por um que descarta as mensagens que começam com `prefixos`."""
+    import builtins
+
+    original = builtins.print
+
+    def filtrado(*args, **kwargs):
+        if args and str(args[0]).startswith(prefixos):
+            return
+        original(*args, **kwargs)
+
+    builtins.print = filtrado
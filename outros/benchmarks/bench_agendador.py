@@ -0,0 +1,94 @@
+"""
+Benchmark do agendador único (core/agendador.py).
+
+Para N placas, compara as tarefas periódicas de cada ESPReader:
+  - modelo antigo: por placa, uma thread de envio que faz polling com
+    time.sleep(0.1) para mandar USB ON a cada 3 s e um threading.Timer novo
+    a cada 1 s para a gravação periódica;
+  - agendador: por placa, as tarefas de USB ON (3 s), watchdog (0,5 s) e
+    reenvio de comandos (0,1 s) no mesmo Agendador.
+As tarefas não fazem nada (mede só o custo do mecanismo). As threads de
+leitura serial são iguais nos dois casos e ficam de fora.
+
+Mostra a CPU gasta (processo) por segundo, o número de threads e o atraso
+dos disparos em relação ao prazo.
+
+Uso:  python outros/benchmarks/bench_agendador.py [segundos]
+"""
+import sys
+import threading
+import time
+
+import _comum
+from core.agendador import Agendador
+
+
+class PlacaAntiga:
+    def __init__(self):
+        self.ativo = True
+        self.atrasos = []
+        threading.Thread(target=self._envio, daemon=True).start()
+        self._prazo_save = time.monotonic() + 1
+        self._timer()
+
+    def _envio(self):
+        prazo = time.monotonic()
+        while self.ativo:
+            self.atrasos.append(time.monotonic() - prazo)
+            prazo = time.monotonic() + 3
+            for _ in range(30):
+                if not self.ativo:
+                    break
+                time.sleep(0.1)
+
+    def _timer(self):
+        if not self.ativo:
+            return
+        self.atrasos.append(time.monotonic() - self._prazo_save)
+        self._prazo_save = time.monotonic() + 1
+        t = threading.Timer(1, self._timer)
+        t.daemon = True
+        t.start()
+
+    def parar(self):
+        self.ativo = False
+
+
+def medir(n, segundos, novo):
+    base_threads = threading.active_count()
+    if novo:
+        agendador = Agendador()
+        tarefas = []
+        for k in range(n):
+            for intervalo in (3.0, 0.5, 0.1):
+                tarefas.append(agendador.agendar_periodico(intervalo, lambda: None, atraso=0))
+    else:
+        placas = [PlacaAntiga() for _ in range(n)]
+
+    time.sleep(0.5)
+    threads = threading.active_count() - base_threads
+    c0, t0 = time.process_time(), time.perf_counter()
+    time.sleep(segundos)
+    cpu = (time.process_time() - c0) / (time.perf_counter() - t0)
+
+    if novo:
+        atraso = max(t.atrasos for t in tarefas)
+        agendador.parar()
+    else:
+        atraso = max(max(p.atrasos) for p in placas)
+        for p in placas:
+            p.parar()
+        time.sleep(1.2)
+    return threads, cpu, atraso
+
+
+def main(segundos):
+    print(f"{'placas':>6} {'modelo':<10} {'threads':>8} {'CPU (%)':>9} {'atraso máx (ms)':>16}")
+    for n in (1, 4, 16, 64):
+        for novo in (False, True):
+            threads, cpu, atraso = medir(n, segundos, novo)
+            print(f"{n:>6} {'agendador' if novo else 'antigo':<10} {threads:>8} {cpu * 100:>9.2f} {atraso * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,134 @@
+"""
+Benchmark do leitor asyncio (core/monitor_async.py) × ESPReader (thread).
+
+Cria N placas falsas (PTY), cada uma enviando telemetria a 10 quadros/s,
+e lê todas ao mesmo tempo:
+  - thread: um ESPReader por placa;
+  - asyncio: um LeitorAsync por placa, todos no mesmo event loop.
+Os dois gravam um CSV por placa (decimação "media:1") e enviam USB ON.
+
+Mostra CPU do processo, número de threads criadas (no asyncio, as do
+executor usado pelo fsync), quadros recebidos e a latência entre a escrita
+no PTY e a publicação da amostra. Só Linux/macOS.
+
+Uso:  python outros/benchmarks/bench_async.py [segundos]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import _comum
+from core.autodetect import abrir_serial
+from core.monitor import ESPReader
+from core.monitor_async import LeitorAsync, PonteAsync
+
+
+def placas_falsas(n, parar, enviados):
+    mestres = []
+    for _ in range(n):
+        mestre, caminho = _comum.criar_pty()
+        mestres.append((mestre, caminho))
+
+    def emitir():
+        prazo = time.monotonic()
+        i = 0
+        while not parar.is_set():
+            i += 1
+            enviados[i] = time.monotonic()
+            linha = _comum.linha_telemetria(i, tensao=3.0 + (i % 1000) / 1000)
+            for mestre, _ in mestres:
+                try:
+                    os.write(mestre, linha)
+                except OSError:
+                    pass
+            prazo += 0.1
+            time.sleep(max(0.0, prazo - time.monotonic()))
+
+    threading.Thread(target=emitir, daemon=True).start()
+    return mestres
+
+
+def drenar(mestres, parar):
+    # Consome o que os leitores escrevem (USB ON) para o PTY não encher
+    import select
+    fds = [m for m, _ in mestres]
+    while not parar.is_set():
+        prontos, _, _ = select.select(fds, [], [], 0.1)
+        for fd in prontos:
+            try:
+                os.read(fd, 4096)
+            except OSError:
+                pass
+
+
+def medir(n, segundos, modo):
+    parar = threading.Event()
+    enviados = {}
+    mestres = placas_falsas(n, parar, enviados)
+    threading.Thread(target=drenar, args=(mestres, parar), daemon=True).start()
+    pasta = tempfile.mkdtemp()
+    base_threads = threading.active_count()
+
+    ponte = PonteAsync() if modo == "asyncio" else None
+    leitores = []
+    for k, (_, caminho) in enumerate(mestres):
+        if modo == "asyncio":
+            leitor = LeitorAsync(caminho, ponte=ponte)
+        else:
+            leitor = ESPReader(porta=caminho)
+            leitor.ser = abrir_serial(caminho, 115200)
+            leitor.conectado = True   # como o conectar(), sem a espera de 1 s por porta
+        leitor.definir_csv(os.path.join(pasta, f"placa{k}.csv"), decimacao="media:1")
+        leitor.start()
+        leitor.iniciar_envio_periodico()
+        leitores.append(leitor)
+
+    time.sleep(1.0)
+    threads = threading.active_count() - base_threads
+    latencias = []
+    vistos = [0] * n
+    c0, t0 = time.process_time(), time.perf_counter()
+    fim = t0 + segundos
+    while time.perf_counter() < fim:
+        for k, leitor in enumerate(leitores):
+            a = leitor.amostra
+            if a is not None and a.seq != vistos[k]:
+                vistos[k] = a.seq
+        time.sleep(0.05)
+    cpu = (time.process_time() - c0) / (time.perf_counter() - t0)
+    quadros = sum(l.parser.quadros for l in leitores)
+
+    # latência: instante de publicação da amostra (t) - instante de escrita no PTY
+    for leitor in leitores:
+        for a in list(leitor.amostras.desde(0))[-20:]:
+            i = int(round((a.tensao - 3.0) * 1000))
+            for j in range(i, 0, -1000):
+                if j in enviados:
+                    latencias.append(a.t - enviados[j])
+                    break
+
+    for leitor in leitores:
+        leitor.parar()
+    parar.set()
+    if ponte:
+        ponte.parar()
+    time.sleep(1.5)   # deixa as threads da rodada terminarem antes da próxima
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] if latencias else float("nan")
+    return threads, cpu, quadros, p50
+
+
+def main(segundos):
+    print(f"{'placas':>6} {'modo':<8} {'threads':>8} {'CPU (%)':>9} {'quadros':>9} {'lat. p50 (ms)':>14}")
+    for n in (1, 8, 32):
+        for modo in ("thread", "asyncio"):
+            threads, cpu, quadros, p50 = medir(n, segundos, modo)
+            print(f"{n:>6} {modo:<8} {threads:>8} {cpu * 100:>9.2f} {quadros:>9} {p50 * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    _comum.silenciar_prints()
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5)
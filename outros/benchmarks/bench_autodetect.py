@@ -0,0 +1,106 @@
+"""
+Benchmark da detecção automática da ESP32 (core/autodetect.py).
+
+Cria N portas falsas (PTY): uma delas imita o firmware (responde
+"Comando invalido." a qualquer comando e imprime telemetria), as outras
+ficam mudas, como adaptadores USB-serial sem nada conectado. Compara:
+  - busca antiga: abre uma porta por vez, espera 1 s e tenta ler uma linha;
+  - detectar_esp sem cache (sondagem paralela com handshake);
+  - detectar_esp com a placa no cache.
+
+As portas PTY não aparecem em list_ports.comports(); o script troca a
+listagem por uma lista com as portas criadas. Só Linux/macOS.
+
+Uso:  python outros/benchmarks/bench_autodetect.py [portas]
+"""
+import os
+import select
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import _comum
+import serial
+import serial.tools.list_ports
+from core import autodetect
+
+
+def firmware_falso(mestre, parar):
+    """Responde aos comandos como o firmware e envia telemetria a 10 Hz."""
+    buffer = b""
+    proximo = time.monotonic()
+    i = 0
+    while not parar.is_set():
+        prontos, _, _ = select.select([mestre], [], [], 0.02)
+        if prontos:
+            try:
+                buffer += os.read(mestre, 1024)
+            except OSError:
+                return
+            while b"\n" in buffer:
+                _, buffer = buffer.split(b"\n", 1)
+                os.write(mestre, b"Comando invalido.\n")
+        if time.monotonic() >= proximo:
+            i += 1
+            os.write(mestre, _comum.linha_telemetria(i))
+            proximo += 0.1
+
+
+def busca_legada(portas, baudrate=115200):
+    """Cópia da busca antiga do ESPReader.conectar."""
+    for p in portas:
+        try:
+            ser = serial.Serial(p.device, baudrate, timeout=0.2)
+            time.sleep(1)
+            ser.reset_input_buffer()
+            linha = ser.readline().decode(errors="ignore").strip()
+            if linha:
+                return p.device, ser
+            ser.close()
+        except Exception:
+            continue
+    raise Exception("Nenhuma ESP32 respondendo.")
+
+
+def main(n):
+    parar = threading.Event()
+    portas = []
+    mestres = []
+    for k in range(n):
+        mestre, caminho = _comum.criar_pty()
+        mestres.append(mestre)
+        portas.append(SimpleNamespace(device=caminho, vid=0x10C4, pid=0xEA60, serial_number=f"SN{k}"))
+    # A placa fica por último: pior caso para a busca sequencial
+    threading.Thread(target=firmware_falso, args=(mestres[-1], parar), daemon=True).start()
+    # Esvazia o que for escrito nas portas mudas
+    def drenar():
+        while not parar.is_set():
+            prontos, _, _ = select.select(mestres[:-1], [], [], 0.1)
+            for fd in prontos:
+                os.read(fd, 1024)
+    threading.Thread(target=drenar, daemon=True).start()
+
+    serial.tools.list_ports.comports = lambda: list(portas)
+    cache = os.path.join(tempfile.mkdtemp(), "esp_cache.json")
+
+    casos = [
+        ("busca antiga (sequencial, 1 s por porta)", lambda: busca_legada(portas)),
+        ("detectar_esp sem cache (paralela)", lambda: autodetect.detectar_esp(caminho_cache=cache)),
+        ("detectar_esp com cache", lambda: autodetect.detectar_esp(caminho_cache=cache)),
+    ]
+    print(f"{n} portas, ESP32 na última")
+    print(f"{'caso':<44} {'tempo (s)':>10}  porta")
+    for rotulo, funcao in casos:
+        t0 = time.perf_counter()
+        device, ser = funcao()
+        dt = time.perf_counter() - t0
+        ser.close()
+        assert device == portas[-1].device
+        print(f"{rotulo:<44} {dt:>10.3f}  {device}")
+    parar.set()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
@@ -0,0 +1,76 @@
+"""
+Benchmark do catálogo de gravações (core/catalogo.py).
+
+Monta uma pasta com N gravações (cópias dos CSVs de ensaios_de_teste) e
+mede:
+
+  - preenchimento inicial (backfill): um processo × processos em paralelo
+    (pelo menos 2, para medir o paralelo mesmo numa máquina de 1 CPU);
+  - sincronizar de novo sem nada alterado (só os stat dos arquivos);
+  - depois de alterar 1 % das gravações (só elas são relidas);
+  - listar/ordenar/filtrar pelo catálogo, o que a tela de histórico faz a
+    cada clique × obter as mesmas informações abrindo todos os CSVs.
+
+Uso:  python outros/benchmarks/bench_catalogo.py [gravacoes]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import _comum
+from core.catalogo import ARQUIVO_CATALOGO, Catalogo, resumir_arquivo
+from core.historico import Historico
+
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return time.perf_counter() - inicio, resultado
+
+
+def montar_pasta(pasta, n):
+    origens = [os.path.join(_comum.ENSAIOS, f) for f in sorted(os.listdir(_comum.ENSAIOS)) if f.endswith(".csv")]
+    for k in range(n):
+        origem = origens[k % len(origens)]
+        shutil.copyfile(origem, os.path.join(pasta, f"{k:05d}_{os.path.basename(origem)}"))
+    return sum(os.path.getsize(os.path.join(pasta, f)) for f in os.listdir(pasta))
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as pasta:
+        total = montar_pasta(pasta, n)
+        nomes = Historico(pasta).listar_csvs()
+        print(f"{n} gravações, {total / 2**20:.0f} MB, {os.cpu_count()} CPUs\n")
+
+        serie, _ = cronometrar(Catalogo(pasta).sincronizar, nomes, trabalhadores=1)
+        os.remove(os.path.join(pasta, ARQUIVO_CATALOGO))
+        catalogo = Catalogo(pasta)
+        paralelo, _ = cronometrar(catalogo.sincronizar, nomes, trabalhadores=max(2, os.cpu_count() or 1))
+        nada, relidas_nada = cronometrar(catalogo.sincronizar, nomes)
+        for nome in nomes[:: 100]:
+            with open(os.path.join(pasta, nome), "a") as f:
+                f.write("999999;3.700;0.000;AUTO;ON;OFF;0\n")
+        alteradas, relidas = cronometrar(catalogo.sincronizar, nomes)
+
+        print(f"{'preenchimento, 1 processo':<40} {serie:>9.2f} s")
+        print(f"{'preenchimento, processos em paralelo':<40} {paralelo:>9.2f} s  ({serie / paralelo:.1f}×)")
+        print(f"{'sincronizar sem mudanças':<40} {nada * 1000:>9.1f} ms ({relidas_nada} relidas)")
+        print(f"{'sincronizar com 1 % alterado':<40} {alteradas * 1000:>9.1f} ms ({relidas} relidas)\n")
+
+        consultas = (
+            ("listar (mais recentes primeiro)", {}),
+            ("ordenar por ciclos", {"ordem": "ciclos"}),
+            ("ordenar por V mín, crescente", {"ordem": "v_min", "decrescente": False}),
+            ("filtrar 'manual'", {"filtro": "manual"}),
+        )
+        for rotulo, opcoes in consultas:
+            tempo, linhas = cronometrar(catalogo.listar, **opcoes)
+            print(f"{rotulo:<40} {tempo * 1000:>9.1f} ms ({len(linhas)} linhas)")
+        abrir_tudo, _ = cronometrar(lambda: [resumir_arquivo(os.path.join(pasta, nome)) for nome in nomes])
+        print(f"{'abrindo todos os CSVs (sem catálogo)':<40} {abrir_tudo * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
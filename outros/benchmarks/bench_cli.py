@@ -0,0 +1,61 @@
+"""
+Tempo de partida e memória residente do executor sem interface (cli.py)
+× a interface gráfica (main.py), medidos num processo novo que só faz os
+imports de cada um (sem abrir janela nem serial).
+
+    python outros/benchmarks/bench_cli.py [--repeticoes 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from _comum import APP
+
+SCRIPT = r"""
+import os, resource, sys, time
+t0 = time.perf_counter()
+sys.path.append(os.path.join(os.getcwd(), "assets", "lib"))
+{imports}
+t = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+pesados = [m for m in ("tkinter", "matplotlib", "PIL", "ttkbootstrap") if m in sys.modules]
+print(t, rss, ",".join(pesados) or "-")
+"""
+
+CASOS = {
+    "cli.py": "import cli",
+    "main.py (interface)": "from ui.base_app import BatteryApp",
+}
+
+
+def medir(imports):
+    inicio = time.perf_counter()
+    saida = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(imports=imports)],
+        cwd=APP, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    total = time.perf_counter() - inicio
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    rss_mb = int(saida[1]) / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return total, float(saida[0]), rss_mb, saida[2]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeticoes", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'':22s} {'processo (ms)':>14s} {'imports (ms)':>13s} {'RSS (MB)':>9s}  módulos pesados")
+    for nome, imports in CASOS.items():
+        medir(imports)  # aquece o cache de .pyc
+        medidas = [medir(imports) for _ in range(args.repeticoes)]
+        total = min(m[0] for m in medidas) * 1000
+        imp = min(m[1] for m in medidas) * 1000
+        rss = min(m[2] for m in medidas)
+        print(f"{nome:22s} {total:14.0f} {imp:13.0f} {rss:9.1f}  {medidas[-1][3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark do canal de comandos confirmados (core/bateria.py).
+
+Um firmware falso num PTY envia telemetria a 10 Hz e responde cada comando
+com a mesma linha do firmware v_4.0, depois de um atraso de processamento.
+Com --perda, descarta a resposta de uma fração dos comandos para exercitar
+os reenvios.
+
+Mede, para N trocas de relé (iniciar_carga / iniciar_descarga alternados):
+  - latência de ida e volta de cada comando (histograma do controlador);
+  - tempo total com os pares esperados um a um × todos em paralelo;
+  - reenvios e falhas.
+
+Antes, confere com uma serial falsa (sem PTY) que respostas perdidas não
+deixam os relés fora do estado pedido: alternar_modo() seguido de
+desligar_tudo() com a resposta do AUTO corrompida, e a fila inteira sem
+resposta até o prazo.
+
+Uso:  python outros/benchmarks/bench_comandos.py [trocas] [--perda 0.2]
+"""
+import os
+import random
+import select
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import _comum
+from core.bateria import BateriaController
+from core.monitor import ESPReader
+
+RESPOSTAS = {k.encode(): v + b"\n" for k, v in BateriaController.RESPOSTAS.items() if v}
+
+
+def firmware_falso(mestre, parar, perda, atraso):
+    buffer = b""
+    proximo = time.monotonic()
+    i = 0
+    while not parar.is_set():
+        prontos, _, _ = select.select([mestre], [], [], 0.01)
+        if prontos:
+            try:
+                buffer += os.read(mestre, 1024)
+            except OSError:
+                return
+            while b"\n" in buffer:
+                cmd, buffer = buffer.split(b"\n", 1)
+                cmd = cmd.strip().upper()
+                if cmd == b"USB ON":
+                    continue
+                time.sleep(atraso)
+                if random.random() < perda:
+                    continue
+                os.write(mestre, RESPOSTAS.get(cmd, b"Comando invalido.\n"))
+        if time.monotonic() >= proximo:
+            i += 1
+            os.write(mestre, _comum.linha_telemetria(i))
+            proximo += 0.1
+
+
+class SerialFalsa:
+    """Guarda as escritas e aplica os comandos, em ordem, a um estado de relés como o firmware."""
+    is_open = True
+
+    def __init__(self):
+        self.escritas = []
+        self.estado = ("MANUAL", "OFF", "OFF")
+
+    def write(self, dados):
+        self.escritas.append(dados)
+        for linha in dados.decode().splitlines():
+            modo, carga, descarga = self.estado
+            if linha == "AUTO":
+                self.estado = ("AUTO", None, None)
+            elif linha.startswith("CHARGE "):
+                self.estado = ("MANUAL", linha.split()[1], descarga if modo == "MANUAL" else "OFF")
+            elif linha.startswith("DISCH "):
+                self.estado = ("MANUAL", carga if modo == "MANUAL" else "OFF", linha.split()[1])
+
+
+def conferir_ordem():
+    """Estado final dos relés = estado_desejado, mesmo com respostas perdidas."""
+    R = BateriaController.RESPOSTAS
+
+    # resposta do AUTO corrompida; as de CHARGE OFF e DISCH OFF chegam
+    serial = SerialFalsa()
+    ctl = BateriaController(SimpleNamespace(ser=serial))
+    ctl.alternar_modo()
+    ctl.desligar_tudo()
+    ctl.receber_resposta(b"Modo AUTOM\xffTICO ativ")
+    ctl.receber_resposta(R["CHARGE OFF"])
+    ctl.receber_resposta(R["DISCH OFF"])
+    assert serial.estado == ctl.estado_desejado == ("MANUAL", "OFF", "OFF"), (serial.escritas, serial.estado)
+    assert ctl.pendentes == 0 and ctl.substituidos == 1
+
+    # só a de CHARGE ON chega (a do AUTO antes dela se perdeu): DISCH OFF
+    # ainda não respondeu, então AUTO é dado como feito e redefinido
+    serial = SerialFalsa()
+    ctl = BateriaController(SimpleNamespace(ser=serial))
+    ctl.alternar_modo()
+    ctl.iniciar_carga()
+    ctl.receber_resposta(R["CHARGE ON"])
+    ctl.receber_resposta(R["DISCH OFF"])
+    assert serial.estado == ctl.estado_desejado == ("MANUAL", "ON", "OFF"), (serial.escritas, serial.estado)
+
+    # nenhuma resposta: no prazo, reaplica o estado pedido em vez de repetir o AUTO por último
+    serial = SerialFalsa()
+    ctl = BateriaController(SimpleNamespace(ser=serial))
+    ctl.alternar_modo()
+    futuro = ctl.desligar_tudo()
+    ctl.verificar_prazos(time.monotonic() + ctl.TIMEOUT + 0.01)
+    assert serial.escritas[-1] == b"CHARGE OFF\nDISCH OFF\n", serial.escritas
+    assert serial.estado == ctl.estado_desejado
+    ctl.receber_resposta(R["CHARGE OFF"])
+    ctl.receber_resposta(R["DISCH OFF"])
+    assert futuro.result(timeout=1) >= 0 and ctl.pendentes == 0
+
+    # link morto: as restaurações herdam as tentativas e a fila termina em falha
+    ctl = BateriaController(SimpleNamespace(ser=SerialFalsa()))
+    ctl.alternar_modo()
+    futuro = ctl.desligar_tudo()
+    agora = time.monotonic()
+    for k in range(1, 10):
+        ctl.verificar_prazos(agora + k * (ctl.TIMEOUT + 0.01))
+    assert futuro.exception(timeout=1) is not None and ctl.pendentes == 0
+    print("ordem dos comandos com respostas perdidas: ok")
+
+
+def main(trocas, perda):
+    conferir_ordem()
+    random.seed(1)
+    mestre, caminho = _comum.criar_pty()
+    parar = threading.Event()
+    threading.Thread(target=firmware_falso, args=(mestre, parar, perda, 0.002), daemon=True).start()
+
+    esp = ESPReader(porta=caminho)
+    esp.conectar()
+    esp.start()
+    ctl = esp.bateria_controller
+    ctl.TIMEOUT = 0.2
+
+    acoes = [ctl.iniciar_carga, ctl.iniciar_descarga]
+
+    # Um par por vez: espera a confirmação antes do próximo
+    ctl.latencia.zerar()
+    t0 = time.perf_counter()
+    erros = 0
+    for k in range(trocas):
+        try:
+            acoes[k % 2]().result(timeout=5)
+        except Exception:
+            erros += 1
+    dt_seq = time.perf_counter() - t0
+    print(f"um por vez : {trocas} trocas em {dt_seq:.3f} s, {erros} falhas")
+    print(f"             latência por comando: {ctl.latencia}")
+
+    # Todos em paralelo (pipelined)
+    ctl.latencia.zerar()
+    reenvios0, falhas0 = ctl.reenvios, ctl.falhas
+    t0 = time.perf_counter()
+    futuros = [acoes[k % 2]() for k in range(trocas)]
+    erros = 0
+    for f in futuros:
+        try:
+            f.result(timeout=10)
+        except Exception:
+            erros += 1
+    dt_par = time.perf_counter() - t0
+    print(f"em paralelo: {trocas} trocas em {dt_par:.3f} s, {erros} falhas")
+    print(f"             latência por comando: {ctl.latencia}")
+    print(f"reenvios={ctl.reenvios - reenvios0} falhas={ctl.falhas - falhas0} "
+          f"respostas órfãs={ctl.respostas_orfas}")
+
+    esp.parar()
+    parar.set()
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    perda = float(sys.argv[sys.argv.index("--perda") + 1]) if "--perda" in sys.argv else 0.0
+    if "--perda" in sys.argv:
+        args.remove(sys.argv[sys.argv.index("--perda") + 1])
+    # silencia os prints de envio do controlador
+    _comum.silenciar_prints()
+    main(int(args[0]) if args else 100, perda)
@@ -0,0 +1,97 @@
+"""
+Custo de um tique do gráfico da TelaMonitoramento com 10 mil, 100 mil e
+1 milhão de pontos (1 ponto/s: ~3 horas, ~1 dia e ~12 dias de teste).
+
+  - antigo: ax.clear() + ax.plot() de todos os pontos + rótulos/grade +
+    canvas.draw() completo, a cada tique;
+  - GraficoVivo (ui/grafico_vivo.py): acrescenta o ponto novo à
+    SerieCamadas (core/reducao.py), set_data na mesma Line2D com poucos
+    milhares de pontos e blit só da linha; desenho completo só ao reescalar.
+
+Roda com o backend Agg (sem janela), na mesma figura 8x3 da tela. Mostra
+a média e o p99 do tique em ms e quantos tiques precisaram de desenho
+completo.
+
+Uso:  python outros/benchmarks/bench_grafico.py [tiques]
+"""
+import sys
+import time
+from collections import deque
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from _comum import percentil
+
+from ui.grafico_vivo import GraficoVivo
+
+
+def serie(n):
+    """Dente de serra entre 3,0 e 4,2 V (ciclos de 2 h) com ruído."""
+    t = np.arange(n, dtype=float)
+    v = 3.0 + 1.2 * np.abs(((t / 3600.0) % 2.0) - 1.0) + np.random.default_rng(1).normal(0, 0.003, n)
+    return t, v
+
+
+def figura():
+    fig, ax = plt.subplots(figsize=(8, 3))
+    linha, = ax.plot([], [], color="tab:green")
+    ax.set_xlabel("Tempo (s)")
+    ax.set_ylabel("Tensão (V)")
+    ax.set_title("Tensão da Bateria em Tempo Real")
+    ax.grid(True)
+    fig.canvas.draw()
+    return fig, ax, linha
+
+
+def medir_antigo(t, v, tiques):
+    fig, ax, _ = figura()
+    dados_tempo, dados_tensao = deque(t), deque(v)
+    tempos = []
+    for k in range(tiques):
+        inicio = time.perf_counter()
+        dados_tempo.append(t[-1] + 1 + k)
+        dados_tensao.append(v[-1])
+        ax.clear()
+        ax.plot(dados_tempo, dados_tensao, color="tab:green")
+        ax.set_xlabel("Tempo (s)")
+        ax.set_ylabel("Tensão (V)")
+        ax.set_title("Tensão da Bateria em Tempo Real")
+        ax.grid(True)
+        fig.canvas.draw()
+        tempos.append(time.perf_counter() - inicio)
+    plt.close(fig)
+    return tempos, tiques
+
+
+def medir_vivo(t, v, tiques):
+    fig, ax, linha = figura()
+    grafico = GraficoVivo(fig.canvas, ax, linha)
+    grafico.acrescentar(t, v)
+    grafico.atualizar()   # primeiro desenho: escala e fundo
+    base = grafico.redesenhos
+    tempos = []
+    for k in range(tiques):
+        inicio = time.perf_counter()
+        grafico.acrescentar([t[-1] + 1 + k], [v[-1]])
+        grafico.atualizar()
+        tempos.append(time.perf_counter() - inicio)
+    plt.close(fig)
+    return tempos, grafico.redesenhos - base
+
+
+def main(tiques):
+    print(f"{'pontos':>9} {'modo':<12} {'média (ms)':>11} {'p99 (ms)':>9} {'desenhos completos':>19}")
+    for n in (10_000, 100_000, 1_000_000):
+        t, v = serie(n)
+        for nome, medir in (("antigo", medir_antigo), ("GraficoVivo", medir_vivo)):
+            tempos, completos = medir(t, v, tiques)
+            print(f"{n:>9} {nome:<12} {sum(tempos) / len(tempos) * 1000:>11.2f} "
+                  f"{percentil(tempos, 99) * 1000:>9.2f} {completos:>12}/{tiques}", flush=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
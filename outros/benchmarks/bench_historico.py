@@ -0,0 +1,135 @@
+"""
+Benchmark do carregamento de gravações do histórico (core/historico.py).
+
+Para cada CSV de ensaios_de_teste (delimitador ";") e para cópias no
+formato do app (delimitador ","), compara:
+
+  - antigo: csv.DictReader linha a linha, procurando a coluna de tempo e
+    de tensão em cada linha e convertendo com float() (cópia do
+    Historico.carregar_dados anterior);
+  - ler_csv: formato farejado uma vez, arquivo dividido de uma vez e cada
+    coluna convertida para numpy de uma só vez.
+
+Mostra as linhas válidas lidas por cada um (os arquivos com ";" não eram
+reconhecidos pelo antigo) e o melhor tempo de algumas repetições.
+
+Depois mede a reabertura pelo Historico com o CacheGravacoes: primeira
+abertura (parse + gravação do sidecar .npz), reabertura na mesma sessão
+(memória) e numa sessão nova (Historico novo, lê o sidecar).
+
+Uso:  python outros/benchmarks/bench_historico.py [repeticoes] [linhas_sinteticas]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import _comum
+from core.gravador import CABECALHO_CSV
+from core.historico import CacheGravacoes, Historico, ler_csv
+
+
+def carregar_antigo(caminho):
+    tempos, tensoes = [], []
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                t_raw = None
+                for key in ("Tempo (s)", "Tempo", "Time", "t"):
+                    if key in row and row[key] not in (None, ""):
+                        t_raw = row[key]
+                        break
+                v_raw = None
+                for key in ("Tensao (V)", "Tensao", "Tensão (V)", "Tensão", "Voltage", "Vbat", "Tensao(V)"):
+                    if key in row and row[key] not in (None, ""):
+                        v_raw = row[key]
+                        break
+                if t_raw is None or v_raw is None:
+                    continue
+                try:
+                    t = float(str(t_raw).replace(",", "."))
+                    v = float(str(v_raw).replace(",", "."))
+                except Exception:
+                    continue
+                tempos.append(t)
+                tensoes.append(v)
+    except Exception as e:
+        print(f"[ERRO] Falha ao carregar {caminho}: {e}")
+    return tempos, tensoes
+
+
+def melhor_tempo(funcao, caminho, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(caminho)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def para_formato_app(origem, destino):
+    """Copia um CSV de ensaio para o formato do app (vírgula, CABECALHO_CSV)."""
+    with open(origem, newline="", encoding="utf-8") as f:
+        linhas = list(csv.reader(f, delimiter=";"))[1:]
+    with open(destino, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(CABECALHO_CSV)
+        for linha in linhas:
+            escritor.writerow((linha + ["0"])[:len(CABECALHO_CSV)])
+
+
+def sintetico(destino, n):
+    """CSV no formato do app com `n` linhas de um ciclo de carga/descarga."""
+    t = np.arange(n) * 0.5
+    v = 3.0 + 1.2 * np.abs(((t / 3600.0) % 2.0) - 1.0)
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write(",".join(CABECALHO_CSV) + "\n")
+        for a, b in zip(t.tolist(), v.tolist()):
+            f.write(f"{a:.3f},{b:.3f},0.120,AUTO,ON,OFF,0\n")
+
+
+def medir_reabertura(pasta, nomes):
+    print(f"\n{'arquivo':<42} {'1ª abertura (ms)':>17} {'memória (ms)':>13} {'sidecar (ms)':>13}")
+    for nome in nomes:
+        historico = Historico(pasta, cache=CacheGravacoes())
+        tempos = []
+        for h in (historico, historico, Historico(pasta, cache=CacheGravacoes())):
+            inicio = time.perf_counter()
+            h.carregar_colunas(nome)
+            tempos.append(time.perf_counter() - inicio)
+        assert historico.cache.leituras == 1
+        print(f"{nome:<42} {tempos[0] * 1000:>17.1f} {tempos[1] * 1000:>13.3f} {tempos[2] * 1000:>13.1f}",
+              flush=True)
+
+
+def main(repeticoes, linhas_sinteticas):
+    arquivos = [os.path.join(_comum.ENSAIOS, nome) for nome in sorted(os.listdir(_comum.ENSAIOS))
+                if nome.endswith(".csv")]
+    with tempfile.TemporaryDirectory() as pasta:
+        app = []
+        for caminho in arquivos:
+            destino = os.path.join(pasta, "app_" + os.path.basename(caminho))
+            para_formato_app(caminho, destino)
+            app.append(destino)
+        grande = os.path.join(pasta, f"sintetico_{linhas_sinteticas}.csv")
+        sintetico(grande, linhas_sinteticas)
+
+        print(f"{'arquivo':<42} {'kB':>7} {'antigo (linhas)':>16} {'antigo (ms)':>12} "
+              f"{'ler_csv (linhas)':>17} {'ler_csv (ms)':>13} {'×':>6}")
+        for caminho in arquivos + app + [grande]:
+            antigo, (tempos, _) = melhor_tempo(carregar_antigo, caminho, repeticoes)
+            novo, colunas = melhor_tempo(ler_csv, caminho, repeticoes)
+            print(f"{os.path.basename(caminho):<42} {os.path.getsize(caminho) / 1024:>7.0f} "
+                  f"{len(tempos):>16} {antigo * 1000:>12.1f} {len(colunas['tempo']):>17} "
+                  f"{novo * 1000:>13.1f} {antigo / novo:>6.1f}", flush=True)
+
+        medir_reabertura(pasta, [os.path.basename(c) for c in app + [grande]])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
@@ -0,0 +1,122 @@
+"""
+Benchmark da ingestão serial do ESPReader (somente Linux/macOS, usa PTY).
+
+Compara o laço antigo (readline com timeout=0.2 + sleep de 0.05 s quando
+a linha vem vazia) com a leitura em bloco atual (in_waiting + SeparadorLinhas)
+a 10, 100 e 1000 quadros/s. Mede o tempo de CPU da thread leitora e a
+latência entre a escrita do quadro no PTY e a linha chegar ao parser.
+
+Uso:  python outros/benchmarks/bench_ingestao.py [duracao_s]
+"""
+import os
+import sys
+import threading
+import time
+
+import _comum
+import serial
+from core.monitor import ESPReader
+
+TAXAS = (10, 100, 1000)
+
+
+def escrever_quadros(fd, taxa, duracao, envios):
+    """Escreve quadros no lado mestre do PTY em ritmo fixo."""
+    periodo = 1.0 / taxa
+    total = int(taxa * duracao)
+    inicio = time.perf_counter()
+    for i in range(total):
+        alvo = inicio + i * periodo
+        espera = alvo - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+        envios.append(time.perf_counter())
+        os.write(fd, _comum.linha_telemetria(i))
+
+
+def leitor_legado(ser, chegadas, parar, resultado):
+    """Reprodução do laço de leitura anterior do ESPReader.run."""
+    cpu0 = time.thread_time()
+    while not parar.is_set():
+        try:
+            linha = ser.readline().decode(errors="ignore").strip()
+        except Exception:
+            break
+        if not linha:
+            time.sleep(0.05)
+            continue
+        if linha.startswith("Vbat:"):
+            chegadas.append(time.perf_counter())
+    resultado["cpu"] = time.thread_time() - cpu0
+
+
+class LeitorMedido(ESPReader):
+    """ESPReader que anota o instante de chegada de cada linha."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chegadas = []
+        self.cpu = 0.0
+
+    def _processar_linha(self, linha, t):
+        if linha.startswith(b"Vbat:"):
+            self.chegadas.append(time.perf_counter())
+
+    def run(self):
+        cpu0 = time.thread_time()
+        super().run()
+        self.cpu = time.thread_time() - cpu0
+
+
+def medir(modo, taxa, duracao):
+    mestre, escravo = _comum.criar_pty()
+    ser = serial.Serial(escravo, 115200, timeout=0.2)
+    envios = []
+
+    if modo == "legado":
+        chegadas, resultado, parar = [], {}, threading.Event()
+        leitor = threading.Thread(target=leitor_legado, args=(ser, chegadas, parar, resultado), daemon=True)
+        leitor.start()
+    else:
+        leitor = LeitorMedido(porta=escravo)
+        leitor.ser = ser
+        leitor.start()
+
+    time.sleep(0.2)
+    escrever_quadros(mestre, taxa, duracao, envios)
+    time.sleep(0.5)
+
+    if modo == "legado":
+        parar.set()
+        leitor.join(timeout=1)
+        ser.close()
+        cpu = resultado.get("cpu", float("nan"))
+    else:
+        leitor.parar()
+        chegadas, cpu = leitor.chegadas, leitor.cpu
+
+    os.close(mestre)
+    latencias = [(c - e) * 1000 for e, c in zip(envios, chegadas)]
+    return {
+        "recebidos": len(chegadas),
+        "enviados": len(envios),
+        "cpu_ms": cpu * 1000,
+        "lat_p50": _comum.percentil(latencias, 50),
+        "lat_p99": _comum.percentil(latencias, 99),
+    }
+
+
+def main():
+    duracao = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'modo':<8} {'taxa':>6} {'recebidos':>12} {'CPU (ms)':>10} {'lat p50 (ms)':>13} {'lat p99 (ms)':>13}")
+    for taxa in TAXAS:
+        for modo in ("legado", "bloco"):
+            r = medir(modo, taxa, duracao)
+            print(
+                f"{modo:<8} {taxa:>6} {r['recebidos']:>5}/{r['enviados']:<6} "
+                f"{r['cpu_ms']:>10.1f} {r['lat_p50']:>13.3f} {r['lat_p99']:>13.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
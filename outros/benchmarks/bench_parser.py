@@ -0,0 +1,100 @@
+"""
+Micro-benchmark do parser de telemetria (core/parser.py) contra o parser
+antigo baseado em split("|")/split(":")/replace do ESPReader.run.
+
+As linhas são geradas a partir das gravações reais em ensaios_de_teste:
+cada linha válida do CSV vira o quadro que o firmware v_4.0 teria impresso.
+
+Uso:  python outros/benchmarks/bench_parser.py [repeticoes]
+"""
+import glob
+import os
+import sys
+import time
+
+import _comum
+from core.monitor import SeparadorLinhas
+from core.parser import ParserTelemetria
+
+
+def carregar_linhas():
+    linhas = []
+    for caminho in sorted(glob.glob(os.path.join(_comum.ENSAIOS, "*.csv"))):
+        with open(caminho, "r", encoding="utf-8") as f:
+            next(f, None)
+            for row in f:
+                campos = row.rstrip("\n").split(";")
+                if len(campos) < 6 or not campos[1] or not campos[2]:
+                    continue
+                linhas.append((
+                    f"Vbat: {campos[1]} V | Mode: {campos[3]} | Charge: {campos[4]} | "
+                    f"Disch: {campos[5]} | Corrente: {campos[2]} A\r"
+                ).encode())
+    return linhas
+
+
+def parser_legado(linha_bytes):
+    """Cópia do parser anterior (inclui o decode/strip que era feito no laço)."""
+    linha = linha_bytes.decode(errors="ignore").strip()
+    if linha.startswith("Vbat:"):
+        partes = [p.strip() for p in linha.split("|")]
+        if len(partes) >= 5:
+            try:
+                tensao = float(partes[0].split(":")[1].replace("V", "").strip())
+                modo = partes[1].split(":")[1].strip()
+                carga = partes[2].split(":")[1].strip()
+                descarga = partes[3].split(":")[1].strip()
+                corrente = float(partes[4].split(":")[1].replace("A", "").strip())
+                return tensao, corrente, modo, carga, descarga
+            except:
+                pass
+    return None
+
+
+def medir(funcao, linhas, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        for linha in linhas:
+            funcao(linha)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    linhas = carregar_linhas()
+    parser = ParserTelemetria()
+
+    # Confere que os dois parsers concordam antes de medir
+    for linha in linhas:
+        antigo = parser_legado(linha)
+        novo = parser.interpretar(linha)
+        assert antigo == tuple(novo), (linha, antigo, novo)
+    parser.zerar()
+
+    # No ESPReader as linhas chegam pelo SeparadorLinhas: confere que o que
+    # ele entrega (em blocos de tamanhos quaisquer) o parser aceita
+    separador = SeparadorLinhas()
+    fluxo = b"\n".join(linhas) + b"\n"
+    separadas = []
+    for i in range(0, len(fluxo), 997):
+        separadas.extend(separador.alimentar(fluxo[i:i + 997]))
+    assert separadas == linhas
+    for linha in separadas:
+        assert parser.interpretar(linha) is not None, (type(linha), linha)
+    assert parser.malformados == 0
+    parser.zerar()
+
+    t_legado = medir(parser_legado, linhas, repeticoes)
+    t_novo = medir(parser.interpretar, linhas, repeticoes)
+
+    n = len(linhas)
+    print(f"linhas de ensaios_de_teste: {n}")
+    print(f"legado (split):  {t_legado * 1e9 / n:8.0f} ns/linha  ({n / t_legado:,.0f} linhas/s)")
+    print(f"core/parser.py:  {t_novo * 1e9 / n:8.0f} ns/linha  ({n / t_novo:,.0f} linhas/s)")
+    print(f"ganho: {t_legado / t_novo:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
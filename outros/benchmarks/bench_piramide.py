@@ -0,0 +1,149 @@
+"""
+Benchmark da pirâmide de mín/máx do gráfico do histórico (core/piramide.py).
+
+Para o ensaio de 100 ciclos e para ele repetido até 1 e 10 milhões de
+linhas, mede a montagem da pirâmide (e quanto ela ocupa frente ao array
+de tensões) e uma sequência de zoom e deslocamento no gráfico 7x4 da
+TelaHistorico (backend Agg, sem janela):
+
+  - antigo: a Line2D com todos os pontos; cada zoom/deslocamento é um
+    set_xlim + canvas.draw() que percorre a gravação inteira;
+  - pirâmide: a cada set_xlim, pontos() do trecho visível + set_data +
+    canvas.draw(), como o xlim_changed da TelaHistorico.
+
+Mostra o tempo médio por passo, o máximo de pontos desenhados e confere
+que a vista inteira pela pirâmide mantém o mínimo e o máximo da gravação.
+
+Antes, confere pontos() contra o mín/máx por força bruta em janelas
+aleatórias (posição, largura em pixels e faixa de linhas) de um passeio
+aleatório de 100 mil linhas, onde os blocos das bordas da vista quase
+sempre têm o extremo do lado de fora.
+
+Uso:  python outros/benchmarks/bench_piramide.py [passos]
+"""
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+import _comum
+from core.historico import ler_csv
+from core.piramide import PiramideMinMax
+
+
+def repetir(colunas, linhas):
+    """O ensaio repetido em sequência até `linhas` linhas, com o tempo continuando."""
+    tempo, tensao = colunas["tempo"], colunas["tensao"]
+    vezes = max(1, linhas // len(tempo))
+    return {
+        "tempo": np.concatenate([tempo + k * (tempo[-1] + 1) for k in range(vezes)]),
+        "tensao": np.tile(tensao, vezes),
+    }
+
+
+def conferir_janelas(janelas=2000, linhas=100_000):
+    """Quantas janelas aleatórias perderam o mín ou o máx visível (deve ser 0)."""
+    rng = np.random.default_rng(7)
+    tempo = np.cumsum(rng.uniform(0.1, 1.0, linhas))
+    tensao = 3.7 + np.cumsum(rng.normal(0, 0.05, linhas))
+    colunas = {"tempo": tempo, "tensao": tensao}
+    piramide = PiramideMinMax.de_tensoes(tensao)
+    perdidas = 0
+    for _ in range(janelas):
+        t0, t1 = np.sort(rng.uniform(tempo[0] - 5, tempo[-1] + 5, 2))
+        primeira, ultima = np.sort(rng.integers(0, linhas + 1, 2)) if rng.random() < 0.3 else (0, linhas)
+        _, v = piramide.pontos(colunas, t0, t1, int(rng.integers(1, 1500)), primeira, ultima)
+        # as mesmas linhas que pontos() considera: o trecho e uma amostra de cada lado
+        a = max(primeira, int(np.searchsorted(tempo, t0, side="left")) - 1)
+        b = min(ultima, int(np.searchsorted(tempo, t1, side="right")) + 1)
+        if b <= a:
+            perdidas += len(v) != 0
+        elif (v.min(), v.max()) != (tensao[a:b].min(), tensao[a:b].max()):
+            perdidas += 1
+    return perdidas
+
+
+def vistas(t0, t1, passos):
+    """Zoom até 0,1 % da gravação e depois deslocamentos de 1 % por vez."""
+    largura = t1 - t0
+    sequencia = [(t0, t1), (t0, t0 + largura / 10), (t0, t0 + largura / 100), (t0, t0 + largura / 1000)]
+    inicio = t0 + largura / 2
+    for k in range(passos):
+        a = inicio + k * largura / 100
+        sequencia.append((a, a + largura / 100))
+    return sequencia
+
+
+def figura(t, v):
+    fig, ax = plt.subplots(figsize=(7, 4))
+    linha, = ax.plot(t, v, color="tab:green")
+    ax.set_xlabel("Tempo (s)")
+    ax.set_ylabel("Tensão (V)")
+    ax.grid(True)
+    fig.canvas.draw()
+    return fig, ax, linha
+
+
+def medir_antigo(colunas, sequencia):
+    fig, ax, _ = figura(colunas["tempo"], colunas["tensao"])
+    inicio = time.perf_counter()
+    for t0, t1 in sequencia:
+        ax.set_xlim(t0, t1)
+        fig.canvas.draw()
+    total = time.perf_counter() - inicio
+    plt.close(fig)
+    return total / len(sequencia), len(colunas["tempo"])
+
+
+def medir_piramide(colunas, piramide, sequencia):
+    tempo = colunas["tempo"]
+    fig, ax, linha = figura(*piramide.pontos(colunas, tempo[0], tempo[-1], 500))
+    maximo = 0
+    inicio = time.perf_counter()
+    for t0, t1 in sequencia:
+        ax.set_xlim(t0, t1)
+        t, v = piramide.pontos(colunas, t0, t1, ax.bbox.width)
+        linha.set_data(t, v)
+        maximo = max(maximo, len(t))
+        fig.canvas.draw()
+    total = time.perf_counter() - inicio
+    plt.close(fig)
+    return total / len(sequencia), maximo
+
+
+def main(passos):
+    perdidas = conferir_janelas()
+    print(f"janelas aleatórias com mín/máx visível perdido: {perdidas}\n")
+    assert perdidas == 0
+
+    base = ler_csv(os.path.join(_comum.ENSAIOS, "teste_100_ciclo_carga_descarga.csv"))
+    gravacoes = [("ensaio de 100 ciclos", base)]
+    for linhas in (1_000_000, 10_000_000):
+        gravacoes.append((f"repetido ({linhas} linhas)", repetir(base, linhas)))
+
+    print(f"{'gravação':<30} {'linhas':>9} {'montar (ms)':>12} {'níveis':>7} {'memória':>8} "
+          f"{'antigo (ms/passo)':>18} {'pontos':>9} {'pirâmide (ms/passo)':>20} {'pontos':>7} {'picos':>6}")
+    for nome, colunas in gravacoes:
+        tempo, tensao = colunas["tempo"], colunas["tensao"]
+        inicio = time.perf_counter()
+        piramide = PiramideMinMax.de_tensoes(tensao)
+        montar = time.perf_counter() - inicio
+        memoria = sum(a.nbytes for a in piramide.arrays().values()) / tensao.nbytes
+
+        _, v = piramide.pontos(colunas, tempo[0], tempo[-1], 500)
+        picos = "ok" if (v.min(), v.max()) == (tensao.min(), tensao.max()) else "perdeu"
+        sequencia = vistas(float(tempo[0]), float(tempo[-1]), passos)
+        antigo, pontos_antigo = medir_antigo(colunas, sequencia)
+        novo, pontos_novo = medir_piramide(colunas, piramide, sequencia)
+        print(f"{nome:<30} {len(tempo):>9} {montar * 1000:>12.1f} {len(piramide):>7} {memoria:>7.0%} "
+              f"{antigo * 1000:>18.1f} {pontos_antigo:>9} {novo * 1000:>20.1f} {pontos_novo:>7} {picos:>6}",
+              flush=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
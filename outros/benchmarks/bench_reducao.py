@@ -0,0 +1,113 @@
+"""
+Benchmark da SerieCamadas (core/reducao.py), a memória do gráfico em
+tempo real (camadas recentes / médias / longas).
+
+  - memória: bytes da SerieCamadas × as duas deques de floats antigas
+    (medidas com tracemalloc) ao fim de testes de 1 hora a 1 semana a 1
+    quadro/s, e de 1 hora a 1000 quadros/s;
+  - tique: custo de acrescentar o lote novo + pontos() com a série já
+    cheia (incremental) × montar a série do zero a cada tique;
+  - picos: picos de um único quadro, para cima e para baixo, espalhados
+    por 1 semana de teste, conferidos nos pontos desenhados (perto do
+    instante de cada um).
+
+Uso:  python outros/benchmarks/bench_reducao.py [tiques]
+"""
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+import _comum  # noqa: F401  (ajusta o sys.path)
+from core.reducao import SerieCamadas
+
+SEMANA = 7 * 86400
+
+
+def serie(n, taxa=1.0, semente=1):
+    t = np.arange(n, dtype=float) / taxa
+    v = 3.0 + 1.2 * np.abs(((t / 3600.0) % 2.0) - 1.0) + np.random.default_rng(semente).normal(0, 0.003, n)
+    return t, v
+
+
+def encher(camadas, t, v, lote):
+    for a in range(0, len(t), lote):
+        camadas.acrescentar(t[a:a + lote], v[a:a + lote])
+
+
+def bytes_deques(n):
+    """Bytes por amostra das deques dados_tempo/dados_tensao antigas (medido em 100 mil amostras)."""
+    amostra = min(n, 100_000)
+    t, v = serie(amostra)
+    tracemalloc.start()
+    dados_tempo, dados_tensao = deque(), deque()
+    for a, b in zip(t.tolist(), v.tolist()):
+        dados_tempo.append(a + 0.5)   # floats novos, como os vindos do ESPReader
+        dados_tensao.append(b + 0.5)
+    usados = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return usados / amostra * n
+
+
+def conferir_picos(picos=50):
+    t, v = serie(SEMANA)
+    rng = np.random.default_rng(2)
+    posicoes = rng.choice(SEMANA, picos, replace=False)
+    v[posicoes] = np.where(np.arange(picos) % 2, 5.0 + rng.random(picos), 2.0 - rng.random(picos))
+    camadas = SerieCamadas()
+    encher(camadas, t, v, 600)
+    pt, pv = camadas.pontos()
+    # visível: um ponto desenhado fora da faixa normal (3,0-4,2 V), na mesma
+    # direção, dentro da faixa de tempo do pico (dois picos na mesma faixa
+    # aparecem como um só, o maior)
+    vistos = 0
+    for p in posicoes:
+        perto = np.abs(pt - t[p]) <= camadas.longas.largura
+        vistos += bool(np.any(pv[perto] > 4.5)) if v[p] > 4.2 else bool(np.any(pv[perto] < 2.5))
+    return vistos, picos, len(pv)
+
+
+def medir_tique(n, lote, tiques, do_zero):
+    t, v = serie(n + lote * tiques, taxa=lote)
+    camadas = SerieCamadas()
+    encher(camadas, t[:n], v[:n], max(lote, 600))
+    tempos = []
+    for k in range(tiques):
+        a, b = n + k * lote, n + (k + 1) * lote
+        inicio = time.perf_counter()
+        if do_zero:
+            camadas = SerieCamadas()
+            camadas.acrescentar(t[:b], v[:b])
+        else:
+            camadas.acrescentar(t[a:b], v[a:b])
+        pt, _ = camadas.pontos()
+        tempos.append(time.perf_counter() - inicio)
+    return sum(tempos) / len(tempos), len(pt)
+
+
+def main(tiques):
+    achados, picos, pontos = conferir_picos()
+    print(f"picos de 1 quadro desenhados: {achados}/{picos} (1 semana a 1 quadro/s em {pontos} pontos)\n")
+
+    print(f"{'teste':<22} {'amostras':>10} {'SerieCamadas (kB)':>18} {'deques (MB)':>12} {'pontos':>7}")
+    for nome, duracao, taxa in (("1 h a 1 q/s", 3600, 1), ("1 dia a 1 q/s", 86400, 1),
+                                ("1 semana a 1 q/s", SEMANA, 1), ("1 h a 1000 q/s", 3600, 1000)):
+        n = duracao * taxa
+        t, v = serie(n, taxa=taxa)
+        camadas = SerieCamadas()
+        encher(camadas, t, v, max(taxa, 600))
+        print(f"{nome:<22} {n:>10} {camadas.memoria_bytes() / 1024:>18.1f} "
+              f"{bytes_deques(n) / 2**20:>12.1f} {len(camadas.pontos()[0]):>7}", flush=True)
+
+    print(f"\n{'amostras':>9} {'lote':>5} {'incremental (ms)':>17} {'do zero (ms)':>13} {'pontos':>7}")
+    for n in (10_000, 100_000, 1_000_000):
+        for lote in (1, 1000):
+            inc, pontos = medir_tique(n, lote, tiques, False)
+            zero, _ = medir_tique(n, lote, max(3, tiques // 10), True)
+            print(f"{n:>9} {lote:>5} {inc * 1000:>17.3f} {zero * 1000:>13.1f} {pontos:>7}", flush=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
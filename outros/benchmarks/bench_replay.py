@@ -0,0 +1,127 @@
+"""
+Reproduz os ensaios de ensaios_de_teste pelo replay:// (core/urlhandler) num
+ESPReader de verdade e aplica as regras do teste (core/ensaio.py) como a
+tela de monitoramento, com um tique a cada 1/speed s (1 s do ensaio).
+
+Para os ensaios de ciclos confere quantos ciclos o ControleEnsaio detecta
+× a referência (o mesmo ControleEnsaio alimentado com uma linha do CSV por
+tique, sem serial nem relógio); para os de carga/descarga mede a latência
+de corte: do quadro que passou do limite de tensão até o tique que
+encerrou o teste, em segundos do ensaio.
+
+O ControleEnsaio olha só o último quadro de cada tique, como a tela de
+monitoramento. Se a velocidade for tão alta que o tique (1/speed s) chega
+perto do atraso do sleep, dois quadros caem no mesmo tique e um estado de
+relé que dura um só quadro passa despercebido: a diferença na coluna de
+ciclos mede exatamente isso.
+
+    python outros/benchmarks/bench_replay.py [--speed 100] [--filtro ciclo]
+"""
+import argparse
+import os
+import time
+import types
+
+from _comum import ENSAIOS
+
+from core.amostra import Amostra
+from core.ensaio import ControleEnsaio
+from core.monitor import ESPReader
+from core.parser import ParserTelemetria
+from core.urlhandler.protocol_replay import quadros_de_csv
+
+# Limites de corte da bateria usada nos ensaios
+BATERIA = {"nome": "ensaio", "tensao_carga": "4.200", "tensao_descarga": "3.000"}
+DESCANSO = 60
+
+
+def ciclos_referencia(caminho):
+    """Ciclos que o ControleEnsaio detecta vendo cada linha do CSV em um tique próprio."""
+    parser = ParserTelemetria()
+    sem_placa = types.SimpleNamespace(
+        bateria_controller=types.SimpleNamespace(desligar_tudo=lambda: None, alternar_modo=lambda: None),
+        set_ciclo=lambda ciclo: None,
+    )
+    ensaio = ControleEnsaio(sem_placa, "ciclos", BATERIA, descanso=DESCANSO)
+    for seq, (t, linha) in enumerate(quadros_de_csv(caminho), 1):
+        ensaio.tique(Amostra(seq, t, *parser.interpretar(linha)))
+    return ensaio.ciclo_atual
+
+
+def condicao_corte(ensaio, amostra):
+    tol = ensaio.TOLERANCIA
+    return (
+        (ensaio.tensao_carga > 0 and amostra.tensao >= ensaio.tensao_carga - tol)
+        or (ensaio.tensao_descarga > 0 and amostra.tensao <= ensaio.tensao_descarga + tol)
+    )
+
+
+def reproduzir(caminho, speed):
+    tipo = "ciclos" if "ciclo_carga_descarga" in os.path.basename(caminho) else "carga"
+    esperados = ciclos_referencia(caminho) if tipo == "ciclos" else None
+    esp = ESPReader(porta=f"replay://{caminho}?speed={speed:g}")
+    esp.conectar()
+    esp.start()
+    esp.bateria_controller.TIMEOUT = max(0.05, 1.0 / speed)
+
+    ensaio = ControleEnsaio(esp, tipo, BATERIA, ciclos_totais=esperados or 0, descanso=DESCANSO)
+    periodo = 1.0 / speed
+    inicio = time.monotonic()
+    proximo = inicio
+    ultimo_seq = 0
+    primeiro_corte = None   # t (monotonic) do primeiro quadro além do limite
+    mensagem = None
+    latencia = None
+    while True:
+        proximo += periodo
+        time.sleep(max(0.0, proximo - time.monotonic()))
+        for a in esp.amostras.desde(ultimo_seq):
+            ultimo_seq = a.seq
+            if tipo == "carga" and primeiro_corte is None and condicao_corte(ensaio, a):
+                primeiro_corte = a.t
+        amostra = esp.amostra
+        if amostra is not None:
+            mensagem = ensaio.tique(amostra)
+            if mensagem:
+                if primeiro_corte is not None:
+                    latencia = (time.monotonic() - primeiro_corte) * speed
+                break
+        if esp.ser.terminou and not esp.ser.in_waiting and esp.amostras.desde(ultimo_seq) == []:
+            break
+    duracao = time.monotonic() - inicio
+    quadros = esp.parser.quadros
+    esp.parar()
+    return {
+        "tipo": tipo,
+        "esperados": esperados,
+        "detectados": ensaio.ciclo_atual if tipo == "ciclos" else None,
+        "encerrou": bool(mensagem),
+        "latencia": latencia,
+        "quadros": quadros,
+        "duracao": duracao,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--speed", type=float, default=100.0, help="velocidade da reprodução (x)")
+    ap.add_argument("--filtro", default="", help="só os arquivos cujo nome contém este texto")
+    args = ap.parse_args()
+
+    arquivos = sorted(
+        (f for f in os.listdir(ENSAIOS) if f.endswith(".csv") and args.filtro in f),
+        key=lambda f: os.path.getsize(os.path.join(ENSAIOS, f)),
+    )
+    print(f"replay:// a {args.speed:g}x, tique a cada {1000 / args.speed:.1f} ms\n")
+    print(f"{'arquivo':40s} {'tipo':6s} {'ciclos':>9s} {'encerrou':>8s} {'latência corte':>15s} "
+          f"{'quadros':>8s} {'real (s)':>9s}")
+    for nome in arquivos:
+        r = reproduzir(os.path.join(ENSAIOS, nome), args.speed)
+        ciclos = f"{r['detectados']}/{r['esperados']}" if r["tipo"] == "ciclos" else "-"
+        latencia = f"{r['latencia']:.2f} s" if r["latencia"] is not None else "-"
+        print(f"{nome:40s} {r['tipo']:6s} {ciclos:>9s} {'sim' if r['encerrou'] else 'não':>8s} "
+              f"{latencia:>15s} {r['quadros']:8d} {r['duracao']:9.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark do índice de segmentos (core/segmentos.py).
+
+Para cada ensaio de ensaios_de_teste (e para o de 100 ciclos repetido
+até `linhas` linhas), mede:
+
+  - indexar: montar o IndiceSegmentos a partir das colunas (passada
+    vetorizada) × só achar as fases percorrendo as linhas em Python;
+  - um ciclo: pegar as colunas de um ciclo do meio fatiando pelo índice ×
+    refazer a máscara `ciclo == k` sobre a gravação inteira a cada pedido;
+  - legado: confere que os ciclos refeitos pelos relés (sem a coluna
+    Ciclo) batem com os da coluna, segmento a segmento.
+
+Uso:  python outros/benchmarks/bench_segmentos.py [linhas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+import _comum
+from core.historico import ler_csv
+from core.segmentos import IndiceSegmentos
+
+
+def segmentar_em_python(colunas):
+    """Os mesmos (início, fim, fase) de IndiceSegmentos.de_colunas, linha a linha."""
+    carga, descarga = colunas["carga"].tolist(), colunas["descarga"].tolist()
+    segmentos = []
+    fase_anterior = None
+    for i, (c, d) in enumerate(zip(carga, descarga)):
+        fase = 1 if c and not d else 2 if d and not c else 0
+        if fase != fase_anterior:
+            if segmentos:
+                segmentos[-1][1] = i
+            segmentos.append([i, len(carga), fase])
+            fase_anterior = fase
+    return [tuple(s) for s in segmentos]
+
+
+def melhor(funcao, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def repetir(colunas, linhas):
+    """Gravação longa: o ensaio repetido em sequência, com tempo e ciclos continuando."""
+    vezes = max(1, linhas // len(colunas["tempo"]))
+    saida = {}
+    for nome, col in colunas.items():
+        partes = [col] * vezes
+        if nome == "tempo":
+            partes = [col + k * (col[-1] + 1) for k in range(vezes)]
+        elif nome == "ciclo":
+            partes = [col + k * (col.max() + 1) for k in range(vezes)]
+        saida[nome] = np.concatenate(partes)
+    return saida
+
+
+def main(linhas):
+    arquivos = sorted(f for f in os.listdir(_comum.ENSAIOS) if f.endswith(".csv"))
+    gravacoes = [(f, ler_csv(os.path.join(_comum.ENSAIOS, f))) for f in arquivos]
+    maior = dict(gravacoes)["teste_100_ciclo_carga_descarga.csv"]
+    gravacoes.append((f"100 ciclos repetido ({linhas} linhas)", repetir(maior, linhas)))
+
+    print(f"{'gravação':<42} {'linhas':>8} {'segs':>5} {'ciclos':>6} {'indexar (ms)':>13} {'python (ms)':>12} "
+          f"{'1 ciclo: fatia (µs)':>20} {'máscara (µs)':>13} {'legado':>7}")
+    for nome, colunas in gravacoes:
+        vetor, indice = melhor(lambda: IndiceSegmentos.de_colunas(colunas))
+        legado = "---"
+        python = float("nan")
+        if "ciclo" in colunas:
+            python, segmentos = melhor(lambda: segmentar_em_python(colunas), 1)
+            assert segmentos == [s[:3] for s in indice]
+            sem_ciclo = IndiceSegmentos.de_colunas({k: v for k, v in colunas.items() if k != "ciclo"})
+            # o último segmento pode ser a troca final, gravada antes de Ciclo mudar
+            legado = "ok" if np.array_equal(sem_ciclo.ciclo[:-1], indice.ciclo[:-1]) else "difere"
+        ciclos = indice.ciclos()
+        k = int(ciclos[len(ciclos) // 2])
+        fatia, _ = melhor(lambda: indice.fatiar(colunas, k)["tensao"])
+        mascara = float("nan")
+        if "ciclo" in colunas:
+            mascara, _ = melhor(lambda: colunas["tensao"][colunas["ciclo"] == k])
+        print(f"{nome:<42} {len(colunas['tempo']):>8} {len(indice):>5} {len(ciclos):>6} {vetor * 1000:>13.2f} "
+              f"{python * 1000:>12.1f} {fatia * 1e6:>20.1f} {mascara * 1e6:>13.1f} {legado:>7}", flush=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,77 @@
+"""
+Benchmark das placas simuladas sim:// (core/urlhandler/protocol_sim.py).
+
+Abre N placas no mesmo processo, cada uma com um ESPReader (thread) lendo
+a `rate` quadros/s, durante alguns segundos. Mostra o tempo para abrir e
+conectar todas, os quadros recebidos × os que as placas geraram e a CPU
+do processo. Antes, confere que a mesma `seed` gera a mesma sequência.
+
+Nada de PTY nem de processos extras: roda em qualquer sistema.
+
+Uso:  python outros/benchmarks/bench_sim.py [segundos]
+"""
+import sys
+import time
+
+import _comum  # noqa: F401  (ajusta o sys.path)
+import serial
+
+from core.monitor import ESPReader
+
+
+def conferir_semente():
+    def sessao():
+        ser = serial.serial_for_url("sim://?rate=1000&seed=7", timeout=0.5)
+        ser.write(b"AUTO\n")
+        linhas = [ser.readline() for _ in range(200)]
+        ser.close()
+        return linhas
+    a, b = sessao(), sessao()
+    # os instantes dos comandos variam; os quadros depois do ack não
+    a = a[a.index(b"Modo AUTOMATICO ativado.\n") + 1:]
+    b = b[b.index(b"Modo AUTOMATICO ativado.\n") + 1:]
+    n = min(len(a), len(b))
+    return a[:n] == b[:n]
+
+
+def medir(n, taxa, segundos):
+    t0 = time.perf_counter()
+    leitores = []
+    for k in range(n):
+        leitor = ESPReader(porta=f"sim://?rate={taxa:g}&seed={k}")
+        leitor.conectar()
+        leitor.start()
+        leitor.bateria_controller.alternar_modo()
+        leitores.append(leitor)
+    abertura = time.perf_counter() - t0
+
+    time.sleep(0.5)
+    q0 = sum(l.parser.quadros for l in leitores)
+    g0 = sum(l.ser.quadros for l in leitores)
+    c0, t0 = time.process_time(), time.perf_counter()
+    time.sleep(segundos)
+    duracao = time.perf_counter() - t0
+    cpu = (time.process_time() - c0) / duracao
+    recebidos = sum(l.parser.quadros for l in leitores) - q0
+    gerados = sum(l.ser.quadros for l in leitores) - g0
+
+    for leitor in leitores:
+        leitor.parar()
+    time.sleep(0.3)
+    return abertura, recebidos, gerados, cpu
+
+
+def main(segundos):
+    print(f"mesma seed, mesma sequência: {'sim' if conferir_semente() else 'NÃO'}\n")
+    print(f"{'placas':>6} {'quadros/s':>10} {'abrir (ms)':>11} {'recebidos':>10} {'gerados':>9} "
+          f"{'CPU (%)':>8}")
+    for n in (1, 10, 50):
+        for taxa in (2, 100, 1000):
+            abertura, recebidos, gerados, cpu = medir(n, taxa, segundos)
+            print(f"{n:>6} {taxa:>10} {abertura * 1000:>11.1f} {recebidos:>10} {gerados:>9} "
+                  f"{cpu * 100:>8.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    _comum.silenciar_prints()
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3)
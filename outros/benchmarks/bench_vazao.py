@@ -0,0 +1,103 @@
+"""
+Teste de carga da aquisição: leitura → parser → BufferAmostras → gravador.
+
+Uma placa sim:// (core/urlhandler/protocol_sim.py) envia quadros a taxas
+crescentes para um ESPReader que grava um CSV (flush "tempo:1" com fsync,
+como no teste real), enquanto um consumidor lê o anel com desde() uma vez
+por segundo, como a tela de monitoramento.
+
+Para cada taxa mostra os quadros gerados pela placa, os recebidos, os
+gravados no arquivo, as perdas (anel e fila do gravador), o atraso do
+leitor no fim da rodada e a CPU do processo. Uma taxa é "sustentada" se
+não houve perda, o arquivo tem todos os quadros recebidos e o atraso ficou
+abaixo de 0,1 s de quadros. "quadros/s por núcleo" é recebidos / tempo de
+CPU; inclui o custo da própria placa simulada, então é conservador.
+
+Uso:  python outros/benchmarks/bench_vazao.py [segundos] [--anel N]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import _comum  # noqa: F401  (ajusta o sys.path)
+
+from core.amostra import BufferAmostras
+from core.monitor import ESPReader
+
+TAXAS = (1000, 2000, 5000, 10000, 20000, 40000, 80000)
+
+
+def consumir(esp, parar, vistos):
+    ultimo = 0
+    while not parar.wait(1.0):
+        for a in esp.amostras.desde(ultimo):
+            ultimo = a.seq
+            vistos[0] += 1
+
+
+def medir(taxa, segundos, pasta, anel):
+    esp = ESPReader(porta=f"sim://?rate={taxa}&seed=1")
+    esp.amostras = BufferAmostras(anel)
+    esp.conectar()
+    esp.definir_csv(os.path.join(pasta, f"vazao_{taxa}.csv"))
+    esp.enviando = True   # grava sem o USB ON periódico
+    parar = threading.Event()
+    vistos = [0]
+    consumidor = threading.Thread(target=consumir, args=(esp, parar, vistos), daemon=True)
+
+    c0, t0 = time.process_time(), time.perf_counter()
+    esp.start()
+    consumidor.start()
+    time.sleep(segundos)
+    gerados = esp.ser.quadros
+    recebidos = esp.parser.quadros
+    cpu = time.process_time() - c0
+    duracao = time.perf_counter() - t0
+
+    parar.set()
+    consumidor.join()
+    esp.parar()
+    esp.gravador.parar()
+    return {
+        "gerados": gerados,
+        "recebidos": recebidos,
+        "gravados": esp.gravador.linhas_gravadas,
+        "perdidas": esp.amostras.perdidas,
+        "descartadas": esp.gravador.descartadas,
+        "atraso": (gerados - recebidos) / taxa,
+        "cpu": cpu / duracao,
+        "por_nucleo": recebidos / cpu if cpu else float("nan"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("segundos", nargs="?", type=float, default=5.0)
+    ap.add_argument("--anel", type=int, default=8192, help="capacidade do BufferAmostras")
+    args = ap.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    print(f"{'quadros/s':>9} {'gerados':>9} {'recebidos':>9} {'gravados':>9} {'perd. anel':>10} "
+          f"{'perd. grav.':>11} {'atraso (s)':>10} {'CPU (%)':>8} {'q/s por núcleo':>14}")
+    sustentada = None
+    for taxa in TAXAS:
+        r = medir(taxa, args.segundos, pasta, args.anel)
+        ok = (
+            not r["perdidas"] and not r["descartadas"]
+            and r["gravados"] >= r["recebidos"] and r["atraso"] < 0.1
+        )
+        print(f"{taxa:>9} {r['gerados']:>9} {r['recebidos']:>9} {r['gravados']:>9} {r['perdidas']:>10} "
+              f"{r['descartadas']:>11} {r['atraso']:>10.3f} {r['cpu'] * 100:>8.1f} "
+              f"{r['por_nucleo']:>14.0f}{'' if ok else '  ✗'}", flush=True)
+        if ok:
+            sustentada = taxa
+        else:
+            break
+    print(f"\nmaior taxa sustentada: {sustentada or '-'} quadros/s")
+
+
+if __name__ == "__main__":
+    _comum.silenciar_prints()
+    main()
@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+# O mesmo modelo roda dentro do aplicativo, sem PTY: porta "sim://"
+# (bateria_app/core/urlhandler/protocol_sim.py).
 import os
 import pty
 import tty